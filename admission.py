@@ -0,0 +1,128 @@
+# admission.py
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from metrics import Histogram
+
+# Concurrent calls per database and lane; 0 uses the database's pool size.
+# Overridable per database with DB_CONFIG_<name>_MAX_CONCURRENT_READS/_WRITES
+DEFAULT_MAX_CONCURRENT_READS = int(os.getenv('DB_MAX_CONCURRENT_READS', '0'))
+DEFAULT_MAX_CONCURRENT_WRITES = int(os.getenv('DB_MAX_CONCURRENT_WRITES', '0'))
+
+# Callers allowed to queue per lane, and seconds a queued caller waits before it is rejected
+DEFAULT_ADMISSION_QUEUE = int(os.getenv('DB_ADMISSION_QUEUE', '50'))
+DEFAULT_ADMISSION_TIMEOUT = float(os.getenv('DB_ADMISSION_TIMEOUT', '10'))
+
+LANES = ('read', 'write')
+
+
+class AdmissionError(Exception):
+    """Raised when a call is turned away because its lane is full and the queue is full or too slow"""
+
+
+class AdmissionLane:
+    """
+    Limits concurrent calls and queues the rest in arrival order.
+
+    A released slot is handed straight to the longest waiting caller, so newcomers cannot overtake the
+    queue. Callers are rejected at once when the queue is full, and after `timeout` seconds in the queue.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, timeout: float):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self.timeout = max(0.0, timeout)
+
+        self._lock = threading.Lock()
+        self._waiters = deque()  # one Event per queued caller, oldest first
+        self._active = 0
+
+        # Counters
+        self._admitted = 0
+        self._queued = 0
+        self._peak_queue = 0
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+        self._wait = Histogram()
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Take a slot, waiting in line up to `timeout` (at most the lane's timeout); returns the seconds waited"""
+        timeout = self.timeout if timeout is None else max(0.0, min(self.timeout, timeout))
+        start = time.monotonic()
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                self._admitted += 1
+                self._wait.observe(0.0)
+                return 0.0
+            if len(self._waiters) >= self.max_queue:
+                self._rejected_queue_full += 1
+                raise AdmissionError(
+                    f"Too many concurrent calls to '{self.name}': {self._active} running and {len(self._waiters)} "
+                    f"queued (limit {self.limit}, queue {self.max_queue}); retry later"
+                )
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+            self._queued += 1
+            self._peak_queue = max(self._peak_queue, len(self._waiters))
+
+        waiter.wait(timeout)
+        with self._lock:
+            # The slot may have been handed over between the wait timing out and taking the lock
+            if not waiter.is_set():
+                self._waiters.remove(waiter)
+                self._rejected_timeout += 1
+                raise AdmissionError(
+                    f"Timed out after {round(timeout, 3)}s queued for '{self.name}' behind {len(self._waiters)} other "
+                    f"call(s) ({self._active} running, limit {self.limit}); retry later"
+                )
+            waited = time.monotonic() - start
+            self._admitted += 1
+            self._wait.observe(waited)
+            return waited
+
+    def release(self) -> None:
+        """Give the slot to the next queued caller, or free it"""
+        with self._lock:
+            if self._waiters:
+                # The slot passes to the waiter directly, so the running count does not change
+                self._waiters.popleft().set()
+            else:
+                self._active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "running": self._active,
+                "queued": len(self._waiters),
+                "max_queue": self.max_queue,
+                "timeout": self.timeout,
+                "admitted": self._admitted,
+                "waited": self._queued,
+                "peak_queued": self._peak_queue,
+                "rejected_queue_full": self._rejected_queue_full,
+                "rejected_timeout": self._rejected_timeout,
+                "wait": self._wait.summary()
+            }
+
+
+class AdmittedPool:
+    """A pool checkout holding an admission slot; releasing the connection also frees the slot"""
+
+    def __init__(self, pool, lane: AdmissionLane):
+        self.pool = pool
+        self.lane = lane
+
+    def release(self, connection, discard: bool = False) -> None:
+        try:
+            self.pool.release(connection, discard=discard)
+        finally:
+            self.lane.release()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
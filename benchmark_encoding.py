@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark query_database result encoding: the default indented JSON format against the compact format.
+
+Uses synthetic rows shaped like mysql-connector results, so no database is needed:
+
+    python benchmark_encoding.py --rows 10000 --columns 20
+"""
+import argparse
+import datetime
+import decimal
+import json
+import time
+
+from encoding import encode_compact
+
+
+def make_rows(row_count: int, column_count: int) -> list:
+    """Build rows cycling through the value types MySQL commonly returns"""
+    base_time = datetime.datetime(2024, 1, 1, 12, 0, 0)
+    makers = [
+        lambda i: i,
+        lambda i: f"name-{i}",
+        lambda i: decimal.Decimal(i) / 100,
+        lambda i: base_time + datetime.timedelta(seconds=i),
+        lambda i: None if i % 7 == 0 else i * 1.5,
+        lambda i: (base_time + datetime.timedelta(days=i % 365)).date(),
+        lambda i: f"{i:08x}".encode(),
+    ]
+    columns = [f"column_{c}" for c in range(column_count)]
+    return [
+        {column: makers[c % len(makers)](i) for c, column in enumerate(columns)}
+        for i in range(row_count)
+    ]
+
+
+def encode_default(rows: list) -> str:
+    """The original query_database encoding"""
+    return json.dumps({
+        "database": "default",
+        "results": rows,
+        "row_count": len(rows)
+    }, indent=2, default=str)
+
+
+def encode_compact_format(rows: list) -> str:
+    return encode_compact(rows, database="default")
+
+
+def measure(encoder, rows: list, repeat: int) -> tuple:
+    """Return (best encode time in seconds, payload size in bytes)"""
+    best = float('inf')
+    payload = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = encoder(rows)
+        best = min(best, time.perf_counter() - start)
+    return best, len(payload.encode('utf-8'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, args.columns)
+    default_time, default_size = measure(encode_default, rows, args.repeat)
+    compact_time, compact_size = measure(encode_compact_format, rows, args.repeat)
+
+    print(f"{args.rows} rows x {args.columns} columns, best of {args.repeat}")
+    print(f"{'format':<10} {'encode ms':>12} {'payload KB':>12}")
+    print(f"{'json':<10} {default_time * 1000:>12.1f} {default_size / 1024:>12.1f}")
+    print(f"{'compact':<10} {compact_time * 1000:>12.1f} {compact_size / 1024:>12.1f}")
+    print(f"compact: {default_time / compact_time:.2f}x faster, {default_size / compact_size:.2f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
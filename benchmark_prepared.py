@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark a repeated parameterized statement sent as text against the prepared statement cache.
+
+Runs against a configured database (see .env), on one connection, with a different parameter each call.
+Each call gets its own copy of the SQL string, as MCP calls do, so the cache must match statements by text:
+
+    python benchmark_prepared.py --db default --iterations 5000
+    python benchmark_prepared.py --sql "SELECT * FROM users WHERE id = %s" --iterations 2000
+"""
+import argparse
+import statistics
+import time
+
+from database import get_db_connection
+from statement_cache import close_cursor, execute_statement, fetch_rows
+
+DEFAULT_SQL = (
+    "SELECT %s AS id, CONCAT('row-', %s) AS label, "
+    "(SELECT COUNT(*) FROM information_schema.CHARACTER_SETS WHERE MAXLEN > %s) AS charsets"
+)
+
+
+def run_text(connection, sql: str, params: tuple) -> None:
+    """The previous path: a fresh cursor and client-side interpolation for every call"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def run_prepared(connection, sql: str, params: tuple) -> None:
+    cursor = execute_statement(connection, sql, params, dictionary=True)
+    try:
+        fetch_rows(cursor)
+    finally:
+        close_cursor(connection, cursor)
+
+
+def measure(runner, connection, sql: str, iterations: int) -> list:
+    """Return per-call latencies in milliseconds"""
+    placeholders = sql.count('%s')
+    timings = []
+    for i in range(iterations):
+        params = tuple(i + n for n in range(placeholders))
+        # A new but equal string each call, like the text of separate tool calls
+        call_sql = sql.encode().decode()
+        start = time.perf_counter()
+        runner(connection, call_sql, params)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{label:<10} {statistics.mean(timings):>10.3f} {statistics.median(timings):>10.3f} {p95:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default="default")
+    parser.add_argument("--sql", default=DEFAULT_SQL, help="parameterized statement using %%s placeholders")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    connection = get_db_connection(args.db)
+    try:
+        # Warm up both paths so connection setup and the first prepare are not measured
+        measure(run_text, connection, args.sql, 10)
+        measure(run_prepared, connection, args.sql, 10)
+
+        text_timings = measure(run_text, connection, args.sql, args.iterations)
+        prepared_timings = measure(run_prepared, connection, args.sql, args.iterations)
+    finally:
+        connection.close()
+
+    print(f"{args.iterations} calls on '{args.db}'")
+    print(f"{'path':<10} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    report("text", text_timings)
+    report("prepared", prepared_timings)
+    print(f"prepared: {statistics.mean(text_timings) / statistics.mean(prepared_timings):.2f}x faster on average")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Benchmark the tool layer under concurrent load and write the results as JSON to diff across releases.
+
+By default a throwaway MySQL or MariaDB server is started from a temp datadir (mysqld or mariadbd must
+be on PATH) and torn down afterwards. With --server existing, the benchmark tables are created in a
+configured database instead (see .env) and dropped at the end.
+
+    python benchmark_suite.py --rows 100000 --concurrency 16 --requests 2000 --output bench.json
+    python benchmark_suite.py --server existing --db default --output bench.json
+    python benchmark_suite.py --compare previous.json --output bench.json
+
+Measured tools: query_database, execute_sql, query_to_csv, list_tables, describe_table. For each one the
+output has throughput, error count and p50/p95/p99/max latency in milliseconds.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DB = 'bench'
+USERS_TABLE = 'bench_users'
+ORDERS_TABLE = 'bench_orders'
+SEED_CHUNK = 1000
+
+
+class LocalServer:
+    """A MySQL or MariaDB server on a temp datadir, listening on a free local port"""
+
+    def __init__(self):
+        self.binary = shutil.which('mysqld') or shutil.which('mariadbd')
+        if self.binary is None:
+            raise SystemExit("mysqld/mariadbd not found on PATH; install one or use --server existing")
+        version = subprocess.run([self.binary, '--version'], capture_output=True, text=True).stdout
+        self.mariadb = 'mariadb' in version.lower()
+        self.version = version.strip()
+        self.directory = tempfile.mkdtemp(prefix='mcp-bench-')
+        self.datadir = os.path.join(self.directory, 'data')
+        self.socket = os.path.join(self.directory, 'mysql.sock')
+        self.port = _free_port()
+        self.process = None
+
+    def _user_args(self) -> list:
+        # mysqld refuses to run as root unless told which user to run as
+        return ['--user=root'] if hasattr(os, 'geteuid') and os.geteuid() == 0 else []
+
+    def start(self, timeout: float = 60) -> None:
+        log = os.path.join(self.directory, 'error.log')
+        if self.mariadb:
+            install = shutil.which('mariadb-install-db') or shutil.which('mysql_install_db')
+            if install is None:
+                raise SystemExit("mariadb-install-db not found on PATH")
+            subprocess.run([install, f'--datadir={self.datadir}', '--auth-root-authentication-method=normal',
+                            '--skip-test-db'] + self._user_args(), check=True, capture_output=True)
+        else:
+            subprocess.run([self.binary, '--no-defaults', '--initialize-insecure', f'--datadir={self.datadir}']
+                           + self._user_args(), check=True, capture_output=True)
+
+        args = [self.binary, '--no-defaults', f'--datadir={self.datadir}', f'--socket={self.socket}',
+                f'--port={self.port}', '--bind-address=127.0.0.1', f'--log-error={log}',
+                f'--pid-file={os.path.join(self.directory, "mysqld.pid")}', '--skip-log-bin',
+                '--max-connections=500'] + self._user_args()
+        if not self.mariadb:
+            args.append('--mysqlx=OFF')
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        import mysql.connector
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                connection = mysql.connector.connect(unix_socket=self.socket, user='root', password='')
+                break
+            except mysql.connector.Error:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    raise SystemExit(f"Server did not start; see {log}")
+                time.sleep(0.5)
+        cursor = connection.cursor()
+        for statement in (
+            f"CREATE DATABASE {BENCH_DB}",
+            "CREATE USER 'bench'@'127.0.0.1' IDENTIFIED BY 'bench'",
+            f"GRANT ALL ON {BENCH_DB}.* TO 'bench'@'127.0.0.1'",
+        ):
+            cursor.execute(statement)
+        cursor.close()
+        connection.close()
+
+    def stop(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def seed(db_name: str, rows: int, extra_tables: int) -> None:
+    """Create and fill the benchmark tables: users, orders (about 4 per user), and empty tables for list_tables"""
+    from database import get_db_connection
+
+    connection = get_db_connection(db_name)
+    cursor = connection.cursor()
+    try:
+        _drop_tables(cursor, extra_tables)
+        cursor.execute(f"""
+            CREATE TABLE {USERS_TABLE} (
+                id INT PRIMARY KEY,
+                name VARCHAR(64) NOT NULL,
+                email VARCHAR(128) NOT NULL,
+                status ENUM('active', 'suspended', 'closed') NOT NULL,
+                score DECIMAL(10, 2) NOT NULL,
+                created_at DATETIME NOT NULL,
+                KEY idx_status (status),
+                KEY idx_created_at (created_at)
+            )""")
+        cursor.execute(f"""
+            CREATE TABLE {ORDERS_TABLE} (
+                id INT PRIMARY KEY,
+                user_id INT NOT NULL,
+                amount DECIMAL(12, 2) NOT NULL,
+                note TEXT,
+                created_at DATETIME NOT NULL,
+                KEY idx_user_id (user_id)
+            )""")
+        for i in range(extra_tables):
+            cursor.execute(f"CREATE TABLE bench_extra_{i:04d} (id INT PRIMARY KEY, value VARCHAR(32))")
+
+        rng = random.Random(42)
+        base = datetime.datetime(2024, 1, 1)
+        statuses = ('active', 'suspended', 'closed')
+        users = max(1, rows // 4)
+        _insert(connection, cursor, f"INSERT INTO {USERS_TABLE} VALUES (%s, %s, %s, %s, %s, %s)", (
+            (i, f"user {i}", f"user{i}@example.com", statuses[i % 3], round(rng.uniform(0, 1000), 2),
+             base + datetime.timedelta(minutes=i))
+            for i in range(1, users + 1)
+        ))
+        _insert(connection, cursor, f"INSERT INTO {ORDERS_TABLE} VALUES (%s, %s, %s, %s, %s)", (
+            (i, rng.randint(1, users), round(rng.uniform(1, 500), 2), None if i % 5 else f"note for order {i}",
+             base + datetime.timedelta(seconds=i * 17))
+            for i in range(1, rows + 1)
+        ))
+        cursor.execute(f"ANALYZE TABLE {USERS_TABLE}, {ORDERS_TABLE}")
+        cursor.fetchall()
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def _insert(connection, cursor, sql: str, rows) -> None:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= SEED_CHUNK:
+            cursor.executemany(sql, chunk)
+            chunk = []
+    if chunk:
+        cursor.executemany(sql, chunk)
+    connection.commit()
+
+
+def _drop_tables(cursor, extra_tables: int) -> None:
+    tables = [USERS_TABLE, ORDERS_TABLE] + [f"bench_extra_{i:04d}" for i in range(extra_tables)]
+    cursor.execute(f"DROP TABLE IF EXISTS {', '.join(tables)}")
+
+
+def cleanup(db_name: str, extra_tables: int) -> None:
+    from database import get_db_connection
+
+    connection = get_db_connection(db_name)
+    cursor = connection.cursor()
+    try:
+        _drop_tables(cursor, extra_tables)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def scenarios(db_name: str, rows: int, csv_dir: str) -> dict:
+    """Tool calls to measure; each takes a per-call random generator and returns the tool's JSON response"""
+    import tools
+
+    users = max(1, rows // 4)
+    counter = iter(range(sys.maxsize))
+    counter_lock = threading.Lock()
+
+    def csv_path():
+        with counter_lock:
+            return os.path.join(csv_dir, f"export_{next(counter)}.csv")
+
+    def query_to_csv(rng):
+        path = csv_path()
+        start = rng.randint(1, max(1, rows - 1000))
+        try:
+            return tools.query_to_csv(f"SELECT * FROM {ORDERS_TABLE} WHERE id BETWEEN %s AND %s", path,
+                                      f"{start},{start + 999}", db_name)
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    return {
+        "query_database": lambda rng: tools.query_database(
+            f"SELECT id, amount, created_at FROM {ORDERS_TABLE} WHERE user_id = %s", str(rng.randint(1, users)),
+            db_name),
+        "execute_sql": lambda rng: tools.execute_sql(
+            f"UPDATE {USERS_TABLE} SET score = score + 1 WHERE id = %s", str(rng.randint(1, users)), db_name),
+        "query_to_csv": query_to_csv,
+        "list_tables": lambda rng: tools.list_tables(db_name),
+        "describe_table": lambda rng: tools.describe_table(ORDERS_TABLE, db_name),
+    }
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def measure(call, requests: int, concurrency: int, seed_value: int) -> dict:
+    """Run `requests` calls spread over `concurrency` threads; a response with an "error" key counts as failed"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(seed_value + index)
+        start = time.perf_counter()
+        try:
+            failed = "error" in json.loads(call(rng))
+        except Exception:
+            failed = True
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if failed:
+                errors.append(index)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(requests)))
+    duration = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    return {
+        "requests": requests,
+        "errors": len(errors),
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(requests / duration, 1) if duration > 0 else None,
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def compare(previous: dict, current: dict) -> None:
+    print(f"\nCompared with {previous.get('timestamp', 'previous run')} ({previous.get('revision') or 'unknown'})")
+    print(f"{'tool':<16} {'rps':>10} {'change':>8} {'p99 ms':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old:
+            print(f"{name:<16} {'new':>10}")
+            continue
+        rps_change = (result["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else 0
+        p99_change = (result["p99_ms"] / old["p99_ms"] - 1) * 100 if old["p99_ms"] else 0
+        print(f"{name:<16} {result['throughput_rps']:>10.1f} {rps_change:>+7.1f}% "
+              f"{result['p99_ms']:>10.2f} {p99_change:>+7.1f}%")
+
+
+def _revision() -> str:
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--server", choices=("local", "existing"), default="local",
+                        help="start a temp mysqld/mariadbd (default) or use a configured database")
+    parser.add_argument("--db", default="default", help="configured database to use with --server existing")
+    parser.add_argument("--rows", type=int, default=100000, help="rows in the orders table (users get a quarter)")
+    parser.add_argument("--extra-tables", type=int, default=50, help="empty tables created for list_tables")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000, help="calls per tool")
+    parser.add_argument("--tools", default="", help="comma-separated subset of tools to measure")
+    parser.add_argument("--output", default="", help="write results as JSON to this file")
+    parser.add_argument("--compare", default="", help="earlier JSON results to compare against")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark tables (existing server only)")
+    args = parser.parse_args()
+
+    server = None
+    db_name = args.db
+    if args.server == "local":
+        server = LocalServer()
+        try:
+            server.start()
+        except BaseException:
+            server.stop()
+            raise
+        # database.py reads its configuration at import, so point it at the temp server first
+        db_name = BENCH_DB
+        os.environ.update({
+            'DB_CONFIG_BENCH_HOST': '127.0.0.1',
+            'DB_CONFIG_BENCH_PORT': str(server.port),
+            'DB_CONFIG_BENCH_USER': 'bench',
+            'DB_CONFIG_BENCH_PASS': 'bench',
+            'DB_CONFIG_BENCH_NAME': BENCH_DB,
+            'DB_CONFIG_BENCH_POOL_SIZE': str(args.concurrency),
+        })
+
+    csv_dir = tempfile.mkdtemp(prefix='mcp-bench-csv-')
+    try:
+        seed_start = time.perf_counter()
+        seed(db_name, args.rows, args.extra_tables)
+        seed_seconds = time.perf_counter() - seed_start
+
+        from database import get_db_connection
+        connection = get_db_connection(db_name)
+        server_version = connection.get_server_info()
+        connection.close()
+
+        selected = [t.strip() for t in args.tools.split(',') if t.strip()]
+        calls = scenarios(db_name, args.rows, csv_dir)
+        unknown = [t for t in selected if t not in calls]
+        if unknown:
+            raise SystemExit(f"Unknown tool(s): {', '.join(unknown)}. Choose from: {', '.join(calls)}")
+
+        results = {}
+        print(f"{args.rows} rows, {args.concurrency} concurrent callers, {args.requests} calls per tool "
+              f"on {server_version} (seeded in {seed_seconds:.1f}s)")
+        print(f"{'tool':<16} {'rps':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'errors':>8}")
+        for name, call in calls.items():
+            if selected and name not in selected:
+                continue
+            # Warm up pools, the schema catalog and prepared statements before measuring
+            measure(call, min(args.requests, args.concurrency * 2), args.concurrency, 0)
+            result = measure(call, args.requests, args.concurrency, 1000)
+            results[name] = result
+            print(f"{name:<16} {result['throughput_rps']:>10.1f} {result['p50_ms']:>10.2f} "
+                  f"{result['p95_ms']:>10.2f} {result['p99_ms']:>10.2f} {result['errors']:>8}")
+
+        report = {
+            "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+            "revision": _revision(),
+            "python": platform.python_version(),
+            "server_version": server_version,
+            "settings": {
+                "server": args.server,
+                "rows": args.rows,
+                "extra_tables": args.extra_tables,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+            },
+            "seed_seconds": round(seed_seconds, 2),
+            "results": results,
+        }
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"\nResults written to {args.output}")
+        if args.compare:
+            with open(args.compare, encoding='utf-8') as f:
+                compare(json.load(f), report)
+    finally:
+        shutil.rmtree(csv_dir, ignore_errors=True)
+        if server is not None:
+            server.stop()
+        elif not args.keep:
+            cleanup(db_name, args.extra_tables)
+
+
+if __name__ == "__main__":
+    main()
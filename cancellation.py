@@ -0,0 +1,175 @@
+# cancellation.py
+import contextvars
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import mysql.connector
+from mysql.connector import Error, errors
+
+# Seconds the watchdog waits past a SELECT's MAX_EXECUTION_TIME before killing it itself
+KILL_GRACE = float(os.getenv('DB_KILL_GRACE', '1'))
+
+# Connect timeout for the separate connection that issues KILL QUERY
+KILL_CONNECT_TIMEOUT = 5
+
+# Server error raised when MAX_EXECUTION_TIME is exceeded
+MAX_EXECUTION_TIME_EXCEEDED = 3024
+
+# A top-level SELECT that does not already carry optimizer hints
+_HINTABLE_SELECT = re.compile(r"^(\s*SELECT\b)(?!\s*/\*\+)", re.IGNORECASE)
+
+_call_timeout = contextvars.ContextVar('query_timeout', default=0.0)
+_current_scope = contextvars.ContextVar('cancel_scope', default=None)
+_call_deadline = contextvars.ContextVar('call_deadline', default=None)  # time.monotonic() value, or None
+
+
+class _RunningStatement:
+    """A statement in flight on a pooled connection, killable from another thread"""
+
+    def __init__(self, connection, connect_args: Dict[str, Any]):
+        self.connection_id = connection.connection_id
+        self.connect_args = connect_args
+        self.lock = threading.Lock()
+        self.active = True
+        self.killed = None  # "timeout" or "cancelled" once KILL QUERY was sent
+
+    def kill(self, reason: str) -> None:
+        """Send KILL QUERY for this statement over a separate connection, unless it already finished"""
+        # Holding the lock keeps the statement's connection checked out until the kill is delivered,
+        # so it can never hit a query another caller started on the same connection
+        with self.lock:
+            if not self.active or self.killed:
+                return
+            self.killed = reason
+            try:
+                connection = mysql.connector.connect(**dict(self.connect_args, connection_timeout=KILL_CONNECT_TIMEOUT))
+                try:
+                    cursor = connection.cursor()
+                    cursor.execute(f"KILL QUERY {int(self.connection_id)}")
+                    cursor.close()
+                finally:
+                    connection.close()
+            except Error:
+                pass
+
+    def finish(self) -> None:
+        with self.lock:
+            self.active = False
+
+
+class CancelScope:
+    """Statements run on behalf of one tool call, killed together when the call is cancelled"""
+
+    def __init__(self):
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._running = set()
+
+    def add(self, statement: _RunningStatement) -> None:
+        with self._lock:
+            if self.cancelled:
+                raise errors.OperationalError(msg="Query cancelled by the client")
+            self._running.add(statement)
+
+    def discard(self, statement: _RunningStatement) -> None:
+        with self._lock:
+            self._running.discard(statement)
+
+    def cancel(self) -> None:
+        """Mark the call cancelled and kill its running statements"""
+        with self._lock:
+            self.cancelled = True
+            running = list(self._running)
+        for statement in running:
+            statement.kill("cancelled")
+
+
+def enter_scope(scope: CancelScope) -> None:
+    """Make `scope` the cancel scope of the current context"""
+    _current_scope.set(scope)
+
+
+@contextmanager
+def query_timeout(seconds: float):
+    """Apply a statement timeout to queries run in this block; 0 keeps the database's default"""
+    token = _call_timeout.set(seconds) if seconds and seconds > 0 else None
+    try:
+        yield
+    finally:
+        if token is not None:
+            _call_timeout.reset(token)
+
+
+@contextmanager
+def call_deadline(seconds: float):
+    """Bound waits for pool connections and admission slots in this block to `seconds` from now"""
+    token = _call_deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _call_deadline.reset(token)
+
+
+def remaining_wait(default: float) -> float:
+    """Return how long a wait may take: `default`, or less when the current call's deadline is nearer"""
+    deadline = _call_deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, min(default, deadline - time.monotonic()))
+
+
+def effective_timeout(default: float) -> float:
+    """Return the per-call timeout if one is set, otherwise the database default"""
+    return _call_timeout.get() or default
+
+
+def add_execution_hint(query: str, timeout: float) -> Optional[str]:
+    """Add a MAX_EXECUTION_TIME hint to a top-level SELECT; returns None for other statements"""
+    if not _HINTABLE_SELECT.match(query):
+        return None
+    milliseconds = max(1, int(timeout * 1000))
+    return _HINTABLE_SELECT.sub(rf"\1 /*+ MAX_EXECUTION_TIME({milliseconds}) */", query, count=1)
+
+
+@contextmanager
+def guard_statement(connection, query: str, connect_args: Dict[str, Any], timeout: float = 0.0):
+    """
+    Run a statement under a timeout and the current call's cancel scope.
+
+    Yields the SQL to execute. SELECTs carry a MAX_EXECUTION_TIME hint so the server stops them itself;
+    a watchdog sends KILL QUERY for statements still running after the timeout (plus a grace period for
+    hinted SELECTs). Killed statements raise OperationalError so the connection is not reused.
+    """
+    timeout = effective_timeout(timeout)
+    statement = _RunningStatement(connection, connect_args)
+    scope = _current_scope.get()
+    if scope is not None:
+        scope.add(statement)
+
+    watchdog = None
+    sql = query
+    if timeout > 0:
+        hinted = add_execution_hint(query, timeout)
+        sql = hinted or query
+        watchdog = threading.Timer(timeout + KILL_GRACE if hinted else timeout, statement.kill, ("timeout",))
+        watchdog.daemon = True
+        watchdog.start()
+
+    try:
+        yield sql
+    except Error as e:
+        if statement.killed == "cancelled":
+            raise errors.OperationalError(msg="Query cancelled by the client") from e
+        if statement.killed == "timeout" or getattr(e, 'errno', None) == MAX_EXECUTION_TIME_EXCEEDED:
+            raise errors.OperationalError(msg=f"Query exceeded the {timeout:g}s timeout and was killed") from e
+        raise
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+        statement.finish()
+        if scope is not None:
+            scope.discard(statement)
@@ -0,0 +1,239 @@
+# config.py
+import json
+import os
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Load environment variables once, before any module reads its settings
+load_dotenv()
+
+# Optional TOML or JSON file of database configurations, checked for changes every DB_RELOAD_INTERVAL seconds
+CONFIG_FILE = os.getenv('DB_CONFIG_FILE', '')
+CONFIG_RELOAD_INTERVAL = float(os.getenv('DB_RELOAD_INTERVAL', '5'))
+
+ENV_PREFIX = 'DB_CONFIG_'
+
+# DB_CONFIG_<name>_<suffix> environment variables and the configuration keys they set
+ENV_SUFFIXES = {
+    'HOST': 'host',
+    'NAME': 'database',
+    'USER': 'user',
+    'PASS': 'password',
+    'PORT': 'port',
+    'POOL_SIZE': 'pool_size',
+    'POOL_TIMEOUT': 'pool_timeout',
+    'POOL_MAX_LIFETIME': 'pool_max_lifetime',
+    'CACHE_TTL': 'cache_ttl',
+    'MAX_ROWS': 'max_rows',
+    'MAX_BYTES': 'max_bytes',
+    'MAX_EXAMINED_ROWS': 'max_examined_rows',
+    'COST_GUARD_MODE': 'cost_guard_mode',
+    'QUERY_TIMEOUT': 'query_timeout',
+    'REPLICAS': 'replicas',
+    'MAX_REPLICA_LAG': 'max_replica_lag',
+    'MAX_CONCURRENT_READS': 'max_concurrent_reads',
+    'MAX_CONCURRENT_WRITES': 'max_concurrent_writes',
+    'ADMISSION_QUEUE': 'admission_queue',
+    'ADMISSION_TIMEOUT': 'admission_timeout',
+}
+
+# Settings of the default database, which has no DB_CONFIG_ prefix
+DEFAULT_ENV_KEYS = {
+    'DB_HOST': 'host',
+    'DB_NAME': 'database',
+    'DB_USER': 'user',
+    'DB_PASS': 'password',
+    'DB_PORT': 'port',
+    'DB_REPLICAS': 'replicas',
+}
+
+
+def read_config_file(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Read database entries from a TOML or JSON file.
+
+    Entries live under a "databases" table (or at the top level) keyed by database name, with the same
+    keys as DB_CONFIGS entries, e.g. [databases.tenant1] host = "10.0.0.5" port = 3306 database = "t1".
+    """
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise Exception("TOML config files need Python 3.11+ or tomli (pip install tomli)")
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+    entries = data.get('databases', data) if isinstance(data, dict) else None
+    if not isinstance(entries, dict):
+        raise Exception(f"Config file '{path}' must contain a table of databases")
+    for name, entry in entries.items():
+        if not isinstance(entry, dict):
+            raise Exception(f"Database '{name}' in '{path}' must be a table of settings")
+    return {name.lower(): dict(entry) for name, entry in entries.items()}
+
+
+class ConfigRegistry(Mapping):
+    """
+    Database configurations by name, each parsed and validated on first use.
+
+    Entries come from the config file (which wins), DB_CONFIG_<name>_* environment variables, and the
+    DB_* variables for "default". Nothing is scanned at startup: a lookup reads only the variables of the
+    requested name, and the environment is scanned for names only when all configurations are listed.
+    The config file is checked for changes at most every reload interval; entries that changed are
+    parsed again and reported to listeners, unchanged entries are kept as they are.
+    """
+
+    def __init__(self, build: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+                 config_file: str = CONFIG_FILE, reload_interval: float = CONFIG_RELOAD_INTERVAL):
+        self._build = build
+        self.config_file = os.path.abspath(config_file) if config_file else ''
+        self.reload_interval = reload_interval
+
+        self._lock = threading.RLock()
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._file_entries: Dict[str, Dict[str, Any]] = {}
+        self._file_mtime: Optional[int] = None
+        self._next_check = 0.0
+        self._env_names: Optional[List[str]] = None
+        self._listeners: List[Callable[[List[str]], None]] = []
+
+        self._reloads = 0
+        self._reload_error: Optional[str] = None
+
+    def add_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """Call listener with the names of entries that changed or disappeared on each reload"""
+        self._listeners.append(listener)
+
+    def _env_entry(self, name: str) -> Optional[Dict[str, Any]]:
+        if name == 'default':
+            return {key: os.environ[env] for env, key in DEFAULT_ENV_KEYS.items() if env in os.environ}
+        for prefix in dict.fromkeys((name.upper(), name)):
+            entry = {
+                key: os.environ[f"{ENV_PREFIX}{prefix}_{suffix}"]
+                for suffix, key in ENV_SUFFIXES.items() if f"{ENV_PREFIX}{prefix}_{suffix}" in os.environ
+            }
+            if entry:
+                return entry
+        return None
+
+    def _raw(self, name: str) -> Optional[Dict[str, Any]]:
+        if name in self._file_entries:
+            return self._file_entries[name]
+        return self._env_entry(name)
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        # Names are case-insensitive, as they are when read from the environment or the config file
+        name = name.lower()
+        self._check_file()
+        with self._lock:
+            config = self._configs.get(name)
+            if config is None:
+                raw = self._raw(name)
+                if raw is None:
+                    raise KeyError(name)
+                config = self._build(name, raw)
+                self._configs[name] = config
+            return config
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        name = name.lower()
+        self._check_file()
+        with self._lock:
+            return name in self._configs or self._raw(name) is not None
+
+    def _scan_env_names(self) -> List[str]:
+        if self._env_names is None:
+            names = set()
+            for key in os.environ:
+                if key.startswith(ENV_PREFIX):
+                    name, _, suffix = key[len(ENV_PREFIX):].partition('_')
+                    if name and suffix in ENV_SUFFIXES:
+                        names.add(name.lower())
+            self._env_names = sorted(names)
+        return self._env_names
+
+    def names(self) -> List[str]:
+        """All configured database names: default first, then the config file's, then the environment's"""
+        self._check_file()
+        with self._lock:
+            return list(dict.fromkeys(['default'] + list(self._file_entries) + self._scan_env_names()))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+    def loaded(self) -> Dict[str, Dict[str, Any]]:
+        """Entries parsed so far, without parsing the others"""
+        with self._lock:
+            return dict(self._configs)
+
+    def _check_file(self) -> None:
+        if not self.config_file or time.monotonic() < self._next_check:
+            return
+        self.reload()
+
+    def reload(self) -> List[str]:
+        """Re-read the config file if it changed; returns the names of entries that changed"""
+        if not self.config_file:
+            return []
+        with self._lock:
+            self._next_check = time.monotonic() + self.reload_interval
+            try:
+                mtime = os.stat(self.config_file).st_mtime_ns
+                if mtime == self._file_mtime:
+                    return []
+                entries = read_config_file(self.config_file)
+            except Exception as e:
+                if self._file_mtime is None:
+                    # Nothing loaded yet: fail loudly, on every call, rather than run without the file's databases
+                    self._next_check = 0.0
+                    raise Exception(f"Could not load config file '{self.config_file}': {str(e)}")
+                # Keep serving the last good configuration until the file is fixed
+                self._reload_error = str(e)
+                return []
+
+            changed = [
+                name for name in set(entries) | set(self._file_entries)
+                if entries.get(name) != self._file_entries.get(name)
+            ]
+            first_load = self._file_mtime is None
+            self._file_entries = entries
+            self._file_mtime = mtime
+            self._reload_error = None
+            for name in changed:
+                self._configs.pop(name, None)
+            if not first_load:
+                self._reloads += 1
+
+        if changed and not first_load:
+            for listener in self._listeners:
+                listener(sorted(changed))
+        return sorted(changed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "config_file": self.config_file or None,
+                "file_entries": len(self._file_entries),
+                "loaded": sorted(self._configs),
+                "reloads": self._reloads,
+                "reload_error": self._reload_error,
+                "reload_interval": self.reload_interval
+            }
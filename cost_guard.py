@@ -0,0 +1,145 @@
+# cost_guard.py
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from database import COST_GUARD_LIMIT_ROWS, DB_CONFIGS, execute_query, get_database_info
+from sql_utils import normalize_sql, statement_type, strip_literals
+
+# Cached EXPLAIN results, keyed by database and normalized SQL
+PLAN_CACHE_SIZE = int(os.getenv('DB_PLAN_CACHE_SIZE', '1000'))
+PLAN_CACHE_TTL = float(os.getenv('DB_PLAN_CACHE_TTL', '300'))
+
+# Guard actions for queries over budget
+GUARD_MODES = ('reject', 'limit')
+
+# Queries that can only stop early when they have none of these clauses
+_NOT_STOPPABLE = re.compile(
+    r"\bORDER\s+BY\b|\bGROUP\s+BY\b|\bDISTINCT\b|\bHAVING\b|\bUNION\b|\bOVER\b|"
+    r"\b(?:COUNT|SUM|AVG|MIN|MAX|GROUP_CONCAT|STD|STDDEV|VARIANCE)\s*\(",
+    re.IGNORECASE
+)
+
+_plans = OrderedDict()  # (db_name, normalized sql) -> (estimate, expires_at)
+_plans_lock = threading.Lock()
+
+
+def _forget_plans(db_names: List[str]) -> None:
+    """Drop cached plans of databases whose configuration changed"""
+    with _plans_lock:
+        for key in [key for key in _plans if key[0] in db_names]:
+            del _plans[key]
+
+
+DB_CONFIGS.add_listener(_forget_plans)
+
+
+def _table_rows(table: Dict[str, Any]) -> float:
+    # MySQL reports rows_examined_per_scan, MariaDB reports rows
+    for key in ('rows_examined_per_scan', 'rows'):
+        if key in table:
+            return float(table[key])
+    return 0.0
+
+
+def _walk(node: Any, prefix: float) -> float:
+    """Sum rows examined over a plan tree; each nested-loop table is scanned once per prefix row"""
+    if isinstance(node, list):
+        return sum(_walk(item, prefix) for item in node)
+    if not isinstance(node, dict):
+        return 0.0
+
+    total = 0.0
+    for key, value in node.items():
+        if key == 'nested_loop' and isinstance(value, list):
+            rows = prefix
+            for item in value:
+                table = item.get('table', {}) if isinstance(item, dict) else {}
+                scan = _table_rows(table)
+                total += rows * scan
+                total += _walk(table, 1.0)
+                produced = table.get('rows_produced_per_join')
+                if produced is not None:
+                    rows = float(produced)
+                else:
+                    rows = rows * scan * float(table.get('filtered', 100)) / 100
+        elif key == 'table' and isinstance(value, dict):
+            total += prefix * _table_rows(value)
+            total += _walk(value, 1.0)
+        elif isinstance(value, (dict, list)):
+            total += _walk(value, prefix)
+    return total
+
+
+def estimate_plan(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Estimate rows examined and read the optimizer cost from an EXPLAIN FORMAT=JSON document"""
+    query_block = plan.get('query_block', {})
+    cost = query_block.get('cost_info', {}).get('query_cost')
+    return {
+        "estimated_rows_examined": int(_walk(plan, 1.0)),
+        "query_cost": float(cost) if cost is not None else None
+    }
+
+
+def explain(sql: str, params: Optional[tuple], db_name: str) -> Dict[str, Any]:
+    """Run EXPLAIN FORMAT=JSON for a query, reusing cached plans for the same normalized SQL"""
+    key = (db_name, normalize_sql(sql))
+    now = time.monotonic()
+    with _plans_lock:
+        entry = _plans.get(key)
+        if entry is not None and entry[1] > now:
+            _plans.move_to_end(key)
+            return dict(entry[0], cached=True)
+
+    # Explain the query as written; the normalized text is only a cache key and may have comments run into code
+    rows = execute_query(f"EXPLAIN FORMAT=JSON {sql}", params, db_name)
+    if not rows:
+        raise Exception("EXPLAIN returned no plan")
+    estimate = estimate_plan(json.loads(next(iter(rows[0].values()))))
+
+    with _plans_lock:
+        _plans[key] = (estimate, now + PLAN_CACHE_TTL)
+        _plans.move_to_end(key)
+        while len(_plans) > PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return dict(estimate, cached=False)
+
+
+def can_stop_early(sql: str) -> bool:
+    """Check whether a LIMIT stops the scan early (no sorting, grouping or aggregation)"""
+    return not _NOT_STOPPABLE.search(strip_literals(sql))
+
+
+def check_query_cost(sql: str, params: Optional[tuple], db_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Pre-flight a SELECT against the database's examined-rows budget.
+
+    Returns None when the guard is disabled or does not apply, otherwise the estimate and the action
+    taken: "allow", or "limit" with the reduced max_rows the query must run with. Raises when rejected.
+    """
+    config = get_database_info(db_name)
+    budget = config.get('max_examined_rows', 0)
+    if budget <= 0 or statement_type(sql) not in ('SELECT', 'WITH'):
+        return None
+
+    estimate = explain(sql, params, db_name)
+    result = dict(estimate, budget=budget, action="allow")
+    if estimate["estimated_rows_examined"] <= budget:
+        return result
+
+    mode = config.get('cost_guard_mode', 'reject')
+    if mode not in GUARD_MODES:
+        raise Exception(f"Unsupported cost guard mode '{mode}'. Use one of: {', '.join(GUARD_MODES)}")
+    if mode == 'limit' and can_stop_early(sql):
+        result.update(action="limit", max_rows=COST_GUARD_LIMIT_ROWS)
+        return result
+
+    raise Exception(
+        f"Query rejected by cost guard: an estimated {estimate['estimated_rows_examined']} rows would be "
+        f"examined, over the budget of {budget} for '{db_name}'. Add selective WHERE conditions on indexed "
+        f"columns or a LIMIT."
+    )
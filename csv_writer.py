@@ -0,0 +1,89 @@
+# csv_writer.py
+import datetime
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+from mysql.connector.constants import FieldFlag, FieldType
+
+from encoding import encode_value
+
+# csv.writer renders ints, floats, Decimal, str and dates like str() and None as '', all in C;
+# only these column types need a converter
+_BINARY_STRING_TYPES = {FieldType.TINY_BLOB, FieldType.MEDIUM_BLOB, FieldType.LONG_BLOB, FieldType.BLOB,
+                        FieldType.VAR_STRING, FieldType.STRING, FieldType.VARCHAR}
+
+
+# Character set number the server reports for binary strings
+BINARY_CHARSET = 63
+
+
+def is_binary_column(column: Tuple) -> bool:
+    """Check from a cursor description entry whether a string or BLOB column holds bytes rather than text"""
+    if column[1] not in _BINARY_STRING_TYPES:
+        return False
+    charset = column[8] if len(column) > 8 else None
+    if charset is not None:
+        return charset == BINARY_CHARSET
+    flags = column[7] if len(column) > 7 else 0
+    return bool(flags & FieldFlag.BINARY)
+
+
+def _decode(value: Any) -> Any:
+    # Binary values that are not UTF-8 text are written as 0x-prefixed hex, which MySQL reads back as a literal
+    if isinstance(value, (bytes, bytearray)):
+        try:
+            return value.decode('utf-8')
+        except UnicodeDecodeError:
+            return '0x' + value.hex()
+    return value
+
+
+def _format_time(value: Any) -> Any:
+    # MySQL TIME values arrive as timedelta; render them as [-]HH:MM:SS[.ffffff] rather than "1 day, 2:00:00"
+    return encode_value(value) if isinstance(value, datetime.timedelta) else value
+
+
+def _format_set(value: Any) -> Any:
+    return ','.join(sorted(value)) if isinstance(value, set) else value
+
+
+def _column_converter(column: Tuple) -> Optional[Callable[[Any], Any]]:
+    """Pick the converter for one cursor description entry, or None when csv.writer can take values as is"""
+    type_code = column[1]
+    if type_code == FieldType.TIME:
+        return _format_time
+    if type_code == FieldType.SET:
+        return _format_set
+    if type_code in (FieldType.GEOMETRY, FieldType.JSON) or is_binary_column(column):
+        return _decode
+    return None
+
+
+def row_converter(description: Sequence[Tuple]) -> Optional[Callable[[Sequence[Any]], List[Any]]]:
+    """
+    Work out once, from the cursor description, how to turn result tuples into CSV rows.
+
+    Returns None when every column can be written as is, so rows go to csv.writer without any per-row
+    Python work; otherwise a function converting only the columns that need it.
+    """
+    converters = [(index, converter) for index, converter in
+                  ((i, _column_converter(column)) for i, column in enumerate(description)) if converter]
+    if not converters:
+        return None
+
+    def convert(row: Sequence[Any]) -> List[Any]:
+        row = list(row)
+        for index, converter in converters:
+            value = row[index]
+            if value is not None:
+                row[index] = converter(value)
+        return row
+    return convert
+
+
+def write_header(writer, description: Sequence[Tuple]) -> None:
+    writer.writerow([column[0] for column in description])
+
+
+def write_rows(writer, rows: Iterable[Sequence[Any]], convert: Optional[Callable] = None) -> None:
+    """Write a batch of result tuples with csv.writer, applying the row converter if there is one"""
+    writer.writerows(rows if convert is None else map(convert, rows))
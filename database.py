@@ -1,74 +1,396 @@
 # database.py
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errors
 import os
-import json
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Multiple database configurations
-DB_CONFIGS = {
-    'default': {
-        'host': os.getenv('DB_HOST', '0.0.0.0'),
-        'database': os.getenv('DB_NAME', 'rc'),
-        'user': os.getenv('DB_USER', 'root'),
-        'password': os.getenv('DB_PASS', 'root@1345'),
-        'port': int(os.getenv('DB_PORT', '3306')),
-        'autocommit': True
-    }
-}
-
-# Load additional database configurations from environment variables
-# Format: DB_CONFIG_<name>_HOST, DB_CONFIG_<name>_PORT, etc.
-def load_additional_db_configs():
-    """Load additional database configurations from environment variables"""
-    configs = {}
-    env_vars = os.environ
-    
-    # Find all database configuration prefixes
-    db_prefixes = set()
-    for key in env_vars.keys():
-        if key.startswith('DB_CONFIG_') and '_' in key[10:]:
-            prefix = key.split('_')[2]  # Extract database name
-            db_prefixes.add(prefix)
-    
-    # Build configurations for each database
-    for db_name in db_prefixes:
-        config = {
-            'host': env_vars.get(f'DB_CONFIG_{db_name}_HOST', '0.0.0.0'),
-            'database': env_vars.get(f'DB_CONFIG_{db_name}_NAME', db_name.lower()),
-            'user': env_vars.get(f'DB_CONFIG_{db_name}_USER', 'root'),
-            'password': env_vars.get(f'DB_CONFIG_{db_name}_PASS', 'root@1345'),
-            'port': int(env_vars.get(f'DB_CONFIG_{db_name}_PORT', '3306')),
-            'autocommit': True
-        }
-        configs[db_name.lower()] = config
-    
-    return configs
+import threading
+import time
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from admission import (
+    DEFAULT_ADMISSION_QUEUE,
+    DEFAULT_ADMISSION_TIMEOUT,
+    DEFAULT_MAX_CONCURRENT_READS,
+    DEFAULT_MAX_CONCURRENT_WRITES,
+    AdmissionLane,
+    AdmittedPool,
+)
+from config import ConfigRegistry
+from pool import ConnectionPool
+from replicas import Replica, ReplicaSet
+from cancellation import CancelScope, enter_scope, guard_statement, remaining_wait
+from statement_cache import close_cursor, execute_statement, fetch_rows, get_statement_cache_stats
+from encoding import estimate_json_size
+from metrics import record_query
+from query_cache import QueryCache, estimate_size
+from sql_utils import is_cacheable_select, is_replica_safe, normalize_sql, quote_identifier, referenced_tables, write_target_tables
+
+# Connection pool defaults, overridable per database with DB_CONFIG_<name>_POOL_*
+DEFAULT_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DEFAULT_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DEFAULT_POOL_MAX_LIFETIME = float(os.getenv('DB_POOL_MAX_LIFETIME', '3600'))
+
+# Worker threads used to run blocking MySQL calls off the event loop
+DB_EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', '16'))
+
+# Rows fetched per round trip when streaming large results
+DEFAULT_STREAM_BATCH_SIZE = int(os.getenv('DB_STREAM_BATCH_SIZE', '1000'))
+
+# Rows still read off a stream closed before its end, so the connection can go back to the pool;
+# streams with more left over are dropped with their connection instead
+STREAM_DRAIN_ROWS = int(os.getenv('DB_STREAM_DRAIN_ROWS', '10000'))
+
+# Default result budget for query_database, overridable per database with DB_CONFIG_<name>_MAX_ROWS/_MAX_BYTES
+DEFAULT_MAX_ROWS = int(os.getenv('DB_MAX_ROWS', '10000'))
+DEFAULT_MAX_BYTES = int(os.getenv('DB_MAX_BYTES', str(10 * 1024 * 1024)))
+
+# Pre-flight EXPLAIN budget for query_database; 0 disables the cost guard.
+# Mode "reject" refuses queries over budget, "limit" runs them with a reduced row limit when a LIMIT stops the scan early
+DEFAULT_MAX_EXAMINED_ROWS = int(os.getenv('DB_MAX_EXAMINED_ROWS', '0'))
+DEFAULT_COST_GUARD_MODE = os.getenv('DB_COST_GUARD_MODE', 'reject')
+COST_GUARD_LIMIT_ROWS = int(os.getenv('DB_COST_GUARD_LIMIT_ROWS', '1000'))
+
+# Statement timeout in seconds (0 disables), overridable per database with DB_CONFIG_<name>_QUERY_TIMEOUT
+DEFAULT_QUERY_TIMEOUT = float(os.getenv('DB_QUERY_TIMEOUT', '0'))
+
+# Read replicas as comma-separated host[:port] lists (DB_REPLICAS, DB_CONFIG_<name>_REPLICAS); reads fall back
+# to the primary when a replica lags more than the max lag in seconds (0 disables lag checks)
+DEFAULT_MAX_REPLICA_LAG = float(os.getenv('DB_MAX_REPLICA_LAG', '0'))
+
+# Parameter rows per executemany call in batch writes
+DEFAULT_BATCH_CHUNK_SIZE = int(os.getenv('DB_BATCH_CHUNK_SIZE', '1000'))
+
+# Server/client errors meaning LOAD DATA LOCAL INFILE is not permitted
+LOCAL_INFILE_DISABLED_ERRORS = (1148, 2068, 3948, 3950)
+
+# Result cache for read-only queries; a TTL of 0 disables caching for that database
+DEFAULT_CACHE_TTL = float(os.getenv('DB_CACHE_TTL', '0'))
+CACHE_MAX_BYTES = int(os.getenv('DB_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# Keys in DB_CONFIGS entries that configure this server rather than the MySQL connection
+SERVER_OPTION_KEYS = ('pool_size', 'pool_timeout', 'pool_max_lifetime', 'cache_ttl', 'max_rows', 'max_bytes',
+                      'max_examined_rows', 'cost_guard_mode', 'query_timeout',
+                      'replicas', 'max_replica_lag', 'max_concurrent_reads', 'max_concurrent_writes',
+                      'admission_queue', 'admission_timeout')
+
+
+
+def parse_replicas(value: str, default_port: int = 3306) -> List[Dict[str, Any]]:
+    """Parse a comma-separated host[:port] replica list"""
+    replicas = []
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.partition(':')
+        replicas.append({'host': host, 'port': int(port) if port else default_port})
+    return replicas
+
+
+def _option(db_name: str, raw: Dict[str, Any], key: str, convert: Callable[[Any], Any], default: Any) -> Any:
+    value = raw.get(key)
+    if value is None or value == '':
+        return default
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        raise Exception(f"Invalid {key} '{value}' in database configuration '{db_name}'")
+
+
+def _replicas(db_name: str, value: Any, default_port: int) -> List[Dict[str, Any]]:
+    """Replicas from an environment string, or a config file list of "host:port" strings or host/port tables"""
+    try:
+        if not value:
+            return []
+        if isinstance(value, str):
+            return parse_replicas(value, default_port)
+        return [
+            parse_replicas(item, default_port)[0] if isinstance(item, str)
+            else {'host': str(item['host']), 'port': int(item.get('port', default_port))}
+            for item in value
+        ]
+    except (TypeError, ValueError, KeyError, IndexError):
+        raise Exception(f"Invalid replicas '{value}' in database configuration '{db_name}'")
+
+
+def build_db_config(db_name: str, raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one database entry and fill in defaults; keys the server does not know are passed to the connector"""
+    port = _option(db_name, raw, 'port', int, 3306)
+    config = dict(raw)
+    config.update({
+        'host': str(raw.get('host', '0.0.0.0')),
+        'database': str(raw.get('database', 'rc' if db_name == 'default' else db_name)),
+        'user': str(raw.get('user', 'root')),
+        'password': str(raw.get('password', 'root@1345')),
+        'port': port,
+        'autocommit': True,
+        'pool_size': _option(db_name, raw, 'pool_size', int, DEFAULT_POOL_SIZE),
+        'pool_timeout': _option(db_name, raw, 'pool_timeout', float, DEFAULT_POOL_TIMEOUT),
+        'pool_max_lifetime': _option(db_name, raw, 'pool_max_lifetime', float, DEFAULT_POOL_MAX_LIFETIME),
+        'cache_ttl': _option(db_name, raw, 'cache_ttl', float, DEFAULT_CACHE_TTL),
+        'max_rows': _option(db_name, raw, 'max_rows', int, DEFAULT_MAX_ROWS),
+        'max_bytes': _option(db_name, raw, 'max_bytes', int, DEFAULT_MAX_BYTES),
+        'max_examined_rows': _option(db_name, raw, 'max_examined_rows', int, DEFAULT_MAX_EXAMINED_ROWS),
+        'cost_guard_mode': str(raw.get('cost_guard_mode') or DEFAULT_COST_GUARD_MODE),
+        'query_timeout': _option(db_name, raw, 'query_timeout', float, DEFAULT_QUERY_TIMEOUT),
+        'replicas': _replicas(db_name, raw.get('replicas'), port),
+        'max_replica_lag': _option(db_name, raw, 'max_replica_lag', float, DEFAULT_MAX_REPLICA_LAG),
+        'max_concurrent_reads': _option(db_name, raw, 'max_concurrent_reads', int, DEFAULT_MAX_CONCURRENT_READS),
+        'max_concurrent_writes': _option(db_name, raw, 'max_concurrent_writes', int, DEFAULT_MAX_CONCURRENT_WRITES),
+        'admission_queue': _option(db_name, raw, 'admission_queue', int, DEFAULT_ADMISSION_QUEUE),
+        'admission_timeout': _option(db_name, raw, 'admission_timeout', float, DEFAULT_ADMISSION_TIMEOUT)
+    })
+    return config
+
+
+# Multiple database configurations, parsed on first use.
+# Sources: DB_* for "default", DB_CONFIG_<name>_HOST, DB_CONFIG_<name>_PORT, etc., and the DB_CONFIG_FILE file
+DB_CONFIGS = ConfigRegistry(build_db_config)
+
+
+def load_additional_db_configs() -> Dict[str, Dict[str, Any]]:
+    """Parse and return every configuration other than "default"; this reads all entries, so avoid it at startup"""
+    return {db_name: DB_CONFIGS[db_name] for db_name in DB_CONFIGS if db_name != 'default'}
 
-# Load all database configurations
-additional_configs = load_additional_db_configs()
-DB_CONFIGS.update(additional_configs)
 
 # Backward compatibility
 DB_CONFIG = DB_CONFIGS['default']
 
 
-def get_db_connection(db_name: str = 'default'):
-    """Create and return a database connection for the specified database"""
+# Connection pools, replica sets and admission lanes, created lazily on first use
+_pools: Dict[str, ConnectionPool] = {}
+_replica_sets: Dict[str, Optional[ReplicaSet]] = {}
+_admissions: Dict[str, Dict[str, AdmissionLane]] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_args(db_name: str = 'default') -> Dict[str, Any]:
+    """Get the mysql.connector arguments for the specified database"""
     if db_name not in DB_CONFIGS:
         raise Exception(f"Database configuration '{db_name}' not found. Available: {list(DB_CONFIGS.keys())}")
     
+    return {k: v for k, v in DB_CONFIGS[db_name].items() if k not in SERVER_OPTION_KEYS}
+
+
+def get_db_connection(db_name: str = 'default', connection_timeout: Optional[int] = None):
+    """Create and return a new, unpooled database connection for the specified database"""
+    connect_args = get_connection_args(db_name)
+    if connection_timeout is not None:
+        connect_args['connection_timeout'] = connection_timeout
+    
     try:
-        connection = mysql.connector.connect(**DB_CONFIGS[db_name])
+        connection = mysql.connector.connect(**connect_args)
         return connection
     except Error as e:
         raise Exception(f"Database connection failed for '{db_name}': {str(e)}")
 
 
+def get_pool(db_name: str = 'default') -> ConnectionPool:
+    """Get the connection pool for the specified database, creating it on first use"""
+    db_name = db_name.lower()  # one pool per database, however the name is spelled
+    pool = _pools.get(db_name)
+    if pool is not None:
+        return pool
+    
+    connect_args = get_connection_args(db_name)
+    config = DB_CONFIGS[db_name]
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = ConnectionPool(
+                db_name,
+                connect_args,
+                size=config.get('pool_size', DEFAULT_POOL_SIZE),
+                timeout=config.get('pool_timeout', DEFAULT_POOL_TIMEOUT),
+                max_lifetime=config.get('pool_max_lifetime', DEFAULT_POOL_MAX_LIFETIME)
+            )
+            _pools[db_name] = pool
+    return pool
+
+
+def get_replica_set(db_name: str = 'default') -> Optional[ReplicaSet]:
+    """Get the replica set for the specified database, or None if it has no replicas"""
+    db_name = db_name.lower()  # one pool per database, however the name is spelled
+    if db_name in _replica_sets:
+        return _replica_sets[db_name]
+    
+    connect_args = get_connection_args(db_name)
+    config = DB_CONFIGS[db_name]
+    with _pools_lock:
+        if db_name not in _replica_sets:
+            replicas = [
+                Replica(ConnectionPool(
+                    f"{db_name}@{replica['host']}:{replica['port']}",
+                    dict(connect_args, host=replica['host'], port=replica['port']),
+                    size=config.get('pool_size', DEFAULT_POOL_SIZE),
+                    timeout=config.get('pool_timeout', DEFAULT_POOL_TIMEOUT),
+                    max_lifetime=config.get('pool_max_lifetime', DEFAULT_POOL_MAX_LIFETIME)
+                ))
+                for replica in config.get('replicas', [])
+            ]
+            _replica_sets[db_name] = ReplicaSet(
+                db_name, replicas, config.get('max_replica_lag', DEFAULT_MAX_REPLICA_LAG)
+            ) if replicas else None
+    return _replica_sets[db_name]
+
+
+def get_admission(db_name: str = 'default') -> Dict[str, AdmissionLane]:
+    """Get the read and write admission lanes of a database, creating them on first use"""
+    db_name = db_name.lower()  # one pool per database, however the name is spelled
+    lanes = _admissions.get(db_name)
+    if lanes is not None:
+        return lanes
+    
+    get_connection_args(db_name)  # raises for unknown databases
+    config = DB_CONFIGS[db_name]
+    pool_size = config.get('pool_size', DEFAULT_POOL_SIZE)
+    with _pools_lock:
+        lanes = _admissions.get(db_name)
+        if lanes is None:
+            lanes = {
+                lane: AdmissionLane(
+                    f"{db_name} ({lane})",
+                    config.get(f'max_concurrent_{lane}s', 0) or pool_size,
+                    config.get('admission_queue', DEFAULT_ADMISSION_QUEUE),
+                    config.get('admission_timeout', DEFAULT_ADMISSION_TIMEOUT)
+                )
+                for lane in ('read', 'write')
+            }
+            _admissions[db_name] = lanes
+    return lanes
+
+
+def _on_config_change(db_names: List[str]) -> None:
+    """
+    Close the pools of databases whose configuration changed and drop their cached results; pools are
+    recreated from the new entry on next use. Prepared statements go with the pooled connections. Modules
+    with their own per-database caches (schema catalog, plans, profiles) register listeners of their own.
+    """
+    for db_name in db_names:
+        query_cache.invalidate_database(db_name)
+    with _pools_lock:
+        pools = [_pools.pop(db_name) for db_name in db_names if db_name in _pools]
+        replica_sets = [_replica_sets.pop(db_name) for db_name in db_names if db_name in _replica_sets]
+        # Calls holding a slot release it on their old lane
+        for db_name in db_names:
+            _admissions.pop(db_name, None)
+    for pool in pools:
+        pool.close()
+    for replica_set in replica_sets:
+        if replica_set is not None:
+            replica_set.close()
+
+
+DB_CONFIGS.add_listener(_on_config_change)
+
+
+def acquire_connection(db_name: str = 'default', read_only: bool = False,
+                       lane: Optional[str] = None) -> Tuple[AdmittedPool, Any]:
+    """Check out a connection, from a healthy replica for read-only work when the database has replicas
+
+    The call first waits for a slot in the database's read or write admission lane (by default "read"
+    when read_only, else "write"). Returns (pool, connection); give the connection back with pool.release,
+    which also frees the slot.
+    """
+    admission = get_admission(db_name)[lane or ('read' if read_only else 'write')]
+    admission.acquire(remaining_wait(admission.timeout))
+    try:
+        if read_only:
+            replica_set = get_replica_set(db_name)
+            if replica_set is not None:
+                pool, connection = replica_set.acquire()
+                if pool is not None:
+                    return AdmittedPool(pool, admission), connection
+        pool = get_pool(db_name)
+        return AdmittedPool(pool, admission), pool.acquire(timeout=remaining_wait(pool.timeout))
+    except BaseException:
+        admission.release()
+        raise
+
+
+@contextmanager
+def admitted(db_name: str = 'default', lane: str = 'read'):
+    """Hold a slot in a database's admission lane for work on a connection opened outside the pool"""
+    admission = get_admission(db_name)[lane]
+    admission.acquire(remaining_wait(admission.timeout))
+    try:
+        yield
+    finally:
+        admission.release()
+
+
+@contextmanager
+def pooled_connection(db_name: str = 'default', read_only: bool = False, lane: Optional[str] = None):
+    """Check out a connection from the pool and return it when the block exits
+
+    With read_only, the connection may come from a replica; writes and transactions must use the primary.
+    """
+    pool, connection = acquire_connection(db_name, read_only, lane)
+    discard = False
+    try:
+        yield connection
+    except (errors.InterfaceError, errors.OperationalError):
+        # The connection may be broken; do not hand it to the next caller
+        discard = True
+        raise
+    finally:
+        pool.release(connection, discard=discard)
+
+
+def guarded_statement(connection, query: str, db_name: str = 'default'):
+    """Run a statement under the database's query timeout and the current call's cancel scope; yields the SQL to execute"""
+    timeout = DB_CONFIGS[db_name].get('query_timeout', DEFAULT_QUERY_TIMEOUT)
+    # KILL QUERY must reach the server running the statement, which may be a replica
+    connect_args = dict(get_connection_args(db_name), host=connection.server_host, port=connection.server_port)
+    return guard_statement(connection, query, connect_args, timeout)
+
+
+query_cache = QueryCache(CACHE_MAX_BYTES)
+
+_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix='mysql-worker')
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking function on the bounded database worker pool without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    scope = CancelScope()
+    context = contextvars.copy_context()
+    context.run(enter_scope, scope)
+    try:
+        return await loop.run_in_executor(_executor, functools.partial(context.run, func, *args, **kwargs))
+    except asyncio.CancelledError:
+        # The worker thread cannot be interrupted; kill its running statement so it returns and frees its connection
+        threading.Thread(target=scope.cancel, name='mysql-cancel', daemon=True).start()
+        raise
+
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Get usage statistics for all connection pools created so far"""
+    return {db_name: pool.stats() for db_name, pool in list(_pools.items())}
+
+
+def get_admission_stats() -> Dict[str, Dict[str, Any]]:
+    """Get running, queued, rejected and wait-time figures of the admission lanes of each database used so far"""
+    return {
+        db_name: {lane: admission.stats() for lane, admission in lanes.items()}
+        for db_name, lanes in list(_admissions.items())
+    }
+
+
+def get_replica_stats() -> Dict[str, Dict[str, Any]]:
+    """Get health, lag and pool usage of the replicas of each database used so far"""
+    return {db_name: replica_set.stats() for db_name, replica_set in list(_replica_sets.items()) if replica_set}
+
+
+def get_config_stats() -> Dict[str, Any]:
+    """Get the config file, reload count and which database entries have been parsed"""
+    return DB_CONFIGS.stats()
+
+
 def get_available_databases() -> List[str]:
     """Get list of available database configurations"""
     return list(DB_CONFIGS.keys())
@@ -84,52 +406,339 @@ def get_database_info(db_name: str = 'default') -> Dict[str, Any]:
     return config
 
 
-def execute_query(query: str, params: Optional[tuple] = None, db_name: str = 'default') -> List[Dict[str, Any]]:
-    """Execute a SELECT query and return results as a list of dictionaries"""
-    connection = None
+def _result_cache_key(query: str, params: Any, db_name: str, *extra: Any) -> Optional[tuple]:
+    """Return the result cache key for a query, or None if it must not be cached"""
+    if db_name in DB_CONFIGS and DB_CONFIGS[db_name].get('cache_ttl', 0) > 0 and is_cacheable_select(query):
+        return (db_name, normalize_sql(query), repr(params)) + extra
+    return None
+
+
+def execute_query(query: str, params: Optional[tuple] = None, db_name: str = 'default',
+                  use_cache: bool = False) -> List[Dict[str, Any]]:
+    """Execute a SELECT query and return results as a list of dictionaries
+    
+    With use_cache, deterministic SELECTs are served from the result cache for the database's cache TTL.
+    Cached rows are shared between callers and must not be modified.
+    """
+    cache_key = _result_cache_key(query, params, db_name) if use_cache else None
+    if cache_key is not None:
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = query_cache.generation(db_name)
+    
+    phases = {}
+    start = time.perf_counter()
+    try:
+        with pooled_connection(db_name, read_only=is_replica_safe(query), lane='read') as connection:
+            phases["connect"] = time.perf_counter() - start
+            with guarded_statement(connection, query, db_name) as sql:
+                cursor = execute_statement(connection, sql, params, dictionary=True)
+                try:
+                    phases["execute"] = time.perf_counter() - start - phases["connect"]
+                    
+                    results = fetch_rows(cursor)
+                    phases["fetch"] = time.perf_counter() - start - phases["connect"] - phases["execute"]
+                finally:
+                    close_cursor(connection, cursor)
+    except Error as e:
+        raise Exception(f"Query execution failed on '{db_name}': {str(e)}")
+    finally:
+        # A call that failed before connecting still spent its time waiting for a connection
+        phases.setdefault("connect", time.perf_counter() - start)
+        record_query(db_name, query, phases, len(results) if "fetch" in phases else 0)
+    
+    if cache_key is not None:
+        query_cache.put(cache_key, results, DB_CONFIGS[db_name]['cache_ttl'], db_name,
+                        referenced_tables(query), generation)
+    return results
+
+
+def fetch_page(query: str, params: Optional[tuple] = None, db_name: str = 'default',
+               max_rows: int = DEFAULT_MAX_ROWS, max_bytes: int = DEFAULT_MAX_BYTES,
+               use_cache: bool = False,
+               source: Optional[Tuple[str, Optional[tuple], Dict[str, Any]]] = None) -> Tuple[List[Dict[str, Any]], bool]:
+    """Fetch rows of a SELECT until a row or byte budget is reached, then stop reading
+    
+    Returns (rows, truncated); truncated is True when more rows were available. At least one row is
+    returned even if it alone exceeds max_bytes.
+    
+    When query is one page of another query, source gives (sql, params, page state) of that query.
+    The result cache then decides cacheability and invalidating tables from the original SQL, and keys
+    the page on its state and budgets.
+    """
+    max_rows = max(1, max_rows)
+    cache_sql, cache_params, page = source if source is not None else (query, params, None)
+    cache_key = None
+    if use_cache:
+        cache_key = _result_cache_key(cache_sql, cache_params, db_name, repr(page), max_rows, max_bytes)
+    if cache_key is not None:
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = query_cache.generation(db_name)
+    
+    rows = []
+    size = 0
+    truncated = False
+    batches = stream_query(query, params, db_name, batch_size=min(max_rows + 1, DEFAULT_STREAM_BATCH_SIZE))
+    try:
+        for batch in batches:
+            for row in batch:
+                row_size = estimate_json_size(row)
+                if len(rows) >= max_rows or (rows and size + row_size > max_bytes):
+                    truncated = True
+                    break
+                rows.append(row)
+                size += row_size
+            if truncated:
+                break
+    finally:
+        # Closing early reads off a small remainder and pools the connection, or drops it for a large one
+        batches.close()
+    
+    if cache_key is not None:
+        query_cache.put(cache_key, (rows, truncated), DB_CONFIGS[db_name]['cache_ttl'], db_name,
+                        referenced_tables(cache_sql), generation, size=estimate_size(rows))
+    return rows, truncated
+
+
+def stream_query(query: str, params: Optional[tuple] = None, db_name: str = 'default',
+                 batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+                 on_description: Optional[Callable[[List[Tuple]], Any]] = None,
+                 dictionary: bool = True) -> Iterator[List[Any]]:
+    """Execute a SELECT query with an unbuffered cursor and yield the rows in batches of dictionaries
+    
+    on_description, if given, is called with the cursor description before the first batch.
+    With dictionary=False rows are yielded as tuples in description order, which is cheaper for wide results.
+    """
+    start = time.perf_counter()
+    pool, connection = acquire_connection(db_name, read_only=is_replica_safe(query), lane='read')
+    phases = {"connect": time.perf_counter() - start, "execute": 0.0, "fetch": 0.0}
+    row_count = 0
     cursor = None
+    completed = False
     try:
-        connection = get_db_connection(db_name)
-        cursor = connection.cursor(dictionary=True)
-        
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        results = cursor.fetchall()
-        return results
+        with guarded_statement(connection, query, db_name) as sql:
+            start = time.perf_counter()
+            cursor = execute_statement(connection, sql, params, dictionary=dictionary, buffered=False)
+            phases["execute"] = time.perf_counter() - start
+            if on_description is not None:
+                on_description(list(cursor.description or []))
+            
+            while True:
+                # Only time spent reading from the server counts; the caller's processing between batches does not
+                start = time.perf_counter()
+                rows = fetch_rows(cursor, batch_size) if dictionary else cursor.fetchmany(batch_size)
+                phases["fetch"] += time.perf_counter() - start
+                if not rows:
+                    break
+                row_count += len(rows)
+                try:
+                    yield rows
+                except GeneratorExit:
+                    completed = _drain(cursor, dictionary, STREAM_DRAIN_ROWS)
+                    raise
+        completed = True
     except Error as e:
         raise Exception(f"Query execution failed on '{db_name}': {str(e)}")
     finally:
-        if cursor:
-            cursor.close()
-        if connection and connection.is_connected():
-            connection.close()
+        if completed:
+            close_cursor(connection, cursor)
+        # A result left partly unread would break the next statement on this connection; drop it instead
+        pool.release(connection, discard=not completed)
+        record_query(db_name, query, phases, row_count)
+
+
+def _drain(cursor, dictionary: bool, limit: int) -> bool:
+    """Read and discard up to `limit` remaining rows; returns True if the result was read to the end"""
+    read = 0
+    try:
+        while read <= limit:
+            rows = fetch_rows(cursor, DEFAULT_STREAM_BATCH_SIZE) if dictionary else cursor.fetchmany(DEFAULT_STREAM_BATCH_SIZE)
+            if not rows:
+                return True
+            read += len(rows)
+    except Error:
+        pass
+    return False
+
+
+def invalidate_cache(query: str, db_name: str = 'default') -> None:
+    """Drop cached results that may be affected by a write statement"""
+    tables = write_target_tables(query)
+    if tables is None:
+        query_cache.invalidate_database(db_name)
+    else:
+        query_cache.invalidate_tables(db_name, tables)
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Get result cache counters and per-database TTLs"""
+    stats = query_cache.stats()
+    stats["ttl_by_database"] = {
+        db_name: config.get('cache_ttl', 0) for db_name, config in DB_CONFIGS.loaded().items()
+    }
+    stats["prepared_statements"] = get_statement_cache_stats()
+    return stats
 
 
 def execute_non_query(query: str, params: Optional[tuple] = None, db_name: str = 'default') -> Dict[str, Any]:
     """Execute INSERT, UPDATE, DELETE queries and return affected rows count"""
+    phases = {}
+    affected_rows = 0
+    start = time.perf_counter()
+    try:
+        with pooled_connection(db_name) as connection:
+            phases["connect"] = time.perf_counter() - start
+            with guarded_statement(connection, query, db_name) as sql:
+                cursor = execute_statement(connection, sql, params)
+            try:
+                phases["execute"] = time.perf_counter() - start - phases["connect"]
+                
+                affected_rows = cursor.rowcount
+                return {
+                    "affected_rows": affected_rows,
+                    "last_insert_id": cursor.lastrowid if cursor.lastrowid else None
+                }
+            finally:
+                close_cursor(connection, cursor)
+    except Error as e:
+        raise Exception(f"Query execution failed on '{db_name}': {str(e)}")
+    finally:
+        phases.setdefault("connect", time.perf_counter() - start)
+        record_query(db_name, query, phases, max(affected_rows, 0))
+        invalidate_cache(query, db_name)
+
+
+def execute_batch(query: str, param_rows: Iterable[Any], db_name: str = 'default',
+                  chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE) -> Dict[str, Any]:
+    """Execute a parameterized write for many parameter rows in chunks, all in a single transaction
+    
+    param_rows may be any iterable, so callers can stream rows without materializing them.
+    mysql-connector rewrites INSERT ... VALUES statements passed to executemany into multi-row INSERTs.
+    Any failure rolls back every chunk.
+    """
+    chunk_size = max(1, chunk_size)
+    affected_rows = 0
+    total_rows = 0
+    chunks = []
+    start = time.perf_counter()
+    rows = iter(param_rows)
+    phases = {"execute": 0.0}
+    try:
+        with pooled_connection(db_name) as connection:
+            phases["connect"] = time.perf_counter() - start
+            cursor = connection.cursor()
+            try:
+                connection.start_transaction()
+                while True:
+                    chunk = list(islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    total_rows += len(chunk)
+                    chunk_start = time.perf_counter()
+                    with guarded_statement(connection, query, db_name) as sql:
+                        cursor.executemany(sql, chunk)
+                    chunk_seconds = time.perf_counter() - chunk_start
+                    phases["execute"] += chunk_seconds
+                    affected_rows += max(cursor.rowcount, 0)
+                    chunks.append({
+                        "chunk": len(chunks) + 1,
+                        "rows": len(chunk),
+                        "affected_rows": cursor.rowcount,
+                        "duration_ms": round(chunk_seconds * 1000, 2)
+                    })
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+    except Error as e:
+        raise Exception(f"Batch execution failed on '{db_name}' after {len(chunks)} chunk(s), rolled back: {str(e)}")
+    finally:
+        phases.setdefault("connect", time.perf_counter() - start)
+        record_query(db_name, query, phases, affected_rows)
+        invalidate_cache(query, db_name)
+    
+    return {
+        "affected_rows": affected_rows,
+        "total_rows": total_rows,
+        "chunk_size": chunk_size,
+        "chunks": chunks,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+def load_data_local_infile(path: str, table: str, columns: Optional[List[str]] = None, delimiter: str = ',',
+                           skip_lines: int = 0, line_terminator: str = '\n',
+                           db_name: str = 'default') -> Optional[Dict[str, Any]]:
+    """Bulk load a CSV file with LOAD DATA LOCAL INFILE
+    
+    Returns None when the server or client does not allow LOCAL INFILE so the caller can fall back.
+    Fields may be enclosed in double quotes and backslashes are read literally, as csv.reader reads them.
+    With columns given, a field of exactly \\N loads as NULL, like in the streaming fallback.
+    """
+    column_list = ""
+    null_markers = ()
+    if columns:
+        # Without an escape character MySQL does not read \N as NULL, so each column maps it explicitly
+        variables = [f"@c{i}" for i in range(len(columns))]
+        column_list = f" ({', '.join(variables)}) SET " + ', '.join(
+            f"{quote_identifier(column)} = NULLIF({variable}, %s)" for column, variable in zip(columns, variables)
+        )
+        null_markers = ('\\N',) * len(columns)
+    query = (
+        f"LOAD DATA LOCAL INFILE %s INTO TABLE {quote_identifier(table)} CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY %s OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+        f"LINES TERMINATED BY %s IGNORE {int(skip_lines)} LINES{column_list}"
+    )
+    
+    # Pooled connections do not enable LOCAL INFILE, so use a dedicated one; it still takes a write lane slot
+    connect_args = get_connection_args(db_name)
+    connect_args['allow_local_infile'] = True
+    admission = get_admission(db_name)['write']
+    admission.acquire(remaining_wait(admission.timeout))
     connection = None
     cursor = None
     try:
-        connection = get_db_connection(db_name)
+        connection = mysql.connector.connect(**connect_args)
         cursor = connection.cursor()
+        cursor.execute("SELECT @@local_infile")
+        if not int(cursor.fetchone()[0]):
+            return None
         
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        affected_rows = cursor.rowcount
+        start = time.perf_counter()
+        with guarded_statement(connection, query, db_name) as sql:
+            cursor.execute(sql, (os.path.abspath(path), delimiter, line_terminator) + null_markers)
+        rows = cursor.rowcount
+        warnings = connection.warning_count
+        connection.commit()
         return {
-            "affected_rows": affected_rows,
-            "last_insert_id": cursor.lastrowid if cursor.lastrowid else None
+            "rows_loaded": rows,
+            "warnings": warnings,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2)
         }
     except Error as e:
-        raise Exception(f"Query execution failed on '{db_name}': {str(e)}")
+        if e.errno in LOCAL_INFILE_DISABLED_ERRORS:
+            return None
+        raise Exception(f"LOAD DATA failed on '{db_name}': {str(e)}")
     finally:
+        query_cache.invalidate_tables(db_name, [table.lower()])
         if cursor:
             cursor.close()
         if connection and connection.is_connected():
             connection.close()
+        admission.release()
+
+
+async def execute_query_async(query: str, params: Optional[tuple] = None, db_name: str = 'default',
+                              use_cache: bool = False) -> List[Dict[str, Any]]:
+    """Async version of execute_query, run on the database worker pool"""
+    return await run_blocking(execute_query, query, params, db_name, use_cache)
+
+
+async def execute_non_query_async(query: str, params: Optional[tuple] = None, db_name: str = 'default') -> Dict[str, Any]:
+    """Async version of execute_non_query, run on the database worker pool"""
+    return await run_blocking(execute_non_query, query, params, db_name)
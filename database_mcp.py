@@ -1,23 +1,49 @@
 # server.py
 from mcp.server.fastmcp import FastMCP
-from dotenv import load_dotenv
 
 # Import database tools and resources
 from tools import (
     get_databases,
     query_database,
     execute_sql,
+    execute_batch,
     list_tables,
     describe_table,
     test_connection,
     test_all_connections,
+    query_all_databases,
     query_to_csv,
-    query_to_csv_string
+    query_to_csv_string,
+    csv_to_table,
+    export_table_parallel,
+    export_query,
+    DEFAULT_EXPORT_WORKERS,
+    begin_session,
+    session_execute,
+    commit_session,
+    rollback_session,
+    refresh_schema,
+    table_profile,
+    PROFILE_SAMPLE_ROWS,
+    PROFILE_TOP_VALUES,
+    CONNECTION_TEST_TIMEOUT,
+    MULTI_QUERY_TIMEOUT,
+    DEFAULT_BATCH_CHUNK_SIZE
 )
-from resources import get_greeting, get_all_databases, get_all_tables, get_database_summary
-
-# Load environment variables
-load_dotenv()
+from resources import (
+    get_greeting,
+    get_all_databases,
+    get_all_tables,
+    get_database_summary,
+    get_query_cache_stats,
+    get_metrics_summary,
+    get_slow_query_log,
+    get_open_sessions,
+    get_result,
+    get_result_part
+)
+from database import run_blocking
+from metrics import start_prometheus_export
 
 # Create an MCP server
 mcp = FastMCP("Multi-Database Tools")
@@ -29,66 +55,171 @@ def greeting_resource(name: str) -> str:
     return get_greeting(name)
 
 @mcp.resource("databases://all")
-def databases_resource() -> str:
+async def databases_resource() -> str:
     """Get all available databases with their configurations"""
-    return get_all_databases()
+    return await run_blocking(get_all_databases)
 
 @mcp.resource("database://{db_name}/tables")
-def tables_resource(db_name: str) -> str:
+async def tables_resource(db_name: str) -> str:
     """Get all tables from the specified database"""
-    return get_all_tables(db_name)
+    return await run_blocking(get_all_tables, db_name)
 
 @mcp.resource("database://{db_name}/summary")
-def database_summary_resource(db_name: str) -> str:
+async def database_summary_resource(db_name: str) -> str:
     """Get summary information about the specified database"""
-    return get_database_summary(db_name)
+    return await run_blocking(get_database_summary, db_name)
+
+@mcp.resource("cache://stats")
+def cache_stats_resource() -> str:
+    """Get result cache hit, miss and eviction counters"""
+    return get_query_cache_stats()
+
+@mcp.resource("metrics://summary")
+def metrics_resource() -> str:
+    """Get per-tool and per-database latency histograms, row and byte counts"""
+    return get_metrics_summary()
+
+@mcp.resource("metrics://slow_queries")
+def slow_queries_resource() -> str:
+    """Get the most recent slow queries"""
+    return get_slow_query_log()
+
+@mcp.resource("sessions://active")
+def sessions_resource() -> str:
+    """Get open transaction sessions"""
+    return get_open_sessions()
+
+@mcp.resource("result://{result_id}")
+def result_resource(result_id: str) -> str:
+    """Get a stored query result's metadata and the URIs of its parts"""
+    return get_result(result_id)
+
+@mcp.resource("result://{result_id}/part/{part}", mime_type="text/csv")
+async def result_part_resource(result_id: str, part: str) -> str:
+    """Get one part of a stored query result as CSV text; parts concatenate to the full result"""
+    return await run_blocking(get_result_part, result_id, part)
 
 # Add MCP tools
 @mcp.tool()
-def get_databases_tool() -> str:
+async def get_databases_tool() -> str:
     """Get list of all available databases"""
-    return get_databases()
+    return await run_blocking(get_databases)
 
 @mcp.tool()
-def query_database_tool(sql: str, params: str = "", db_name: str = "default") -> str:
-    """Execute a SELECT query on the specified MySQL database"""
-    return query_database(sql, params, db_name)
+async def query_database_tool(sql: str, params: str = "", db_name: str = "default", format: str = "json",
+                              max_rows: int = 0, max_bytes: int = 0, cursor: str = "", timeout: float = 0) -> str:
+    """Execute a SELECT query on the specified MySQL database.
+    
+    Results are capped at max_rows/max_bytes (0 uses the configured defaults). Truncated responses include
+    next_cursor; pass it as cursor to get the next page. format "compact" returns a column header plus row arrays.
+    timeout (seconds, 0 uses the database default) kills the query on the server when exceeded.
+    params takes a JSON array (or object for %(name)s placeholders) of typed values, e.g. '[42, {"$date": "2024-01-31"}]',
+    or comma-separated strings.
+    """
+    return await run_blocking(query_database, sql, params, db_name, format, max_rows, max_bytes, cursor, timeout)
 
 @mcp.tool()
-def execute_sql_tool(sql: str, params: str = "", db_name: str = "default") -> str:
+async def execute_sql_tool(sql: str, params: str = "", db_name: str = "default", timeout: float = 0) -> str:
     """Execute INSERT, UPDATE, or DELETE operations on the specified MySQL database"""
-    return execute_sql(sql, params, db_name)
+    return await run_blocking(execute_sql, sql, params, db_name, timeout)
+
+@mcp.tool()
+async def execute_batch_tool(sql: str, rows: str, rows_format: str = "json",
+                             chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE, db_name: str = "default") -> str:
+    """Execute a parameterized write for many parameter rows (JSON array or CSV) in chunks within one transaction"""
+    return await run_blocking(execute_batch, sql, rows, rows_format, chunk_size, db_name)
 
 @mcp.tool()
-def list_tables_tool(db_name: str = "default") -> str:
+async def list_tables_tool(db_name: str = "default") -> str:
     """List all tables in the specified database"""
-    return list_tables(db_name)
+    return await run_blocking(list_tables, db_name)
 
 @mcp.tool()
-def describe_table_tool(table_name: str, db_name: str = "default") -> str:
+async def describe_table_tool(table_name: str, db_name: str = "default") -> str:
     """Get the structure/schema of a specific table"""
-    return describe_table(table_name, db_name)
+    return await run_blocking(describe_table, table_name, db_name)
+
+@mcp.tool()
+async def table_profile_tool(table_name: str, db_name: str = "default", sample_rows: int = PROFILE_SAMPLE_ROWS,
+                             top_values: int = PROFILE_TOP_VALUES, refresh: bool = False) -> str:
+    """Get approximate row counts, index cardinalities and per-column statistics for a table, computed from random
+    primary key ranges, or from the first rows (sample.method "first_rows") when there is no integer key"""
+    return await run_blocking(table_profile, table_name, db_name, sample_rows, top_values, refresh)
 
 @mcp.tool()
-def test_connection_tool(db_name: str = "default") -> str:
+async def refresh_schema_tool(db_name: str = "default", full: bool = False) -> str:
+    """Refresh the cached table and column metadata for the specified database"""
+    return await run_blocking(refresh_schema, db_name, full)
+
+@mcp.tool()
+async def test_connection_tool(db_name: str = "default") -> str:
     """Test the connection to the specified database"""
-    return test_connection(db_name)
+    return await run_blocking(test_connection, db_name)
+
+@mcp.tool()
+async def test_all_connections_tool(timeout: float = CONNECTION_TEST_TIMEOUT) -> str:
+    """Test connections to all configured databases in parallel, with a per-database timeout in seconds"""
+    return await run_blocking(test_all_connections, timeout)
 
 @mcp.tool()
-def test_all_connections_tool() -> str:
-    """Test connections to all configured databases"""
-    return test_all_connections()
+async def query_all_databases_tool(sql: str, params: str = "", db_names: str = "",
+                                   timeout: float = MULTI_QUERY_TIMEOUT) -> str:
+    """Execute one SELECT query on several databases (comma-separated, default all) concurrently"""
+    return await run_blocking(query_all_databases, sql, params, db_names, timeout)
 
 @mcp.tool()
-def query_to_csv_tool(sql: str, filename: str = "", params: str = "", db_name: str = "default") -> str:
+async def query_to_csv_tool(sql: str, filename: str = "", params: str = "", db_name: str = "default") -> str:
     """Execute a SELECT query and save the results to a CSV file"""
-    return query_to_csv(sql, filename, params, db_name)
+    return await run_blocking(query_to_csv, sql, filename, params, db_name)
+
+@mcp.tool()
+async def export_query_tool(sql: str, filename: str = "", format: str = "parquet", params: str = "",
+                            db_name: str = "default") -> str:
+    """Execute a SELECT query and stream the results to a Parquet, Arrow IPC, or gzip/zstd compressed CSV file"""
+    return await run_blocking(export_query, sql, filename, format, params, db_name)
+
+@mcp.tool()
+async def export_table_parallel_tool(table_name: str, filename: str = "", db_name: str = "default", columns: str = "",
+                                     where: str = "", workers: int = DEFAULT_EXPORT_WORKERS, ranges: int = 0,
+                                     merge: bool = True) -> str:
+    """Export a large table to CSV by reading primary key ranges concurrently; rerun to resume an interrupted export"""
+    return await run_blocking(export_table_parallel, table_name, filename, db_name, columns, where, workers, ranges, merge)
+
+@mcp.tool()
+async def query_to_csv_string_tool(sql: str, params: str = "", db_name: str = "default") -> str:
+    """Execute a SELECT query and return the results as a CSV string; large results come back as result:// part URIs"""
+    return await run_blocking(query_to_csv_string, sql, params, db_name)
+
+@mcp.tool()
+async def csv_to_table_tool(filename: str, table_name: str, db_name: str = "default", columns: str = "",
+                            has_header: bool = True, delimiter: str = ",",
+                            chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE) -> str:
+    """Import a CSV file into a table using LOAD DATA LOCAL INFILE, or chunked INSERTs as a fallback"""
+    return await run_blocking(csv_to_table, filename, table_name, db_name, columns, has_header, delimiter, chunk_size)
+
+@mcp.tool()
+async def begin_session_tool(db_name: str = "default") -> str:
+    """Start a transaction session pinned to one connection; returns a session_id. Idle sessions are rolled back"""
+    return await run_blocking(begin_session, db_name)
+
+@mcp.tool()
+async def session_execute_tool(session_id: str, sql: str, params: str = "", max_rows: int = 0) -> str:
+    """Execute a statement inside a transaction session"""
+    return await run_blocking(session_execute, session_id, sql, params, max_rows)
+
+@mcp.tool()
+async def commit_session_tool(session_id: str) -> str:
+    """Commit a transaction session and release its connection"""
+    return await run_blocking(commit_session, session_id)
 
 @mcp.tool()
-def query_to_csv_string_tool(sql: str, params: str = "", db_name: str = "default") -> str:
-    """Execute a SELECT query and return the results as a CSV string"""
-    return query_to_csv_string(sql, params, db_name)
+async def rollback_session_tool(session_id: str) -> str:
+    """Roll back a transaction session and release its connection"""
+    return await run_blocking(rollback_session, session_id)
 
 if __name__ == "__main__":
+    # Write Prometheus metrics to METRICS_PROMETHEUS_FILE if configured
+    start_prometheus_export()
+    
     # Run the MCP server
     mcp.run()
\ No newline at end of file
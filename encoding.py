@@ -0,0 +1,63 @@
+# encoding.py
+import base64
+import datetime
+import decimal
+import json
+from typing import Any, Dict, List
+
+# Output formats accepted by query tools
+RESULT_FORMATS = ('json', 'compact')
+
+
+def _encode_timedelta(value: datetime.timedelta) -> str:
+    # MySQL TIME columns arrive as timedelta; render them as [-]HH:MM:SS[.ffffff]
+    total = abs(value)
+    hours, remainder = divmod(total.days * 86400 + total.seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    text = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    if total.microseconds:
+        text += f".{total.microseconds:06d}"
+    return f"-{text}" if value < datetime.timedelta(0) else text
+
+
+# Type-specific encoders for values json cannot serialize natively, looked up by exact type
+_ENCODERS = {
+    decimal.Decimal: str,  # keep full precision
+    datetime.datetime: datetime.datetime.isoformat,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: datetime.time.isoformat,
+    datetime.timedelta: _encode_timedelta,
+    bytes: lambda value: base64.b64encode(value).decode('ascii'),
+    bytearray: lambda value: base64.b64encode(value).decode('ascii'),
+    set: sorted,  # MySQL SET columns
+}
+
+
+def encode_value(value: Any) -> Any:
+    """json.dumps default hook for MySQL result values; falls back to str() for unknown types"""
+    encoder = _ENCODERS.get(type(value))
+    if encoder is not None:
+        return encoder(value)
+    for value_type, encoder in _ENCODERS.items():
+        if isinstance(value, value_type):
+            return encoder(value)
+    return str(value)
+
+
+def estimate_json_size(row: Dict[str, Any]) -> int:
+    """Cheaply estimate the encoded size of a result row in bytes, without serializing it"""
+    size = 2
+    for key, value in row.items():
+        size += len(key) + 6
+        size += 4 if value is None else len(value) if isinstance(value, (str, bytes)) else len(str(value))
+    return size
+
+
+def encode_compact(rows: List[Dict[str, Any]], **metadata: Any) -> str:
+    """Encode rows as a single column header plus row arrays, without indentation"""
+    columns = list(rows[0].keys()) if rows else []
+    payload = dict(metadata)
+    payload["columns"] = columns
+    payload["rows"] = [list(row.values()) for row in rows]
+    payload["row_count"] = len(rows)
+    return json.dumps(payload, separators=(',', ':'), default=encode_value)
@@ -0,0 +1,206 @@
+# export_formats.py
+import csv
+import decimal
+import gzip
+import io
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from mysql.connector.constants import FieldFlag, FieldType
+
+from csv_writer import is_binary_column, row_converter, write_header, write_rows
+from database import stream_query
+
+# Optional dependencies: pyarrow for Arrow IPC and Parquet, zstandard for .csv.zst
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Format name -> default file extension
+EXPORT_FORMATS = {
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'csv.zst': '.csv.zst',
+    'arrow': '.arrow',
+    'parquet': '.parquet',
+}
+
+# Rows buffered per Arrow record batch / Parquet row group
+EXPORT_ROW_GROUP_SIZE = int(os.getenv('DB_EXPORT_ROW_GROUP_SIZE', '65536'))
+
+# Compression levels for compressed CSV, and codec for Parquet
+GZIP_LEVEL = int(os.getenv('DB_EXPORT_GZIP_LEVEL', '6'))
+ZSTD_LEVEL = int(os.getenv('DB_EXPORT_ZSTD_LEVEL', '3'))
+PARQUET_COMPRESSION = os.getenv('DB_EXPORT_PARQUET_COMPRESSION', 'zstd')
+
+_INTEGER_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.INT24, FieldType.LONG, FieldType.LONGLONG,
+                  FieldType.YEAR, FieldType.BIT}
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise Exception("Arrow and Parquet export need pyarrow (pip install pyarrow)")
+
+
+def _first_value(rows: List[Tuple], index: int) -> Any:
+    return next((row[index] for row in rows if row[index] is not None), None)
+
+
+def _arrow_type(column: Tuple, sample: Any):
+    """Map a cursor description entry to an Arrow type; a sample value decides the decimal scale"""
+    type_code = column[1]
+    flags = column[7] if len(column) > 7 else 0
+    unsigned = bool(flags & FieldFlag.UNSIGNED)
+    if type_code in _INTEGER_TYPES:
+        return pa.uint64() if unsigned and type_code == FieldType.LONGLONG else pa.int64()
+    if type_code == FieldType.FLOAT:
+        return pa.float32()
+    if type_code == FieldType.DOUBLE:
+        return pa.float64()
+    if type_code in (FieldType.DECIMAL, FieldType.NEWDECIMAL):
+        # The description carries no scale; every value of a DECIMAL column has the column's scale
+        scale = -sample.as_tuple().exponent if isinstance(sample, decimal.Decimal) else 10
+        return pa.decimal128(38, max(0, scale))
+    if type_code in (FieldType.DATE, FieldType.NEWDATE):
+        return pa.date32()
+    if type_code in (FieldType.DATETIME, FieldType.TIMESTAMP):
+        return pa.timestamp('us')
+    if type_code == FieldType.TIME:
+        return pa.duration('us')
+    # Text vs binary comes from the column's character set, since a sample may be NULL or happen to be ASCII
+    if type_code == FieldType.GEOMETRY or is_binary_column(column):
+        return pa.binary()
+    return pa.string()
+
+
+def _arrow_value(value: Any, arrow_type) -> Any:
+    if isinstance(value, bytearray):
+        value = bytes(value)
+    if isinstance(value, set):
+        return ','.join(sorted(value))
+    if isinstance(value, bytes) and arrow_type == pa.string():
+        return value.decode('utf-8', errors='replace')
+    return value
+
+
+class _ArrowSink:
+    """Buffers rows and writes them as Arrow record batches to an IPC file or Parquet row groups"""
+
+    def __init__(self, path: str, format: str, description: List[Tuple], first_batch: List[Tuple]):
+        self.schema = pa.schema([
+            pa.field(column[0], _arrow_type(column, _first_value(first_batch, index)))
+            for index, column in enumerate(description)
+        ])
+        self.pending = []
+        if format == 'parquet':
+            self.writer = pq.ParquetWriter(path, self.schema, compression=PARQUET_COMPRESSION)
+            self._write = lambda batch: self.writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+            self._write = self.writer.write_batch
+
+    def write_rows(self, rows: List[Tuple]) -> None:
+        self.pending.extend(rows)
+        if len(self.pending) >= EXPORT_ROW_GROUP_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        arrays = [
+            pa.array([_arrow_value(row[index], field.type) for row in self.pending], type=field.type)
+            for index, field in enumerate(self.schema)
+        ]
+        self._write(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.pending = []
+
+    def close(self) -> None:
+        self.flush()
+        self.writer.close()
+
+
+class _CsvSink:
+    """Writes rows as CSV through an optional gzip or zstd compressor"""
+
+    def __init__(self, path: str, format: str, description: List[Tuple]):
+        if format == 'csv.gz':
+            self.file = gzip.open(path, 'wt', newline='', encoding='utf-8', compresslevel=GZIP_LEVEL)
+        elif format == 'csv.zst':
+            if zstandard is None:
+                raise Exception("zstd compressed CSV needs zstandard (pip install zstandard)")
+            raw = open(path, 'wb')
+            compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(raw, closefd=True)
+            self.file = io.TextIOWrapper(compressed, encoding='utf-8', newline='')
+        else:
+            self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.convert = row_converter(description)
+        write_header(self.writer, description)
+
+    def write_rows(self, rows: List[Tuple]) -> None:
+        write_rows(self.writer, rows, self.convert)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def export_query(sql: str, filename: str, format: str = 'parquet', params: Optional[tuple] = None,
+                 db_name: str = 'default') -> Dict[str, Any]:
+    """
+    Stream a query's results into a typed Arrow IPC or Parquet file, or a plain/compressed CSV file.
+
+    Rows are read in batches and written as they arrive, so memory stays bounded by the row group size.
+    The file is written under a temporary name and renamed once complete.
+    """
+    if format not in EXPORT_FORMATS:
+        raise Exception(f"Unsupported export format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if format in ('arrow', 'parquet'):
+        _require_pyarrow()
+
+    path = os.path.abspath(filename)
+    tmp_path = f"{path}.tmp"
+    description = []
+    sink = None
+    rows_exported = 0
+    try:
+        for batch in stream_query(sql, params, db_name, on_description=description.extend, dictionary=False):
+            if sink is None:
+                sink = _open_sink(tmp_path, format, description, batch)
+            sink.write_rows(batch)
+            rows_exported += len(batch)
+        if sink is None:
+            # No rows: still write a file with the column names and types
+            sink = _open_sink(tmp_path, format, description, [])
+        sink.close()
+        sink = None
+        os.replace(tmp_path, path)
+    finally:
+        if sink is not None:
+            try:
+                sink.close()
+            except Exception:
+                pass
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        "file": path,
+        "format": format,
+        "rows_exported": rows_exported,
+        "columns": [column[0] for column in description],
+        "size_bytes": os.path.getsize(path)
+    }
+
+
+def _open_sink(path: str, format: str, description: List[Tuple], first_batch: List[Tuple]):
+    if format in ('arrow', 'parquet'):
+        return _ArrowSink(path, format, description, first_batch)
+    return _CsvSink(path, format, description)
@@ -0,0 +1,309 @@
+# metrics.py
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+# Queries slower than this are kept in the slow query log
+SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '1000'))
+SLOW_QUERY_LOG_SIZE = int(os.getenv('DB_SLOW_QUERY_LOG_SIZE', '100'))
+
+# Optional Prometheus text export, rewritten every METRICS_EXPORT_INTERVAL seconds
+PROMETHEUS_FILE = os.getenv('METRICS_PROMETHEUS_FILE', '')
+EXPORT_INTERVAL = float(os.getenv('METRICS_EXPORT_INTERVAL', '15'))
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Longest SQL text kept in the slow query log
+_MAX_SQL_LENGTH = 2000
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within the containing bucket, clamped to observed values"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        def ms(value):
+            return None if value is None else round(value * 1000, 3)
+        return {
+            "count": self.count,
+            "avg_ms": ms(self.sum / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+            "max_ms": ms(self.max) if self.count else None
+        }
+
+
+class _ToolStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.errors = 0
+        self.response_bytes = 0
+        self.encode_seconds = 0.0
+
+
+class _QueryStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.phases = {"connect": 0.0, "execute": 0.0, "fetch": 0.0}
+        self.rows = 0
+        self.slow = 0
+        self.response_bytes = 0
+
+
+_lock = threading.Lock()
+_tools: Dict[str, _ToolStats] = {}
+_queries: Dict[str, _QueryStats] = {}
+_slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_started_at = time.time()
+
+# Name of the tool running in this context, so helpers can attribute encode time to it
+_current_tool = contextvars.ContextVar('current_tool', default=None)
+
+
+def _query_stats(db_name: str) -> _QueryStats:
+    # Callers hold _lock
+    stats = _queries.get(db_name)
+    if stats is None:
+        stats = _queries[db_name] = _QueryStats()
+    return stats
+
+
+def record_query(db_name: str, sql: str, phases: Dict[str, float], rows: int = 0) -> None:
+    """Record one statement's connect/execute/fetch time in seconds and its row count"""
+    total = sum(phases.values())
+    with _lock:
+        stats = _query_stats(db_name)
+        stats.latency.observe(total)
+        for phase, seconds in phases.items():
+            stats.phases[phase] = stats.phases.get(phase, 0.0) + seconds
+        stats.rows += rows
+        if total * 1000 >= SLOW_QUERY_MS:
+            stats.slow += 1
+            _slow_queries.append({
+                "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime()),
+                "database": db_name,
+                "sql": sql[:_MAX_SQL_LENGTH],
+                "duration_ms": round(total * 1000, 3),
+                "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in phases.items()},
+                "rows": rows
+            })
+
+
+def record_encode(tool_name: str, seconds: float) -> None:
+    """Record time a tool spent serializing its response"""
+    with _lock:
+        stats = _tools.get(tool_name)
+        if stats is None:
+            stats = _tools[tool_name] = _ToolStats()
+        stats.encode_seconds += seconds
+
+
+@contextmanager
+def timed_encode():
+    """Time serializing a response and add it to the encode time of the tool running in this context"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        tool_name = _current_tool.get()
+        if tool_name is not None:
+            record_encode(tool_name, time.perf_counter() - start)
+
+
+def _is_error_response(result: Any) -> bool:
+    # Tools report failures as JSON objects whose first key is "error"
+    return isinstance(result, str) and result.lstrip('{ \n').startswith('"error"')
+
+
+def instrument_tool(tool_name: str) -> Callable:
+    """Decorator recording latency, response size and error count of a tool function
+
+    Response bytes are also counted for the database named by the tool's db_name argument, if it has one.
+    """
+    def decorator(func):
+        parameters = inspect.signature(func).parameters
+        db_position = list(parameters).index('db_name') if 'db_name' in parameters else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            result = None
+            token = _current_tool.set(tool_name)
+            try:
+                result = func(*args, **kwargs)
+                failed = _is_error_response(result)
+                return result
+            finally:
+                _current_tool.reset(token)
+                elapsed = time.perf_counter() - start
+                db_name = None
+                if db_position is not None:
+                    db_name = kwargs['db_name'] if 'db_name' in kwargs else \
+                        args[db_position] if db_position < len(args) else parameters['db_name'].default
+                with _lock:
+                    stats = _tools.get(tool_name)
+                    if stats is None:
+                        stats = _tools[tool_name] = _ToolStats()
+                    stats.latency.observe(elapsed)
+                    stats.errors += failed
+                    if isinstance(result, str):
+                        stats.response_bytes += len(result)
+                        if isinstance(db_name, str):
+                            _query_stats(db_name).response_bytes += len(result)
+        return wrapper
+    return decorator
+
+
+def get_metrics() -> Dict[str, Any]:
+    """Return per-tool and per-database metrics"""
+    with _lock:
+        return {
+            "uptime_seconds": round(time.time() - _started_at, 1),
+            "slow_query_threshold_ms": SLOW_QUERY_MS,
+            "tools": {
+                name: {
+                    **stats.latency.summary(),
+                    "errors": stats.errors,
+                    "response_bytes": stats.response_bytes,
+                    "encode_ms": round(stats.encode_seconds * 1000, 3)
+                }
+                for name, stats in _tools.items()
+            },
+            "databases": {
+                name: {
+                    **stats.latency.summary(),
+                    "phases_ms": {phase: round(seconds * 1000, 3) for phase, seconds in stats.phases.items()},
+                    "rows": stats.rows,
+                    "response_bytes": stats.response_bytes,
+                    "slow_queries": stats.slow
+                }
+                for name, stats in _queries.items()
+            }
+        }
+
+
+def get_slow_queries() -> List[Dict[str, Any]]:
+    """Return the most recent slow queries, newest first"""
+    with _lock:
+        return list(reversed(_slow_queries))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name: str, label: str, value: str, histogram: Histogram) -> List[str]:
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{{label}="{value}",le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_sum{{{label}="{value}"}} {histogram.sum}')
+    lines.append(f'{name}_count{{{label}="{value}"}} {histogram.count}')
+    return lines
+
+
+def render_prometheus() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    with _lock:
+        lines = [
+            "# HELP mcp_tool_duration_seconds Tool call latency.",
+            "# TYPE mcp_tool_duration_seconds histogram"
+        ]
+        for name, stats in _tools.items():
+            lines += _histogram_lines("mcp_tool_duration_seconds", "tool", _escape_label(name), stats.latency)
+        lines += ["# HELP mcp_tool_errors_total Tool calls that returned an error.",
+                  "# TYPE mcp_tool_errors_total counter"]
+        lines += [f'mcp_tool_errors_total{{tool="{_escape_label(n)}"}} {s.errors}' for n, s in _tools.items()]
+        lines += ["# HELP mcp_tool_response_bytes_total Bytes returned by tool calls.",
+                  "# TYPE mcp_tool_response_bytes_total counter"]
+        lines += [f'mcp_tool_response_bytes_total{{tool="{_escape_label(n)}"}} {s.response_bytes}' for n, s in _tools.items()]
+        lines += ["# HELP mcp_tool_encode_seconds_total Time spent serializing tool responses.",
+                  "# TYPE mcp_tool_encode_seconds_total counter"]
+        lines += [f'mcp_tool_encode_seconds_total{{tool="{_escape_label(n)}"}} {s.encode_seconds}' for n, s in _tools.items()]
+
+        lines += ["# HELP mcp_query_duration_seconds Statement latency including connection checkout.",
+                  "# TYPE mcp_query_duration_seconds histogram"]
+        for name, stats in _queries.items():
+            lines += _histogram_lines("mcp_query_duration_seconds", "database", _escape_label(name), stats.latency)
+        lines += ["# HELP mcp_query_phase_seconds_total Statement time by phase (connect, execute, fetch).",
+                  "# TYPE mcp_query_phase_seconds_total counter"]
+        for name, stats in _queries.items():
+            for phase, seconds in stats.phases.items():
+                lines.append(f'mcp_query_phase_seconds_total{{database="{_escape_label(name)}",phase="{phase}"}} {seconds}')
+        lines += ["# HELP mcp_query_rows_total Rows returned or affected.",
+                  "# TYPE mcp_query_rows_total counter"]
+        lines += [f'mcp_query_rows_total{{database="{_escape_label(n)}"}} {s.rows}' for n, s in _queries.items()]
+        lines += ["# HELP mcp_database_response_bytes_total Bytes returned by tool calls on a database.",
+                  "# TYPE mcp_database_response_bytes_total counter"]
+        lines += [f'mcp_database_response_bytes_total{{database="{_escape_label(n)}"}} {s.response_bytes}'
+                  for n, s in _queries.items()]
+        lines += ["# HELP mcp_slow_queries_total Statements slower than the slow query threshold.",
+                  "# TYPE mcp_slow_queries_total counter"]
+        lines += [f'mcp_slow_queries_total{{database="{_escape_label(n)}"}} {s.slow}' for n, s in _queries.items()]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str = PROMETHEUS_FILE) -> None:
+    """Atomically write the Prometheus text dump to a file"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+def start_prometheus_export(path: str = PROMETHEUS_FILE, interval: float = EXPORT_INTERVAL) -> Optional[threading.Thread]:
+    """Start a daemon thread rewriting the Prometheus dump periodically; does nothing without a path"""
+    if not path:
+        return None
+
+    def export_loop():
+        while True:
+            try:
+                write_prometheus(path)
+            except OSError:
+                pass
+            time.sleep(interval)
+
+    thread = threading.Thread(target=export_loop, name='metrics-export', daemon=True)
+    thread.start()
+    return thread
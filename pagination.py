@@ -0,0 +1,123 @@
+# pagination.py
+import base64
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from encoding import encode_value
+from parameters import decode_param, encode_param
+from schema_catalog import get_catalog
+from sql_utils import (mask_literals, normalize_sql, quote_identifier, referenced_tables, statement_type, strip_comments,
+                       strip_literals)
+
+# Clauses that make a SELECT unsuitable for keyset pagination on the primary key
+_NOT_KEYSET = re.compile(
+    r"\bJOIN\b|\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bUNION\b|\bDISTINCT\b|\bHAVING\b|\bOVER\b|"
+    r"\bWINDOW\b|\bFOR\s+(?:UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bINTO\b|\(\s*SELECT\b",
+    re.IGNORECASE
+)
+_SELECT_LIST = re.compile(r"^\s*SELECT\s+(.*?)\s+FROM\s", re.IGNORECASE | re.DOTALL)
+_LIMIT = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+# A trailing locking clause, with any OF / NOWAIT / SKIP LOCKED options; LIMIT must come before it
+_LOCKING_CLAUSE = re.compile(r"\s(?:FOR\s+(?:UPDATE|SHARE)|LOCK\s+IN\s+SHARE\s+MODE)\b[^()]*$", re.IGNORECASE)
+
+
+def _selects_column(select_list: str, column: str) -> bool:
+    """Check whether a select list returns a column under its own name"""
+    for item in select_list.split(','):
+        item = item.strip()
+        if item == '*' or item.endswith('.*'):
+            return True
+        if item.split('.')[-1].strip('`').lower() == column.lower():
+            return True
+    return False
+
+
+def plan_pagination(sql: str, db_name: str) -> Dict[str, Any]:
+    """
+    Decide how a query is paged.
+
+    Single-table SELECTs without ordering, grouping, limits or locking whose primary key is a single
+    returned column are paged by keyset on that key. Other SELECTs fall back to OFFSET, except locking
+    reads with their own LIMIT, which cannot be wrapped without moving the lock; other statements are not paged.
+    """
+    stripped = strip_literals(normalize_sql(strip_comments(sql)))
+    if statement_type(stripped) != 'SELECT':
+        return {"mode": "none"}
+    if _LOCKING_CLAUSE.search(stripped) and _LIMIT.search(stripped):
+        return {"mode": "none"}
+
+    tables = referenced_tables(stripped)
+    select_list = _SELECT_LIST.match(stripped)
+    if len(tables) == 1 and select_list and not _NOT_KEYSET.search(stripped):
+        primary = get_catalog(db_name).primary_key(next(iter(tables)))
+        if primary and len(primary) == 1 and _selects_column(select_list.group(1), primary[0]):
+            return {"mode": "keyset", "key": primary[0], "last": None}
+
+    return {"mode": "offset", "offset": 0}
+
+
+def build_page_query(sql: str, params: Optional[tuple], state: Dict[str, Any],
+                     limit: int) -> Tuple[str, Optional[tuple]]:
+    """Rewrite a query to fetch at most `limit` rows from the position recorded in `state`"""
+    # The query keeps its own text; only comments, which could swallow the appended clauses, are dropped
+    sql = strip_comments(sql).strip().rstrip(';').strip()
+    mode = state["mode"]
+    if mode == "keyset":
+        key = quote_identifier(state["key"])
+        if state.get("last") is None:
+            return f"SELECT * FROM ({sql}) AS _page ORDER BY {key} LIMIT {int(limit)}", params
+        return (
+            f"SELECT * FROM ({sql}) AS _page WHERE {key} > %s ORDER BY {key} LIMIT {int(limit)}",
+            tuple(params or ()) + (state["last"],)
+        )
+    if mode == "offset":
+        page_clause = f"LIMIT {int(limit)} OFFSET {int(state['offset'])}"
+        masked = mask_literals(sql)
+        if _LIMIT.search(masked):
+            return f"SELECT * FROM ({sql}) AS _page {page_clause}", params
+        locking = _LOCKING_CLAUSE.search(masked)
+        if locking:
+            return f"{sql[:locking.start()]} {page_clause}{sql[locking.start():]}", params
+        return f"{sql} {page_clause}", params
+    return sql, params
+
+
+def advance(state: Dict[str, Any], rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the pagination state positioned after the given page of rows"""
+    state = dict(state)
+    if "row_cap" in state:
+        state["returned"] = state.get("returned", 0) + len(rows)
+    if state["mode"] == "keyset" and rows:
+        last_row = rows[-1]
+        key = next((k for k in last_row if k.lower() == state["key"].lower()), state["key"])
+        state["last"] = last_row[key]
+    elif state["mode"] == "offset":
+        state["offset"] += len(rows)
+    return state
+
+
+def encode_cursor(sql: str, params: Optional[tuple], db_name: str, state: Dict[str, Any]) -> str:
+    """Encode everything needed to fetch the next page into an opaque continuation token"""
+    # Typed parameters and keyset positions keep their type across pages, e.g. dates stay dates and
+    # binary keys stay bytes rather than becoming strings the next page would compare against
+    if state.get("last") is not None:
+        state = dict(state, last=encode_param(state["last"]))
+    payload = {"sql": sql, "params": [encode_param(p) for p in params] if params else None,
+               "db": db_name, "state": state}
+    data = json.dumps(payload, separators=(',', ':'), default=encode_value)
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Optional[tuple], str, Dict[str, Any]]:
+    """Decode a continuation token into (sql, params, db_name, state)"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        params = tuple(decode_param(p) for p in payload["params"]) if payload["params"] else None
+        state = payload["state"]
+        if state.get("last") is not None:
+            state["last"] = decode_param(state["last"])
+        return payload["sql"], params, payload["db"], state
+    except Exception:
+        raise Exception("Invalid or corrupted cursor")
@@ -0,0 +1,262 @@
+# parallel_export.py
+import contextvars
+import csv
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from csv_writer import row_converter, write_rows
+from database import DB_CONFIGS, DEFAULT_POOL_SIZE, execute_query, stream_query
+from encoding import encode_value
+from schema_catalog import get_catalog, is_integer_type
+from sql_utils import quote_identifier
+
+# Concurrent range readers, each holding one pooled connection while it runs
+DEFAULT_EXPORT_WORKERS = int(os.getenv('DB_EXPORT_WORKERS', '4'))
+
+# Primary key ranges per worker; more ranges balance uneven key distributions and make resume finer
+RANGES_PER_WORKER = 4
+
+# Keys sampled per range when boundaries of a non-integer key are estimated
+SAMPLE_KEYS_PER_RANGE = 32
+
+
+def _manifest_path(filename: str) -> str:
+    return f"{filename}.manifest.json"
+
+
+def _part_path(filename: str, index: int) -> str:
+    return f"{filename}.part{index:05d}"
+
+
+def _write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, default=encode_value)
+    os.replace(tmp_path, path)
+
+
+def _integer_ranges(table: str, key: str, db_name: str, count: int) -> List[Dict[str, Any]]:
+    """Split an integer key evenly between MIN and MAX"""
+    row = execute_query(
+        f"SELECT MIN({quote_identifier(key)}) AS low, MAX({quote_identifier(key)}) AS high FROM {quote_identifier(table)}",
+        None, db_name
+    )[0]
+    if row['low'] is None:
+        return [{"lower": None, "upper": None}]
+
+    low, high = int(row['low']), int(row['high'])
+    span = high - low + 1
+    bounds = sorted({low - 1 + span * i // count for i in range(1, count)} - {low - 1})
+    return _ranges_from_bounds(bounds)
+
+
+def _sampled_ranges(table: str, key: str, db_name: str, count: int, estimated_rows: int) -> List[Dict[str, Any]]:
+    """
+    Find boundary keys from a bounded random sample of the key, for keys that cannot be split arithmetically.
+
+    One pass keeps each key with probability SAMPLE_KEYS_PER_RANGE * count / TABLE_ROWS and stops after twice
+    that many, so the result stays small; the server sorts the sample in the key's collation. Without a row
+    estimate the table is exported as a single range rather than counted.
+    """
+    if count <= 1 or not estimated_rows or estimated_rows <= 0:
+        return _ranges_from_bounds([])
+    wanted = SAMPLE_KEYS_PER_RANGE * count
+    probability = min(1.0, wanted / estimated_rows)
+
+    quoted_key = quote_identifier(key)
+    sql = (f"SELECT k FROM (SELECT {quoted_key} AS k FROM {quote_identifier(table)} WHERE RAND() < %s "
+           f"LIMIT {wanted * 2}) AS _sample ORDER BY k")
+    keys = [row['k'] for row in execute_query(sql, (probability,), db_name)]
+    if len(keys) < count:
+        return _ranges_from_bounds(keys[:-1] if len(keys) > 1 else [])
+    bounds = [keys[len(keys) * i // count - 1] for i in range(1, count)]
+    return _ranges_from_bounds([k for i, k in enumerate(bounds) if i == 0 or k != bounds[i - 1]])
+
+
+def _ranges_from_bounds(bounds: List[Any]) -> List[Dict[str, Any]]:
+    """Turn sorted boundary keys into (lower exclusive, upper inclusive] ranges covering all keys"""
+    edges = [None] + list(bounds) + [None]
+    return [{"lower": edges[i], "upper": edges[i + 1]} for i in range(len(edges) - 1)]
+
+
+def plan_ranges(table_name: str, db_name: str = 'default', count: int = 16) -> Dict[str, Any]:
+    """Choose the primary key and split it into about `count` ranges"""
+    table = get_catalog(db_name).get_table(table_name)
+    if table is None:
+        raise Exception(f"Table '{table_name}' not found in '{db_name}'")
+    primary = table['indexes'].get('PRIMARY')
+    if not primary or len(primary['columns']) != 1:
+        raise Exception(f"Parallel export needs a single-column primary key; '{table_name}' has none. Use query_to_csv.")
+
+    key = primary['columns'][0]
+    key_type = next((c['Type'] for c in table['columns'] if c['Field'].lower() == key.lower()), '')
+    count = max(1, count)
+    if is_integer_type(key_type):
+        ranges = _integer_ranges(table['name'], key, db_name, count)
+        method = "min_max"
+    else:
+        ranges = _sampled_ranges(table['name'], key, db_name, count, table['rows'])
+        method = "key_sampling"
+    return {
+        "table": table['name'],
+        "key": key,
+        "columns": [c['Field'] for c in table['columns']],
+        "method": method,
+        "ranges": ranges
+    }
+
+
+def _range_query(table: str, key: str, columns: List[str], where: str,
+                 lower: Any, upper: Any) -> Tuple[str, Optional[tuple]]:
+    conditions = [f"({where})"] if where.strip() else []
+    params = []
+    if lower is not None:
+        conditions.append(f"{quote_identifier(key)} > %s")
+        params.append(lower)
+    if upper is not None:
+        conditions.append(f"{quote_identifier(key)} <= %s")
+        params.append(upper)
+    sql = f"SELECT {', '.join(quote_identifier(c) for c in columns)} FROM {quote_identifier(table)}"
+    if conditions:
+        sql += f" WHERE {' AND '.join(conditions)}"
+    sql += f" ORDER BY {quote_identifier(key)}"
+    return sql, tuple(params) or None
+
+
+def _export_range(manifest: Dict[str, Any], index: int, db_name: str, header: bool) -> int:
+    """Stream one key range into its part file; the file only appears under its final name once complete"""
+    entry = manifest["ranges"][index]
+    sql, params = _range_query(manifest["table"], manifest["key"], manifest["columns"], manifest["where"],
+                               entry["lower"], entry["upper"])
+    path = _part_path(manifest["filename"], index)
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    description = []
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(manifest["columns"])
+        for batch in stream_query(sql, params, db_name, on_description=description.extend, dictionary=False):
+            if not rows:
+                convert = row_converter(description)
+            write_rows(writer, batch, convert)
+            rows += len(batch)
+    os.replace(tmp_path, path)
+    return rows
+
+
+def _load_manifest(filename: str, table_name: str, db_name: str, columns: Optional[List[str]],
+                   where: str, merge: bool) -> Optional[Dict[str, Any]]:
+    """Load a previous run's manifest if it describes the same export"""
+    path = _manifest_path(filename)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if (manifest["database"], manifest["table"].lower(), manifest["where"], manifest["merge"]) != \
+            (db_name, table_name.lower(), where, merge):
+        return None
+    if columns and [c.lower() for c in columns] != [c.lower() for c in manifest["columns"]]:
+        return None
+    return manifest
+
+
+def export_table(table_name: str, filename: str, db_name: str = 'default', columns: Optional[List[str]] = None,
+                 where: str = "", workers: int = DEFAULT_EXPORT_WORKERS, ranges: int = 0,
+                 merge: bool = True) -> Dict[str, Any]:
+    """
+    Export a table to CSV by reading primary key ranges concurrently over several pooled connections.
+
+    Each range is written to its own part file and recorded in a manifest next to the output. Running the
+    same export again after an interruption skips ranges already recorded as done. With merge, the part
+    files are concatenated in key order into `filename` and removed with the manifest afterwards.
+    """
+    start = time.perf_counter()
+    pool_size = DB_CONFIGS[db_name].get('pool_size', DEFAULT_POOL_SIZE) if db_name in DB_CONFIGS else DEFAULT_POOL_SIZE
+    workers = max(1, min(workers, pool_size))
+    filename = os.path.abspath(filename)
+
+    manifest = _load_manifest(filename, table_name, db_name, columns, where, merge)
+    if manifest is None:
+        plan = plan_ranges(table_name, db_name, ranges if ranges > 0 else workers * RANGES_PER_WORKER)
+        if columns:
+            known = {c.lower(): c for c in plan["columns"]}
+            missing = [c for c in columns if c.lower() not in known]
+            if missing:
+                raise Exception(f"Unknown column(s) in '{plan['table']}': {', '.join(missing)}")
+            plan["columns"] = [known[c.lower()] for c in columns]
+        manifest = {
+            "database": db_name,
+            "table": plan["table"],
+            "key": plan["key"],
+            "columns": plan["columns"],
+            "where": where,
+            "merge": merge,
+            "method": plan["method"],
+            "filename": filename,
+            "ranges": [dict(r, status="pending", rows=0) for r in plan["ranges"]]
+        }
+        _write_json_atomic(_manifest_path(filename), manifest)
+
+    pending = [
+        i for i, entry in enumerate(manifest["ranges"])
+        if entry["status"] != "done" or not os.path.exists(_part_path(filename, i))
+    ]
+    resumed = len(manifest["ranges"]) - len(pending)
+    manifest_lock = threading.Lock()
+    errors = []
+
+    def run(index):
+        try:
+            rows = _export_range(manifest, index, db_name, header=not merge)
+        except Exception as e:
+            errors.append(f"range {index}: {str(e)}")
+            return
+        with manifest_lock:
+            manifest["ranges"][index].update(status="done", rows=rows)
+            _write_json_atomic(_manifest_path(filename), manifest)
+
+    # Each worker runs in a copy of the caller's context so timeouts and cancellation carry over
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db-export') as executor:
+        for index in pending:
+            executor.submit(contextvars.copy_context().run, run, index)
+
+    if errors:
+        raise Exception(
+            f"{len(errors)} of {len(manifest['ranges'])} ranges failed; run the same export again to resume. "
+            f"First error: {errors[0]}"
+        )
+
+    rows_exported = sum(entry["rows"] for entry in manifest["ranges"])
+    parts = [_part_path(filename, i) for i in range(len(manifest["ranges"]))]
+    if merge:
+        tmp_path = f"{filename}.tmp"
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as out:
+            csv.writer(out).writerow(manifest["columns"])
+            for part in parts:
+                with open(part, newline='', encoding='utf-8') as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+        os.replace(tmp_path, filename)
+        for part in parts:
+            os.remove(part)
+        os.remove(_manifest_path(filename))
+
+    duration = time.perf_counter() - start
+    return {
+        "table": manifest["table"],
+        "key": manifest["key"],
+        "split_method": manifest["method"],
+        "files": [filename] if merge else parts,
+        "manifest": None if merge else _manifest_path(filename),
+        "rows_exported": rows_exported,
+        "ranges": len(manifest["ranges"]),
+        "ranges_resumed": resumed,
+        "workers": workers,
+        "duration_ms": round(duration * 1000, 2),
+        "rows_per_second": round(rows_exported / duration) if duration > 0 else None
+    }
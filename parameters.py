@@ -0,0 +1,132 @@
+# parameters.py
+import base64
+import binascii
+import datetime
+import decimal
+import json
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from encoding import encode_value
+from sql_utils import mask_literals
+
+# Named placeholders, as accepted by mysql-connector's pyformat style
+_NAMED_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+_TIME = re.compile(r"^(-)?(\d+):(\d{2}):(\d{2})(?:\.(\d{1,6}))?$")
+
+
+def _parse_datetime(text: str) -> datetime.datetime:
+    value = datetime.datetime.fromisoformat(text)
+    if value.tzinfo is not None:
+        # The connector would silently drop the offset (including Z); the server session time zone decides
+        # how the value is read, so write it as a local time in that zone
+        raise ValueError("datetime parameters must not carry a time zone offset")
+    return value
+
+
+def _parse_time(text: str) -> datetime.timedelta:
+    # TIME values may be negative or exceed 24 hours, so they are bound as timedelta like the connector returns them
+    match = _TIME.match(text)
+    if match is None:
+        raise ValueError("expected [-]HH:MM:SS[.ffffff]")
+    sign, hours, minutes, seconds, fraction = match.groups()
+    value = datetime.timedelta(hours=int(hours), minutes=int(minutes), seconds=int(seconds),
+                               microseconds=int((fraction or '0').ljust(6, '0')))
+    return -value if sign else value
+
+
+def _parse_bytes(text: str) -> bytes:
+    try:
+        return base64.b64decode(text, validate=True)
+    except binascii.Error:
+        raise ValueError("expected base64")
+
+
+# {"$<type>": "<text>"} wrappers for parameter types JSON has no literal for
+_DECODERS = {
+    '$date': datetime.date.fromisoformat,
+    '$datetime': _parse_datetime,
+    '$time': _parse_time,
+    '$decimal': decimal.Decimal,
+    '$bytes': _parse_bytes,
+}
+
+_ENCODERS = {
+    datetime.datetime: lambda value: {'$datetime': value.isoformat()},
+    datetime.date: lambda value: {'$date': value.isoformat()},
+    datetime.timedelta: lambda value: {'$time': encode_value(value)},
+    datetime.time: lambda value: {'$time': value.isoformat()},
+    decimal.Decimal: lambda value: {'$decimal': str(value)},
+    bytes: lambda value: {'$bytes': base64.b64encode(value).decode('ascii')},
+    bytearray: lambda value: {'$bytes': base64.b64encode(value).decode('ascii')},
+}
+
+
+def decode_param(value: Any) -> Any:
+    """Turn one JSON parameter into the Python value to bind"""
+    if isinstance(value, dict):
+        if len(value) != 1 or next(iter(value)) not in _DECODERS:
+            raise Exception(f"Unsupported parameter {json.dumps(value)}; typed values are written as "
+                            f"{{\"<type>\": \"<text>\"}} with type one of {', '.join(_DECODERS)}")
+        tag, text = next(iter(value.items()))
+        try:
+            return _DECODERS[tag](str(text))
+        except (ValueError, decimal.InvalidOperation) as e:
+            raise Exception(f"Invalid {tag} parameter '{text}': {str(e) or 'bad format'}")
+    if isinstance(value, list):
+        raise Exception("A parameter cannot be a list; use one placeholder per value")
+    return value
+
+
+def encode_param(value: Any) -> Any:
+    """Turn a bound value back into its JSON form, the inverse of decode_param"""
+    encoder = _ENCODERS.get(type(value))
+    return encoder(value) if encoder is not None else value
+
+
+def bind_params(sql: str, params: str) -> Tuple[str, Optional[tuple]]:
+    """
+    Parse a tool's params string into the SQL and the parameter tuple to execute it with.
+
+    params may be a JSON array of positional values for %s placeholders, or a JSON object of named
+    values for %(name)s placeholders, which are rewritten to %s so the statement can be prepared.
+    Numbers, booleans and null are bound with their JSON type; dates, times, decimals and binary
+    values are written as {"$date": "2024-01-31"}, {"$datetime": "2024-01-31T12:00:00"},
+    {"$time": "12:30:00"}, {"$decimal": "9.99"} and {"$bytes": "<base64>"}. Anything else is the
+    legacy comma-separated list, bound as strings.
+    """
+    text = params.strip()
+    if not text:
+        return sql, None
+    if text[0] not in '[{':
+        return sql, tuple(param.strip() for param in text.split(','))
+
+    try:
+        values = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise Exception(f"Invalid JSON parameters: {str(e)}")
+
+    if isinstance(values, list):
+        return sql, tuple(decode_param(value) for value in values) or None
+    return _bind_named(sql, values)
+
+
+def _bind_named(sql: str, values: Dict[str, Any]) -> Tuple[str, Optional[tuple]]:
+    # Placeholders are found on a copy with quoted text blanked, so '%(x)s' inside a string literal stays as is
+    placeholders = list(_NAMED_PLACEHOLDER.finditer(mask_literals(sql)))
+    names = [match.group(1) for match in placeholders]
+    if not names:
+        raise Exception("Named parameters need %(name)s placeholders in the SQL")
+    missing = sorted(set(names) - set(values))
+    if missing:
+        raise Exception(f"Missing named parameter(s): {', '.join(missing)}")
+    decoded = {name: decode_param(value) for name, value in values.items()}
+    parts = []
+    position = 0
+    for match in placeholders:
+        parts.append(sql[position:match.start()])
+        parts.append('%s')
+        position = match.end()
+    parts.append(sql[position:])
+    return ''.join(parts), tuple(decoded[name] for name in names)
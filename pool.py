@@ -0,0 +1,170 @@
+# pool.py
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available before the pool timeout"""
+
+
+class ConnectionPool:
+    """Bounded, lazily filled pool of MySQL connections for one database configuration"""
+
+    def __init__(self, name: str, connect_args: Dict[str, Any], size: int = 5,
+                 timeout: float = 30.0, max_lifetime: float = 3600.0):
+        self.name = name
+        self.connect_args = connect_args
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, created_at)
+        self._created_at = {}  # id(connection) -> created_at for checked out connections
+        self._open = 0
+        self._waiting = 0
+        self._closed = False
+
+        # Counters
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._health_failures = 0
+
+    def _connect(self):
+        try:
+            return mysql.connector.connect(**self.connect_args)
+        except Error as e:
+            raise Exception(f"Database connection failed for '{self.name}': {str(e)}")
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.max_lifetime > 0 and time.monotonic() - created_at > self.max_lifetime
+
+    @staticmethod
+    def _close_quietly(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Check out a healthy connection, waiting up to `timeout` seconds if the pool is exhausted"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            connection = None
+            created_at = None
+            with self._cond:
+                if self._closed:
+                    raise Exception(f"Connection pool for '{self.name}' is closed")
+                self._waiting += 1
+                try:
+                    while not self._idle and self._open >= self.size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeoutError(
+                                f"Timed out after {timeout}s waiting for a connection to '{self.name}' "
+                                f"(pool size {self.size})"
+                            )
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+                if self._idle:
+                    connection, created_at = self._idle.pop()
+                else:
+                    # Reserve a slot and open the connection outside the lock
+                    self._open += 1
+
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except Exception:
+                    self._release_slot()
+                    raise
+                created_at = time.monotonic()
+            elif self._is_expired(created_at):
+                self._recycled += 1
+                self._close_quietly(connection)
+                self._release_slot()
+                continue
+            elif not self._is_healthy(connection):
+                self._health_failures += 1
+                self._close_quietly(connection)
+                self._release_slot()
+                continue
+
+            with self._cond:
+                self._checkouts += 1
+                self._created_at[id(connection)] = created_at
+            return connection
+
+    def _is_healthy(self, connection) -> bool:
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def release(self, connection, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it if it is broken, expired or `discard` is set"""
+        with self._cond:
+            created_at = self._created_at.pop(id(connection), time.monotonic())
+
+        if not discard:
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+            except Exception:
+                discard = True
+
+        if discard or self._closed or self._is_expired(created_at):
+            if not discard and self._is_expired(created_at):
+                self._recycled += 1
+            self._close_quietly(connection)
+            self._release_slot()
+            return
+
+        with self._cond:
+            self._idle.append((connection, created_at))
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Close all idle connections; checked out connections are closed when released"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool settings and usage counters"""
+        with self._cond:
+            return {
+                "size": self.size,
+                "timeout": self.timeout,
+                "max_lifetime": self.max_lifetime,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "health_check_failures": self._health_failures
+            }
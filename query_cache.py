@@ -0,0 +1,144 @@
+# query_cache.py
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+
+def estimate_size(rows: List[Dict[str, Any]]) -> int:
+    """Roughly estimate the memory held by a list of result rows, in bytes"""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row.values():
+            size += sys.getsizeof(value)
+    return size
+
+
+class QueryCache:
+    """Memory-bounded LRU cache of query results with per-entry TTL and table-based invalidation"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 10
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (rows, expires_at, size, db_name, tables)
+        self._tables = {}  # (db_name, table) -> set of keys
+        self._generations = {}  # db_name -> write generation
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def generation(self, db_name: str) -> int:
+        """Return the write generation of a database; results read before a write must not be stored after it"""
+        with self._lock:
+            return self._generations.get(db_name, 0)
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached result for a key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, rows: Any, ttl: float, db_name: str,
+            tables: Iterable[str], generation: int, size: Optional[int] = None) -> bool:
+        """Store a result for a key; returns False if the result is too large or a write happened meanwhile
+        
+        size defaults to the estimated size of rows, which must then be a list of row dictionaries.
+        """
+        if ttl <= 0:
+            return False
+        if size is None:
+            size = estimate_size(rows)
+        if size > self.max_entry_bytes:
+            return False
+
+        tables = frozenset(tables)
+        with self._lock:
+            if self._generations.get(db_name, 0) != generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (rows, time.monotonic() + ttl, size, db_name, tables)
+            self._bytes += size
+            for table in tables:
+                self._tables.setdefault((db_name, table), set()).add(key)
+
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+        return True
+
+    def _remove(self, key: Hashable) -> None:
+        rows, expires_at, size, db_name, tables = self._entries.pop(key)
+        self._bytes -= size
+        for table in tables:
+            keys = self._tables.get((db_name, table))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tables[(db_name, table)]
+
+    def invalidate_tables(self, db_name: str, tables: Iterable[str]) -> int:
+        """Drop cached results of a database that read any of the given tables"""
+        removed = 0
+        with self._lock:
+            self._generations[db_name] = self._generations.get(db_name, 0) + 1
+            for table in tables:
+                for key in list(self._tables.get((db_name, table), ())):
+                    self._remove(key)
+                    removed += 1
+            self._invalidations += removed
+        return removed
+
+    def invalidate_database(self, db_name: str) -> int:
+        """Drop all cached results of a database"""
+        with self._lock:
+            self._generations[db_name] = self._generations.get(db_name, 0) + 1
+            keys = [key for key, entry in self._entries.items() if entry[3] == db_name]
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            for db_name in {entry[3] for entry in self._entries.values()}:
+                self._generations[db_name] = self._generations.get(db_name, 0) + 1
+            self._entries.clear()
+            self._tables.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit, miss and eviction counters"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations
+            }
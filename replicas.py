@@ -0,0 +1,134 @@
+# replicas.py
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from mysql.connector import Error
+
+from pool import ConnectionPool, PoolTimeoutError
+
+# Seconds between health and replication lag checks of each replica
+REPLICA_CHECK_INTERVAL = float(os.getenv('DB_REPLICA_CHECK_INTERVAL', '5'))
+
+
+def replication_lag(connection) -> Optional[float]:
+    """Return the replica's Seconds_Behind_Source, or None if replication is not running"""
+    cursor = connection.cursor(dictionary=True, buffered=True)
+    try:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+        except Error:
+            # Servers before MySQL 8.0.22 and MariaDB 10.5
+            cursor.execute("SHOW SLAVE STATUS")
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if not row:
+        return None
+    lag = row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master'))
+    return None if lag is None else float(lag)
+
+
+class Replica:
+    """One read replica with its own connection pool and last health check result"""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self.healthy = True
+        self.lag = None
+        self.error = None
+        self.checked_at = 0.0
+
+    def mark(self, healthy: bool, lag: Optional[float] = None, error: Optional[str] = None) -> None:
+        self.healthy = healthy
+        self.lag = lag
+        self.error = error
+        self.checked_at = time.monotonic()
+
+
+class ReplicaSet:
+    """
+    Round-robin reads over the replicas of one database.
+
+    A replica whose connection fails, or whose lag exceeds max_lag seconds (when max_lag > 0), is skipped
+    until its next check, every check_interval seconds. When no replica is usable, callers use the primary.
+    """
+
+    def __init__(self, db_name: str, replicas: List[Replica], max_lag: float = 0.0,
+                 check_interval: float = REPLICA_CHECK_INTERVAL):
+        self.db_name = db_name
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._next = 0
+        self._fallbacks = 0
+
+    def acquire(self) -> Tuple[Optional[ConnectionPool], Any]:
+        """Check out a connection from the next usable replica; returns (None, None) if there is none"""
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            due = time.monotonic() - replica.checked_at >= self.check_interval
+            if not replica.healthy and not due:
+                continue
+
+            try:
+                # Do not wait on a busy replica; move on to the next one, then the primary
+                connection = replica.pool.acquire(timeout=0)
+            except PoolTimeoutError:
+                continue
+            except Exception as e:
+                replica.mark(False, error=str(e))
+                continue
+
+            if due:
+                if not self._check(replica, connection):
+                    replica.pool.release(connection, discard=replica.error is not None)
+                    continue
+            return replica.pool, connection
+
+        with self._lock:
+            self._fallbacks += 1
+        return None, None
+
+    def _check(self, replica: Replica, connection) -> bool:
+        if self.max_lag <= 0:
+            replica.mark(True)
+            return True
+        try:
+            lag = replication_lag(connection)
+        except Error as e:
+            replica.mark(False, error=str(e))
+            return False
+        if lag is None:
+            replica.mark(False, error="Replication is not running")
+            return False
+        replica.mark(lag <= self.max_lag, lag=lag)
+        return replica.healthy
+
+    def close(self) -> None:
+        for replica in self.replicas:
+            replica.pool.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-replica health, lag and pool usage"""
+        with self._lock:
+            fallbacks = self._fallbacks
+        return {
+            "max_lag": self.max_lag,
+            "primary_fallbacks": fallbacks,
+            "replicas": {
+                replica.pool.name: {
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag,
+                    "error": replica.error,
+                    "pool": replica.pool.stats()
+                }
+                for replica in self.replicas
+            }
+        }
@@ -1,6 +1,18 @@
 # resources.py
 import json
-from database import execute_query, get_available_databases, get_database_info
+from database import (
+    get_admission_stats,
+    get_available_databases,
+    get_cache_stats,
+    get_config_stats,
+    get_database_info,
+    get_pool_stats,
+    get_replica_stats,
+)
+from metrics import get_metrics, get_slow_queries
+from result_store import describe_result, get_result_stats, read_result_part
+from schema_catalog import get_catalog
+from sessions import get_sessions
 
 
 def get_greeting(name: str) -> str:
@@ -12,6 +24,9 @@ def get_all_databases() -> str:
     """Get all available databases with their configurations"""
     try:
         databases = get_available_databases()
+        pool_stats = get_pool_stats()
+        replica_stats = get_replica_stats()
+        admission_stats = get_admission_stats()
         db_info = {}
         
         for db_name in databases:
@@ -21,7 +36,11 @@ def get_all_databases() -> str:
                     "host": config['host'],
                     "port": config['port'],
                     "database_name": config['database'],
-                    "user": config['user']
+                    "user": config['user'],
+                    "pool": pool_stats.get(db_name),
+                    "admission": admission_stats.get(db_name),
+                    "replicas": replica_stats.get(db_name,
+                                                  [f"{r['host']}:{r['port']}" for r in config.get('replicas', [])])
                 }
             except Exception as e:
                 db_info[db_name] = {"error": str(e)}
@@ -29,7 +48,8 @@ def get_all_databases() -> str:
         return json.dumps({
             "available_databases": databases,
             "database_configurations": db_info,
-            "total_databases": len(databases)
+            "total_databases": len(databases),
+            "config": get_config_stats()
         }, indent=2)
     except Exception as e:
         return json.dumps({"error": str(e)}, indent=2)
@@ -38,8 +58,7 @@ def get_all_databases() -> str:
 def get_all_tables(db_name: str = "default") -> str:
     """Get all tables from the specified database"""
     try:
-        results = execute_query("SHOW TABLES", None, db_name)
-        tables = [list(row.values())[0] for row in results]
+        tables = get_catalog(db_name).table_names()
         
         config = get_database_info(db_name)
         return json.dumps({
@@ -60,20 +79,11 @@ def get_database_summary(db_name: str = "default") -> str:
         # Get database configuration
         config = get_database_info(db_name)
         
-        # Get table count
-        table_results = execute_query("SHOW TABLES", None, db_name)
-        table_count = len(table_results)
-        
-        # Get database size (if possible)
-        size_query = """
-        SELECT 
-            ROUND(SUM(data_length + index_length) / 1024 / 1024, 2) AS 'size_mb'
-        FROM information_schema.tables 
-        WHERE table_schema = %s
-        """
+        # Table count and size come from the schema catalog
+        catalog = get_catalog(db_name)
+        table_count = len(catalog.table_names())
         try:
-            size_results = execute_query(size_query, (config['database'],), db_name)
-            size_mb = size_results[0]['size_mb'] if size_results and size_results[0]['size_mb'] else 0
+            size_mb = round(catalog.total_size_bytes() / 1024 / 1024, 2)
         except:
             size_mb = "N/A"
         
@@ -92,3 +102,61 @@ def get_database_summary(db_name: str = "default") -> str:
         }, indent=2)
     except Exception as e:
         return json.dumps({"error": str(e), "database": db_name}, indent=2)
+
+
+def get_query_cache_stats() -> str:
+    """Get result cache hit, miss and eviction counters"""
+    try:
+        stats = get_cache_stats()
+        stats["stored_results"] = get_result_stats()
+        return json.dumps(stats, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e)}, indent=2)
+
+
+def get_metrics_summary() -> str:
+    """Get per-tool and per-database latency, row and byte metrics plus pool usage"""
+    try:
+        summary = get_metrics()
+        summary["pools"] = get_pool_stats()
+        summary["replicas"] = get_replica_stats()
+        summary["admission"] = get_admission_stats()
+        return json.dumps(summary, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e)}, indent=2)
+
+
+def get_slow_query_log() -> str:
+    """Get the most recent queries slower than the slow query threshold"""
+    try:
+        slow_queries = get_slow_queries()
+        return json.dumps({
+            "slow_queries": slow_queries,
+            "count": len(slow_queries)
+        }, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e)}, indent=2)
+
+
+def get_open_sessions() -> str:
+    """Get open transaction sessions and how long each has been idle"""
+    try:
+        return json.dumps(get_sessions(), indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e)}, indent=2)
+
+
+def get_result(result_id: str) -> str:
+    """Get a stored query result's metadata and the URIs of its parts"""
+    try:
+        return json.dumps(describe_result(result_id), indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "result_id": result_id}, indent=2)
+
+
+def get_result_part(result_id: str, part: str) -> str:
+    """Get one part of a stored query result as raw CSV text"""
+    try:
+        return read_result_part(result_id, int(part))
+    except Exception as e:
+        return json.dumps({"error": str(e), "result_id": result_id, "part": part}, indent=2)
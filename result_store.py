@@ -0,0 +1,236 @@
+# result_store.py
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+# Results up to this many bytes are returned inline; larger ones are stored and served as result:// parts
+RESULT_INLINE_BYTES = int(os.getenv('DB_RESULT_INLINE_BYTES', str(64 * 1024)))
+
+# Target size of one part; parts end on row boundaries, so a part can exceed this by one row
+RESULT_PART_BYTES = int(os.getenv('DB_RESULT_PART_BYTES', str(1024 * 1024)))
+
+# Results larger than this are written to a temp file instead of being held in memory
+RESULT_SPILL_BYTES = int(os.getenv('DB_RESULT_SPILL_BYTES', str(8 * 1024 * 1024)))
+
+# Seconds a stored result stays readable
+RESULT_TTL = float(os.getenv('DB_RESULT_TTL', '600'))
+
+# Directory for spilled results; defaults to a fresh directory under the system temp dir
+RESULT_DIR = os.getenv('DB_RESULT_DIR', '')
+
+
+class StoredResult:
+    """A result split into parts, held in memory or in one spill file with part offsets"""
+
+    def __init__(self, result_id: str, metadata: Dict[str, Any]):
+        self.id = result_id
+        self.metadata = metadata
+        self.parts: List[bytes] = []  # in memory, until spilled
+        self.offsets: List[int] = [0]  # part boundaries in the spill file
+        self.path: Optional[str] = None
+        self.size = 0
+        self.expires_at = 0.0
+
+    def read_part(self, index: int) -> bytes:
+        if self.path is None:
+            return self.parts[index]
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[index])
+            return f.read(self.offsets[index + 1] - self.offsets[index])
+
+    @property
+    def part_count(self) -> int:
+        return len(self.parts) if self.path is None else len(self.offsets) - 1
+
+    def info(self) -> Dict[str, Any]:
+        return dict(
+            self.metadata,
+            result_uri=f"result://{self.id}",
+            parts=[result_part_uri(self.id, i) for i in range(self.part_count)],
+            part_count=self.part_count,
+            size_bytes=self.size,
+            spilled=self.path is not None,
+            expires_in=max(0, round(self.expires_at - time.monotonic()))
+        )
+
+    def discard(self) -> None:
+        self.parts = []
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class ResultWriter:
+    """
+    Text sink for csv.writer that cuts the output into parts as it is written.
+
+    csv.writer calls write() once per row, so parts always end on a row boundary. The text is kept in
+    memory until it grows past the spill threshold, then moved to a file in the spill directory.
+    """
+
+    def __init__(self, store: 'ResultStore', metadata: Optional[Dict[str, Any]] = None):
+        self.store = store
+        self.result = StoredResult(uuid.uuid4().hex, metadata or {})
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._file = None
+
+    def write(self, text: str) -> int:
+        data = text.encode('utf-8')
+        self._pending.append(data)
+        self._pending_size += len(data)
+        self.result.size += len(data)
+        if self._pending_size >= RESULT_PART_BYTES:
+            self._cut()
+        return len(text)
+
+    def _cut(self) -> None:
+        if not self._pending:
+            return
+        part = b''.join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        if self._file is None and self.result.size > RESULT_SPILL_BYTES:
+            self._spill()
+        if self._file is None:
+            self.result.parts.append(part)
+        else:
+            self._file.write(part)
+            self.result.offsets.append(self.result.offsets[-1] + len(part))
+
+    def _spill(self) -> None:
+        self.result.path = os.path.join(self.store.directory(), f"{self.result.id}.part")
+        self._file = open(self.result.path, 'wb')
+        for part in self.result.parts:
+            self._file.write(part)
+            self.result.offsets.append(self.result.offsets[-1] + len(part))
+        self.result.parts = []
+
+    def fits_inline(self) -> bool:
+        return self._file is None and self.result.size <= RESULT_INLINE_BYTES
+
+    def getvalue(self) -> str:
+        """Return everything written so far; only for results that fit inline, as spilled parts are on disk"""
+        return b''.join(self.result.parts + self._pending).decode('utf-8')
+
+    def close(self) -> StoredResult:
+        """Finish the last part and register the result with the store"""
+        self._cut()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self.store.add(self.result)
+
+    def discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.result.discard()
+
+
+class ResultStore:
+    """Stored results by id, dropped once their TTL passes"""
+
+    def __init__(self, ttl: float = RESULT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._results: Dict[str, StoredResult] = {}
+        self._directory: Optional[str] = None
+        self._expired = 0
+
+    def directory(self) -> str:
+        with self._lock:
+            if self._directory is None:
+                if RESULT_DIR:
+                    os.makedirs(RESULT_DIR, exist_ok=True)
+                    self._directory = RESULT_DIR
+                else:
+                    self._directory = tempfile.mkdtemp(prefix='mcp-results-')
+                    atexit.register(shutil.rmtree, self._directory, True)
+            return self._directory
+
+    def writer(self, metadata: Optional[Dict[str, Any]] = None) -> ResultWriter:
+        return ResultWriter(self, metadata)
+
+    def add(self, result: StoredResult) -> StoredResult:
+        self.expire()
+        result.expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._results[result.id] = result
+        return result
+
+    def get(self, result_id: str) -> StoredResult:
+        self.expire()
+        with self._lock:
+            result = self._results.get(result_id)
+        if result is None:
+            raise Exception(f"Result '{result_id}' not found; it may have expired")
+        return result
+
+    def read_part(self, result_id: str, index: int) -> str:
+        result = self.get(result_id)
+        if not 0 <= index < result.part_count:
+            raise Exception(f"Result '{result_id}' has parts 0 to {result.part_count - 1}; part {index} does not exist")
+        return result.read_part(index).decode('utf-8')
+
+    def expire(self) -> int:
+        """Drop results past their TTL and delete their spill files"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [result for result in self._results.values() if result.expires_at <= now]
+            for result in expired:
+                del self._results[result.id]
+            self._expired += len(expired)
+        for result in expired:
+            result.discard()
+        return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        self.expire()
+        with self._lock:
+            results = list(self._results.values())
+            expired = self._expired
+        return {
+            "results": len(results),
+            "memory_bytes": sum(r.size for r in results if r.path is None),
+            "spilled_bytes": sum(r.size for r in results if r.path is not None),
+            "spilled_results": sum(1 for r in results if r.path is not None),
+            "expired": expired,
+            "ttl": self.ttl,
+            "inline_bytes": RESULT_INLINE_BYTES,
+            "part_bytes": RESULT_PART_BYTES,
+            "spill_bytes": RESULT_SPILL_BYTES
+        }
+
+
+_store = ResultStore()
+
+
+def get_result_store() -> ResultStore:
+    return _store
+
+
+def result_part_uri(result_id: str, index: int) -> str:
+    return f"result://{result_id}/part/{index}"
+
+
+def describe_result(result_id: str) -> Dict[str, Any]:
+    """Return a stored result's metadata and part URIs"""
+    return _store.get(result_id).info()
+
+
+def read_result_part(result_id: str, part: int) -> str:
+    """Return one part of a stored result as text"""
+    return _store.read_part(result_id, int(part))
+
+
+def get_result_stats() -> Dict[str, Any]:
+    """Return stored result counts and sizes"""
+    return _store.stats()
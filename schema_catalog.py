@@ -0,0 +1,293 @@
+# schema_catalog.py
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from database import DB_CONFIGS, execute_query, get_database_info
+from sql_utils import referenced_tables
+
+# Seconds between incremental staleness checks against information_schema
+SCHEMA_REFRESH_INTERVAL = float(os.getenv('DB_SCHEMA_REFRESH_INTERVAL', '60'))
+
+# Integer COLUMN_TYPEs of any width, signed or unsigned, e.g. "bigint unsigned"
+_INTEGER_TYPE = re.compile(r"^\s*(?:tiny|small|medium|big)?int\b", re.IGNORECASE)
+
+# Tables per information_schema query when reloading columns and indexes for changed tables
+_RELOAD_CHUNK_SIZE = 500
+
+_TABLES_QUERY = """
+SELECT TABLE_NAME AS table_name, TABLE_TYPE AS table_type, ENGINE AS engine,
+       TABLE_ROWS AS table_rows, DATA_LENGTH AS data_length, INDEX_LENGTH AS index_length,
+       CREATE_TIME AS create_time, UPDATE_TIME AS update_time
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = %s
+"""
+
+_COLUMNS_QUERY = """
+SELECT TABLE_NAME AS table_name, COLUMN_NAME AS field, COLUMN_TYPE AS type, IS_NULLABLE AS nullable,
+       COLUMN_KEY AS column_key, COLUMN_DEFAULT AS column_default, EXTRA AS extra
+FROM information_schema.COLUMNS
+WHERE TABLE_SCHEMA = %s{table_filter}
+ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+_INDEXES_QUERY = """
+SELECT TABLE_NAME AS table_name, INDEX_NAME AS index_name, NON_UNIQUE AS non_unique,
+       COLUMN_NAME AS column_name, CARDINALITY AS cardinality, INDEX_TYPE AS index_type
+FROM information_schema.STATISTICS
+WHERE TABLE_SCHEMA = %s{table_filter}
+ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+"""
+
+_PRIMARY_KEY_QUERY = """
+SELECT TABLE_NAME AS table_name, COLUMN_NAME AS column_name
+FROM information_schema.STATISTICS
+WHERE TABLE_SCHEMA = %s AND LOWER(TABLE_NAME) = %s AND INDEX_NAME = 'PRIMARY'
+ORDER BY TABLE_NAME, SEQ_IN_INDEX
+"""
+
+_VIEWS_QUERY = """
+SELECT TABLE_NAME AS table_name
+FROM information_schema.TABLES
+WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'VIEW'
+"""
+
+
+def is_integer_type(column_type: str) -> bool:
+    """Check whether a catalog column type is an integer type, e.g. for splitting a key into ranges"""
+    return bool(_INTEGER_TYPE.match(column_type or ''))
+
+
+class SchemaCatalog:
+    """In-memory copy of a database's tables, columns, indexes and sizes, refreshed incrementally"""
+
+    def __init__(self, db_name: str, refresh_interval: float = SCHEMA_REFRESH_INTERVAL):
+        self.db_name = db_name
+        self.schema = get_database_info(db_name)['database']
+        self.refresh_interval = refresh_interval
+
+        self._lock = threading.RLock()
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self._stale_tables = set()
+        self._loaded = False
+        self._checked_at = 0.0
+
+        # View names and primary keys are kept apart from the full catalog, so the query path can look
+        # them up with small queries instead of loading or refreshing every table
+        self._lookups_lock = threading.Lock()
+        self._views: Optional[Set[str]] = None
+        self._views_checked_at = 0.0
+        self._primary_keys: Dict[str, Tuple[Optional[List[str]], float]] = {}
+
+    def _load_details(self, table_names: Optional[List[str]] = None) -> None:
+        """Load columns and indexes for the given tables, or for every table when None"""
+        if table_names is None:
+            chunks = [None]
+        else:
+            chunks = [table_names[i:i + _RELOAD_CHUNK_SIZE] for i in range(0, len(table_names), _RELOAD_CHUNK_SIZE)]
+
+        for chunk in chunks:
+            params = (self.schema,)
+            table_filter = ""
+            if chunk is not None:
+                table_filter = f" AND TABLE_NAME IN ({', '.join(['%s'] * len(chunk))})"
+                params += tuple(chunk)
+
+            for row in execute_query(_COLUMNS_QUERY.format(table_filter=table_filter), params, self.db_name):
+                table = self._tables.get(row['table_name'])
+                if table is not None:
+                    table['columns'].append({
+                        "Field": row['field'],
+                        "Type": row['type'],
+                        "Null": row['nullable'],
+                        "Key": row['column_key'],
+                        "Default": row['column_default'],
+                        "Extra": row['extra']
+                    })
+
+            for row in execute_query(_INDEXES_QUERY.format(table_filter=table_filter), params, self.db_name):
+                table = self._tables.get(row['table_name'])
+                if table is not None:
+                    index = table['indexes'].setdefault(row['index_name'], {
+                        "columns": [],
+                        "unique": not int(row['non_unique']),
+                        "type": row['index_type'],
+                        "cardinality": row['cardinality']
+                    })
+                    index['columns'].append(row['column_name'])
+                    index['cardinality'] = row['cardinality']
+
+    @staticmethod
+    def _table_entry(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": row['table_name'],
+            "type": row['table_type'],
+            "engine": row['engine'],
+            "rows": row['table_rows'],
+            "data_length": row['data_length'] or 0,
+            "index_length": row['index_length'] or 0,
+            "create_time": row['create_time'],
+            "update_time": row['update_time'],
+            "columns": [],
+            "indexes": {}
+        }
+
+    def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """Bring the catalog up to date; reloads only new or re-created tables unless full is set"""
+        with self._lock:
+            start = time.monotonic()
+            rows = execute_query(_TABLES_QUERY, (self.schema,), self.db_name)
+
+            if full or not self._loaded:
+                self._tables = {row['table_name']: self._table_entry(row) for row in rows}
+                self._load_details()
+                changed = list(self._tables)
+                removed = []
+            else:
+                current = {row['table_name']: row for row in rows}
+                removed = [name for name in self._tables if name not in current]
+                for name in removed:
+                    del self._tables[name]
+
+                changed = []
+                for name, row in current.items():
+                    table = self._tables.get(name)
+                    if table is None or table['create_time'] != row['create_time'] or name in self._stale_tables:
+                        self._tables[name] = self._table_entry(row)
+                        changed.append(name)
+                    else:
+                        # Data changes only move sizes and UPDATE_TIME
+                        table.update({
+                            "rows": row['table_rows'],
+                            "data_length": row['data_length'] or 0,
+                            "index_length": row['index_length'] or 0,
+                            "update_time": row['update_time']
+                        })
+                if changed:
+                    self._load_details(changed)
+
+            self._stale_tables.clear()
+            self._loaded = True
+            self._checked_at = time.monotonic()
+            return {
+                "database": self.db_name,
+                "table_count": len(self._tables),
+                "reloaded_tables": len(changed),
+                "removed_tables": len(removed),
+                "full": full,
+                "duration_ms": round((time.monotonic() - start) * 1000, 2)
+            }
+
+    def ensure_fresh(self) -> None:
+        """Refresh if the catalog was never loaded, has stale tables, or the refresh interval elapsed"""
+        with self._lock:
+            if not self._loaded or self._stale_tables or \
+                    time.monotonic() - self._checked_at > self.refresh_interval:
+                self.refresh()
+
+    def mark_stale(self, tables: Optional[Iterable[str]] = None) -> None:
+        """Force the given tables (or a staleness check of all tables) on next access"""
+        with self._lookups_lock:
+            self._views = None
+            self._primary_keys.clear()
+        with self._lock:
+            if tables is None:
+                self._checked_at = 0.0
+            else:
+                lookup = {name.lower(): name for name in self._tables}
+                self._stale_tables.update(lookup.get(name.lower(), name) for name in tables)
+
+    def _find(self, table_name: str) -> Optional[Dict[str, Any]]:
+        table = self._tables.get(table_name)
+        if table is None:
+            lowered = table_name.lower()
+            table = next((t for name, t in self._tables.items() if name.lower() == lowered), None)
+        return table
+
+    def table_names(self) -> List[str]:
+        """Return table and view names, as SHOW TABLES would"""
+        self.ensure_fresh()
+        with self._lock:
+            return sorted(self._tables)
+
+    def get_table(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Return the catalog entry for a table, checking for newly created tables on a miss"""
+        self.ensure_fresh()
+        with self._lock:
+            table = self._find(table_name)
+            if table is None and self._checked_at < time.monotonic() - 1:
+                self.refresh()
+                table = self._find(table_name)
+            return table
+
+    def view_names(self) -> Set[str]:
+        """Return lower-cased view names from one small query, repeated after the refresh interval"""
+        with self._lookups_lock:
+            if self._views is None or time.monotonic() - self._views_checked_at > self.refresh_interval:
+                self._views = {row['table_name'].lower() for row in execute_query(_VIEWS_QUERY, (self.schema,), self.db_name)}
+                self._views_checked_at = time.monotonic()
+            return self._views
+
+    def primary_key(self, table_name: str) -> Optional[List[str]]:
+        """Return a table's primary key columns from one small query, or None if it has none or is not found"""
+        lowered = table_name.lower()
+        with self._lookups_lock:
+            entry = self._primary_keys.get(lowered)
+            if entry is None or time.monotonic() - entry[1] > self.refresh_interval:
+                rows = execute_query(_PRIMARY_KEY_QUERY, (self.schema, lowered), self.db_name)
+                # Names differing only in case are ambiguous on case-sensitive servers
+                columns = [row['column_name'] for row in rows] if len({row['table_name'] for row in rows}) == 1 else None
+                entry = self._primary_keys[lowered] = (columns, time.monotonic())
+            return entry[0]
+
+    def describe(self, table_name: str) -> Optional[List[Dict[str, Any]]]:
+        """Return columns in DESCRIBE format, or None if the table does not exist"""
+        table = self.get_table(table_name)
+        return None if table is None else table['columns']
+
+    def total_size_bytes(self) -> int:
+        """Return the summed data and index size of all tables"""
+        self.ensure_fresh()
+        with self._lock:
+            return sum(t['data_length'] + t['index_length'] for t in self._tables.values())
+
+
+_catalogs: Dict[str, SchemaCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(db_name: str = 'default') -> SchemaCatalog:
+    """Get the schema catalog for a database, creating it on first use"""
+    catalog = _catalogs.get(db_name)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(db_name)
+            if catalog is None:
+                catalog = SchemaCatalog(db_name)
+                _catalogs[db_name] = catalog
+    return catalog
+
+
+def _forget_catalogs(db_names: List[str]) -> None:
+    """Drop the catalogs of databases whose configuration changed; they may now point at another server"""
+    with _catalogs_lock:
+        for db_name in db_names:
+            _catalogs.pop(db_name, None)
+
+
+DB_CONFIGS.add_listener(_forget_catalogs)
+
+
+def reads_view(sql: str, db_name: str = 'default') -> bool:
+    """Check whether a query reads a view; cached results of a view would miss writes to its base tables"""
+    tables = referenced_tables(sql)
+    return bool(tables) and not tables.isdisjoint(get_catalog(db_name).view_names())
+
+
+def mark_schema_stale(db_name: str = 'default', tables: Optional[Iterable[str]] = None) -> None:
+    """Mark tables of an already loaded catalog for reload after DDL"""
+    catalog = _catalogs.get(db_name)
+    if catalog is not None:
+        catalog.mark_stale(tables)
@@ -0,0 +1,312 @@
+# sessions.py
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from mysql.connector import Error, errors
+
+from database import (
+    DB_CONFIGS,
+    DEFAULT_MAX_ROWS,
+    DEFAULT_POOL_SIZE,
+    acquire_connection,
+    get_admission,
+    guarded_statement,
+    invalidate_cache,
+)
+from metrics import record_query
+from statement_cache import close_cursor, execute_statement, fetch_rows
+from sql_utils import statement_type
+
+# Seconds a session may sit idle before it is rolled back and its connection returned to the pool
+SESSION_IDLE_TIMEOUT = float(os.getenv('DB_SESSION_IDLE_TIMEOUT', '60'))
+
+# Open sessions across all databases; each one pins a pooled connection
+MAX_SESSIONS = int(os.getenv('DB_MAX_SESSIONS', '10'))
+
+# Open sessions per database. Each pins a pooled connection and a write lane slot, so the limit is also
+# kept below the database's pool size and write lane, leaving room for other calls
+MAX_SESSIONS_PER_DATABASE = int(os.getenv('DB_MAX_SESSIONS_PER_DATABASE', '3'))
+
+# Statements that do not change data, so committing them needs no cache invalidation
+_READ_STATEMENTS = ('SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN', 'WITH')
+
+# Errors after which InnoDB has rolled back the whole transaction, not only the failed statement:
+# deadlocks always, lock wait timeouts when innodb_rollback_on_timeout is on
+DEADLOCK_ERRORS = (1213,)
+LOCK_WAIT_TIMEOUT_ERRORS = (1205,)
+
+
+class Session:
+    """A transaction pinned to one pooled primary connection"""
+
+    def __init__(self, session_id: str, db_name: str, pool, connection):
+        self.id = session_id
+        self.db_name = db_name
+        self.pool = pool
+        self.connection = connection
+        self.lock = threading.Lock()  # one statement at a time; held while the session is in use
+        self.started_at = time.time()
+        self.last_used = time.monotonic()
+        self.statements = 0
+        self.writes: List[str] = []  # written statements, for cache invalidation on commit
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            "database": self.db_name,
+            "started_at": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            "idle_seconds": round(time.monotonic() - self.last_used, 1),
+            "statements": self.statements
+        }
+
+
+_sessions: Dict[str, Session] = {}
+_sessions_lock = threading.Lock()
+_opening: Dict[str, int] = {}  # per database, sessions past the limit checks still acquiring their connection
+_reaper: Optional[threading.Thread] = None
+_reaped = 0
+
+
+def _start_reaper() -> None:
+    global _reaper
+    if _reaper is not None:
+        return
+    _reaper = threading.Thread(target=_reap_loop, name='session-reaper', daemon=True)
+    _reaper.start()
+
+
+def _reap_loop() -> None:
+    while True:
+        time.sleep(max(1.0, min(SESSION_IDLE_TIMEOUT / 4, 5.0)))
+        reap_idle_sessions()
+
+
+def reap_idle_sessions() -> int:
+    """Roll back sessions idle longer than the idle timeout; returns how many were closed"""
+    global _reaped
+    deadline = time.monotonic() - SESSION_IDLE_TIMEOUT
+    with _sessions_lock:
+        idle = [session for session in _sessions.values() if session.last_used < deadline]
+
+    closed = 0
+    for session in idle:
+        # Skip sessions running a statement right now
+        if not session.lock.acquire(blocking=False):
+            continue
+        try:
+            if session.last_used < deadline and _forget(session.id):
+                try:
+                    _end(session, commit=False)
+                except Error:
+                    pass  # the connection was discarded, which rolls back too
+                closed += 1
+        finally:
+            session.lock.release()
+    with _sessions_lock:
+        _reaped += closed
+    return closed
+
+
+def _forget(session_id: str) -> bool:
+    with _sessions_lock:
+        return _sessions.pop(session_id, None) is not None
+
+
+def _end(session: Session, commit: bool) -> None:
+    """Commit or roll back and give the connection back to the pool"""
+    connection = session.connection
+    discard = False
+    try:
+        if commit:
+            connection.commit()
+        else:
+            connection.rollback()
+        connection.autocommit = True
+    except Error:
+        discard = True
+        raise
+    finally:
+        session.pool.release(connection, discard=discard)
+
+
+def session_limit(db_name: str) -> int:
+    """Most sessions a database may have open: below its pool size and write lane, and the configured cap"""
+    pool_size = DB_CONFIGS[db_name].get('pool_size', DEFAULT_POOL_SIZE)
+    write_slots = get_admission(db_name)['write'].limit
+    return max(0, min(MAX_SESSIONS_PER_DATABASE, pool_size - 1, write_slots - 1))
+
+
+def begin_session(db_name: str = 'default') -> Dict[str, Any]:
+    """Pin a primary connection and open a transaction on it"""
+    db_name = db_name.lower()  # count sessions per database however the name is spelled
+    if db_name not in DB_CONFIGS:
+        raise Exception(f"Database configuration '{db_name}' not found")
+    limit = session_limit(db_name)
+    with _sessions_lock:
+        # Reserve the slot under the lock so concurrent opens cannot all pass the checks
+        if len(_sessions) + sum(_opening.values()) >= MAX_SESSIONS:
+            raise Exception(f"Too many open sessions ({MAX_SESSIONS}); commit or roll back one first")
+        open_here = sum(1 for session in _sessions.values() if session.db_name == db_name) + _opening.get(db_name, 0)
+        if open_here >= limit:
+            raise Exception(
+                f"Too many open sessions on '{db_name}' ({limit}, kept below its pool size and write lane); "
+                f"commit or roll back one first"
+            )
+        _opening[db_name] = _opening.get(db_name, 0) + 1
+
+    session = None
+    try:
+        pool, connection = acquire_connection(db_name)
+        try:
+            # Without autocommit, the transaction continues after statements that commit implicitly (DDL)
+            connection.autocommit = False
+        except Error as e:
+            pool.release(connection, discard=True)
+            raise Exception(f"Could not start a transaction on '{db_name}': {str(e)}")
+        session = Session(uuid.uuid4().hex, db_name, pool, connection)
+    finally:
+        with _sessions_lock:
+            _opening[db_name] -= 1
+            if session is not None:
+                _sessions[session.id] = session
+    _start_reaper()
+    return session.info()
+
+
+def _rolled_back_by_server(connection, error: Error) -> bool:
+    """Check whether an error made InnoDB roll back the whole transaction"""
+    if error.errno in DEADLOCK_ERRORS:
+        return True
+    if error.errno not in LOCK_WAIT_TIMEOUT_ERRORS:
+        return False
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT @@innodb_rollback_on_timeout")
+            return bool(int(cursor.fetchone()[0]))
+        finally:
+            cursor.close()
+    except Error:
+        # Cannot tell; assume the worst rather than let a later commit keep half a transaction
+        return True
+
+
+def _checkout(session_id: str) -> Session:
+    with _sessions_lock:
+        session = _sessions.get(session_id)
+    if session is None:
+        raise Exception(f"Session '{session_id}' not found; it was committed, rolled back or expired")
+    session.lock.acquire()
+    if session_id not in _sessions:
+        # Reaped or ended while we waited for the lock
+        session.lock.release()
+        raise Exception(f"Session '{session_id}' not found; it was committed, rolled back or expired")
+    return session
+
+
+def execute_in_session(session_id: str, sql: str, params: Optional[tuple] = None,
+                       max_rows: int = 0) -> Dict[str, Any]:
+    """Run one statement inside a session's transaction; SELECT-like statements return up to max_rows rows"""
+    session = _checkout(session_id)
+    db_name = session.db_name
+    connection = session.connection
+    max_rows = max_rows if max_rows > 0 else DB_CONFIGS[db_name].get('max_rows', DEFAULT_MAX_ROWS)
+    phases = {}
+    row_count = 0
+    start = time.perf_counter()
+    try:
+        with guarded_statement(connection, sql, db_name) as statement:
+            cursor = execute_statement(connection, statement, params, dictionary=True)
+            try:
+                phases["execute"] = time.perf_counter() - start
+                if cursor.with_rows:
+                    rows = fetch_rows(cursor, max_rows + 1)
+                    truncated = len(rows) > max_rows
+                    if truncated:
+                        # Drain the rest so the connection can run the next statement
+                        cursor.fetchall()
+                        rows = rows[:max_rows]
+                    phases["fetch"] = time.perf_counter() - start - phases["execute"]
+                    row_count = len(rows)
+                    result = {"results": rows, "row_count": row_count, "truncated": truncated}
+                else:
+                    row_count = max(cursor.rowcount, 0)
+                    result = {
+                        "affected_rows": cursor.rowcount,
+                        "last_insert_id": cursor.lastrowid if cursor.lastrowid else None
+                    }
+            finally:
+                close_cursor(connection, cursor)
+        session.statements += 1
+        if statement_type(sql) not in _READ_STATEMENTS:
+            session.writes.append(sql)
+        result["session_id"] = session_id
+        result["database"] = db_name
+        return result
+    except (errors.InterfaceError, errors.OperationalError) as e:
+        # The connection is gone or the statement was killed; closing the connection rolls the transaction back
+        _forget(session_id)
+        session.pool.release(connection, discard=True)
+        raise Exception(f"Session '{session_id}' aborted and rolled back on '{db_name}': {str(e)}")
+    except Error as e:
+        if _rolled_back_by_server(connection, e):
+            # A later commit would keep only the statements after the rollback, so the session ends here
+            _forget(session_id)
+            try:
+                _end(session, commit=False)
+            except Error:
+                pass  # the connection was discarded, which rolls back too
+            finally:
+                for statement in session.writes:
+                    invalidate_cache(statement, db_name)
+            raise Exception(f"Session '{session_id}' aborted and rolled back on '{db_name}': {str(e)}")
+        # Only the failed statement is undone; the transaction stays open
+        raise Exception(f"Statement failed in session '{session_id}' on '{db_name}': {str(e)}")
+    finally:
+        # A statement that failed on the server is recorded with the time it took, not as zero
+        phases.setdefault("execute", time.perf_counter() - start)
+        record_query(db_name, sql, phases, row_count)
+        session.last_used = time.monotonic()
+        session.lock.release()
+
+
+def finish_session(session_id: str, commit: bool) -> Dict[str, Any]:
+    """Commit or roll back a session and release its connection"""
+    session = _checkout(session_id)
+    try:
+        _forget(session_id)
+        try:
+            _end(session, commit)
+        except Error as e:
+            raise Exception(f"{'Commit' if commit else 'Rollback'} failed for session '{session_id}': {str(e)}")
+        finally:
+            # DDL commits implicitly, so even a rolled back session may have changed data
+            for sql in session.writes:
+                invalidate_cache(sql, session.db_name)
+        return {
+            "session_id": session_id,
+            "database": session.db_name,
+            "status": "committed" if commit else "rolled back",
+            "statements": session.statements,
+            "duration_ms": round((time.time() - session.started_at) * 1000, 2)
+        }
+    finally:
+        session.lock.release()
+
+
+def get_sessions() -> Dict[str, Any]:
+    """Return open sessions and session settings"""
+    with _sessions_lock:
+        sessions = [session.info() for session in _sessions.values()]
+        reaped = _reaped
+    return {
+        "sessions": sessions,
+        "open": len(sessions),
+        "max_sessions": MAX_SESSIONS,
+        "max_sessions_per_database": MAX_SESSIONS_PER_DATABASE,
+        "idle_timeout": SESSION_IDLE_TIMEOUT,
+        "reaped": reaped
+    }
@@ -0,0 +1,183 @@
+# sql_utils.py
+import re
+from typing import Optional, Set
+
+# Quoted strings and identifiers, kept intact when normalizing
+_QUOTED = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)")
+
+# Comments, matched together with quoted text so comment markers inside strings are left alone.
+# Optimizer hints (/*+ */) and versioned code (/*! */) are kept, since the server acts on them.
+_COMMENT_OR_QUOTED = re.compile(
+    _QUOTED.pattern + r"|(/\*(?![!+]).*?\*/|--(?=\s|$)[^\n]*|#[^\n]*)",
+    re.DOTALL
+)
+
+_IDENTIFIER = r"(?:`[^`]+`|[\w$]+)(?:\s*\.\s*(?:`[^`]+`|[\w$]+))?"
+
+# Table references after FROM / JOIN, including comma-separated FROM lists
+_FROM_CLAUSE = re.compile(
+    r"\bFROM\s+(.+?)(?=\bWHERE\b|\bGROUP\b|\bORDER\b|\bLIMIT\b|\bHAVING\b|\bJOIN\b|\bINNER\b|\bLEFT\b|"
+    r"\bRIGHT\b|\bCROSS\b|\bSTRAIGHT_JOIN\b|\bNATURAL\b|\bUNION\b|\bWINDOW\b|\bFOR\b|\bLOCK\b|\bINTO\b|\bON\b|\bUSING\b|\)|;|$)",
+    re.IGNORECASE | re.DOTALL
+)
+_JOIN_TABLE = re.compile(r"\b(?:JOIN|STRAIGHT_JOIN)\s+(" + _IDENTIFIER + r")", re.IGNORECASE)
+
+# A parenthesized group with no groups inside it; subqueries are resolved from the innermost out
+_INNERMOST_GROUP = re.compile(r"\(([^()]*)\)")
+
+# Stands in for a resolved subquery, so a derived table still reads as one item of its FROM list
+_SUBQUERY = '_subquery_'
+
+# Server schemas whose tables change without writes the result cache could see
+_SYSTEM_SCHEMA = re.compile(r"(?:\b|`)(?:information_schema|performance_schema|mysql|sys)`?\s*\.", re.IGNORECASE)
+
+# Functions whose result changes between executions; queries using them are never cached
+_NON_DETERMINISTIC = re.compile(
+    r"\b(?:NOW|RAND|UUID|UUID_SHORT|SYSDATE|CURDATE|CURTIME|CURRENT_DATE|CURRENT_TIME|CURRENT_TIMESTAMP|"
+    r"LOCALTIME|LOCALTIMESTAMP|UNIX_TIMESTAMP|UTC_DATE|UTC_TIME|UTC_TIMESTAMP|LAST_INSERT_ID|FOUND_ROWS|"
+    r"ROW_COUNT|CONNECTION_ID|USER|CURRENT_USER|SESSION_USER|SYSTEM_USER|SLEEP|GET_LOCK|RELEASE_LOCK|"
+    r"IS_FREE_LOCK|IS_USED_LOCK|BENCHMARK)\b",
+    re.IGNORECASE
+)
+_LOCKING_READ = re.compile(r"\bFOR\s+UPDATE\b|\bFOR\s+SHARE\b|\bLOCK\s+IN\s+SHARE\s+MODE\b|\bINTO\s+(?:OUTFILE|DUMPFILE|@)",
+                           re.IGNORECASE)
+
+# Functions and user variables whose value depends on the session that ran earlier statements
+_SESSION_STATE = re.compile(
+    r"\b(?:LAST_INSERT_ID|FOUND_ROWS|ROW_COUNT|CONNECTION_ID|GET_LOCK|RELEASE_LOCK|IS_FREE_LOCK|IS_USED_LOCK)\s*\(|@",
+    re.IGNORECASE
+)
+
+# WITH clauses can also precede UPDATE and DELETE
+_CTE_WRITE = re.compile(r"\b(?:UPDATE|DELETE|INSERT|REPLACE)\b", re.IGNORECASE)
+
+_WRITE_TARGET = re.compile(
+    r"^\s*(?:"
+    r"(?:INSERT|REPLACE)\s+(?:LOW_PRIORITY\s+|DELAYED\s+|HIGH_PRIORITY\s+)?(?:IGNORE\s+)?(?:INTO\s+)?(?P<insert>" + _IDENTIFIER + r")"
+    r"|UPDATE\s+(?:LOW_PRIORITY\s+)?(?:IGNORE\s+)?(?P<update>" + _IDENTIFIER + r")"
+    r"|DELETE\s+(?:LOW_PRIORITY\s+)?(?:QUICK\s+)?(?:IGNORE\s+)?FROM\s+(?P<delete>" + _IDENTIFIER + r")"
+    r"|TRUNCATE\s+(?:TABLE\s+)?(?P<truncate>" + _IDENTIFIER + r")"
+    r"|ALTER\s+(?:ONLINE\s+|IGNORE\s+)?TABLE\s+(?P<alter>" + _IDENTIFIER + r")"
+    r"|(?:DROP|CREATE)\s+(?:TEMPORARY\s+)?TABLE\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?(?P<ddl>" + _IDENTIFIER + r")"
+    r"|(?:CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+|SPATIAL\s+)?|DROP\s+)INDEX\s+" + _IDENTIFIER + r"\s+ON\s+(?P<index>" + _IDENTIFIER + r")"
+    r"|RENAME\s+TABLE\s+(?P<rename>" + _IDENTIFIER + r")"
+    r")",
+    re.IGNORECASE
+)
+
+
+def strip_literals(sql: str) -> str:
+    """Replace string literals with empty strings so keywords inside them are not matched"""
+    return _QUOTED.sub(lambda m: m.group(0) if m.group(0).startswith('`') else "''", sql)
+
+
+def mask_literals(sql: str) -> str:
+    """Blank out the inside of quoted strings and identifiers, keeping every other character at its position"""
+    return _QUOTED.sub(lambda m: m.group(0)[0] + ' ' * (len(m.group(0)) - 2) + m.group(0)[-1], sql)
+
+
+def strip_comments(sql: str) -> str:
+    """Remove comments outside quoted strings, so text appended to the statement cannot end up inside one"""
+    return _COMMENT_OR_QUOTED.sub(lambda m: m.group(1) or ' ', sql)
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside quoted strings and drop a trailing semicolon"""
+    parts = _QUOTED.split(sql.strip())
+    normalized = ''.join(
+        part if i % 2 else re.sub(r'\s+', ' ', part)
+        for i, part in enumerate(parts)
+    )
+    return normalized.strip().rstrip(';').strip()
+
+
+def statement_type(sql: str) -> str:
+    """Return the leading SQL keyword in upper case (e.g. 'SELECT', 'INSERT')"""
+    match = re.match(r"\s*(?:/\*.*?\*/\s*)*\(?\s*(\w+)", sql, re.DOTALL)
+    return match.group(1).upper() if match else ''
+
+
+def table_name(identifier: str) -> str:
+    """Normalize a possibly schema-qualified, backtick-quoted identifier to a bare lower-case table name"""
+    return identifier.split('.')[-1].strip().strip('`').lower()
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name with backticks"""
+    return '`' + name.replace('`', '``') + '`'
+
+
+def _clause_tables(sql: str) -> Set[str]:
+    """Tables named in the FROM and JOIN clauses of SQL that has no parentheses left"""
+    tables = set()
+    for match in _FROM_CLAUSE.finditer(sql):
+        for item in match.group(1).split(','):
+            identifier = re.match(_IDENTIFIER, item.strip())
+            if identifier:
+                tables.add(table_name(identifier.group(0)))
+    for match in _JOIN_TABLE.finditer(sql):
+        tables.add(table_name(match.group(1)))
+    return tables
+
+
+def referenced_tables(sql: str) -> Set[str]:
+    """Return the names of tables a statement reads from (FROM and JOIN clauses), including in subqueries
+
+    Parenthesized groups are resolved from the innermost out: a subquery contributes its own tables and
+    is replaced by a placeholder, other groups (function calls, nested joins) are unwrapped.
+    """
+    sql = strip_literals(sql)
+    tables = set()
+
+    def resolve(match):
+        inner = match.group(1)
+        if statement_type(inner) in ('SELECT', 'WITH'):
+            tables.update(_clause_tables(inner))
+            return f' {_SUBQUERY} '
+        return f' {inner} '
+
+    resolved = 1
+    while resolved:
+        sql, resolved = _INNERMOST_GROUP.subn(resolve, sql)
+    tables.update(_clause_tables(sql))
+    tables.difference_update(('dual', _SUBQUERY))
+    return tables
+
+
+def write_target_tables(sql: str) -> Optional[Set[str]]:
+    """Return the tables a write statement modifies, or None when they cannot be determined"""
+    stripped = strip_literals(sql)
+    match = _WRITE_TARGET.match(stripped)
+    if not match:
+        return None
+    tables = {table_name(value) for value in match.groupdict().values() if value}
+    kind = statement_type(stripped)
+    if kind in ('UPDATE', 'DELETE'):
+        # Multi-table UPDATE/DELETE may modify any joined table
+        tables |= referenced_tables(stripped)
+    return tables
+
+
+def is_cacheable_select(sql: str) -> bool:
+    """Check whether a query is a deterministic, non-locking SELECT whose tables can be identified
+
+    Queries on server schemas (information_schema and the like) are never cacheable. Views cannot be told
+    from tables here; see schema_catalog.reads_view.
+    """
+    stripped = strip_literals(sql)
+    if statement_type(stripped) != 'SELECT':
+        return False
+    if _NON_DETERMINISTIC.search(stripped) or _LOCKING_READ.search(stripped) or _SYSTEM_SCHEMA.search(stripped):
+        return False
+    return bool(referenced_tables(stripped))
+
+
+def is_replica_safe(sql: str) -> bool:
+    """Check whether a query is a plain read a replica can serve: no locking reads, writes or session state"""
+    stripped = strip_literals(sql)
+    kind = statement_type(stripped)
+    if kind not in ('SELECT', 'WITH'):
+        return False
+    if kind == 'WITH' and _CTE_WRITE.search(stripped):
+        return False
+    return not (_LOCKING_READ.search(stripped) or _SESSION_STATE.search(stripped))
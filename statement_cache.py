@@ -0,0 +1,146 @@
+# statement_cache.py
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from mysql.connector import Error
+
+# Prepared statements kept per pooled connection; 0 sends every statement as text
+STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '64'))
+
+# "This command is not supported in the prepared statement protocol yet"
+NOT_PREPARABLE_ERRORS = (1295,)
+
+# Attribute holding a connection's statement cache
+_CACHE_ATTRIBUTE = '_mcp_statement_cache'
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "unpreparable": 0}
+
+
+def _count(counter: str) -> None:
+    with _stats_lock:
+        _stats[counter] += 1
+
+
+class StatementCache:
+    """LRU of server-side prepared statements for one connection, keyed by SQL text
+
+    mysql-connector only reuses a prepared statement when it is executed with the very same string object
+    it was prepared from (an identity check), so the cache keeps that string and callers execute with it.
+    A connection is used by one thread at a time, so the cache needs no locking of its own.
+    """
+
+    def __init__(self, size: int = STATEMENT_CACHE_SIZE):
+        self.size = max(1, size)
+        self._cursors = OrderedDict()  # sql -> (prepared cursor, the sql string it was prepared from)
+        self.unpreparable = set()
+
+    def cursor(self, connection, sql: str) -> Tuple[Any, str]:
+        """
+        Return the prepared cursor for `sql` and the string to execute it with, creating the cursor (and
+        evicting the oldest) on a miss. Executing with any other string object, even an equal one, makes
+        the connector prepare the statement again.
+        """
+        entry = self._cursors.get(sql)
+        if entry is not None:
+            self._cursors.move_to_end(sql)
+            _count("hits")
+            return entry
+
+        _count("misses")
+        entry = (connection.cursor(prepared=True), sql)
+        self._cursors[sql] = entry
+        while len(self._cursors) > self.size:
+            _, (evicted, _) = self._cursors.popitem(last=False)
+            _count("evictions")
+            self._close(evicted)
+        return entry
+
+    def owns(self, cursor) -> bool:
+        return any(cached is cursor for cached, _ in self._cursors.values())
+
+    def discard(self, sql: str) -> None:
+        entry = self._cursors.pop(sql, None)
+        if entry is not None:
+            self._close(entry[0])
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    @staticmethod
+    def _close(cursor) -> None:
+        # Closing a prepared cursor deallocates the statement on the server
+        try:
+            cursor.close()
+        except Error:
+            pass
+
+
+def _cache_for(connection) -> StatementCache:
+    cache = getattr(connection, _CACHE_ATTRIBUTE, None)
+    if cache is None:
+        cache = StatementCache()
+        setattr(connection, _CACHE_ATTRIBUTE, cache)
+    return cache
+
+
+def execute_statement(connection, sql: str, params: Optional[tuple] = None, **cursor_args):
+    """
+    Execute a statement and return the cursor holding its result.
+
+    Parameterized statements run through the connection's cached prepared statement, so repeated calls
+    skip parsing on the server. Statements without parameters, or that the server cannot prepare, use a
+    fresh cursor created with `cursor_args`. Release the cursor with close_cursor.
+    """
+    if params and STATEMENT_CACHE_SIZE > 0:
+        cache = _cache_for(connection)
+        if sql not in cache.unpreparable:
+            cursor, cached_sql = cache.cursor(connection, sql)
+            try:
+                cursor.execute(cached_sql, params)
+                return cursor
+            except Error as e:
+                cache.discard(sql)
+                if e.errno not in NOT_PREPARABLE_ERRORS:
+                    raise
+                cache.unpreparable.add(sql)
+                _count("unpreparable")
+
+    cursor = connection.cursor(**cursor_args)
+    try:
+        if params:
+            cursor.execute(sql, params)
+        else:
+            cursor.execute(sql)
+    except Exception:
+        cursor.close()
+        raise
+    return cursor
+
+
+def close_cursor(connection, cursor) -> None:
+    """Close a cursor returned by execute_statement, keeping cached prepared statements open"""
+    cache = getattr(connection, _CACHE_ATTRIBUTE, None)
+    if cache is None or not cache.owns(cursor):
+        cursor.close()
+
+
+def fetch_rows(cursor, size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Fetch rows as dictionaries from either a dictionary cursor or a prepared cursor returning tuples"""
+    rows = cursor.fetchall() if size is None else cursor.fetchmany(size)
+    if rows and not isinstance(rows[0], dict):
+        columns = cursor.column_names
+        rows = [dict(zip(columns, row)) for row in rows]
+    return rows
+
+
+def get_statement_cache_stats() -> Dict[str, Any]:
+    """Return prepared statement cache counters across all connections"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+    stats["size_per_connection"] = STATEMENT_CACHE_SIZE
+    return stats
@@ -0,0 +1,226 @@
+# table_profile.py
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import DB_CONFIGS, execute_query, stream_query
+from schema_catalog import get_catalog, is_integer_type
+from sql_utils import quote_identifier
+
+# Rows sampled per profile by default, and the most a caller may ask for
+PROFILE_SAMPLE_ROWS = int(os.getenv('DB_PROFILE_SAMPLE_ROWS', '10000'))
+PROFILE_MAX_SAMPLE_ROWS = int(os.getenv('DB_PROFILE_MAX_SAMPLE_ROWS', '100000'))
+
+# Key ranges read per primary-key sample; more ranges spread the sample over more of the table
+PROFILE_SAMPLE_RANGES = int(os.getenv('DB_PROFILE_SAMPLE_RANGES', '10'))
+
+# Most frequent values reported per column
+PROFILE_TOP_VALUES = int(os.getenv('DB_PROFILE_TOP_VALUES', '5'))
+
+# Cached profiles, keyed by database, table and sample size
+PROFILE_CACHE_TTL = float(os.getenv('DB_PROFILE_CACHE_TTL', '300'))
+PROFILE_CACHE_SIZE = int(os.getenv('DB_PROFILE_CACHE_SIZE', '256'))
+
+# Columns profiled by LENGTH() instead of by value, so the sample does not pull large payloads
+_LENGTH_ONLY = re.compile(r"^(?:tiny|medium|long)?(?:text|blob)\b|^json\b|^geometry|^(?:multi)?(?:point|linestring|polygon)\b",
+                          re.IGNORECASE)
+
+# Longest string kept for a reported min, max or top value
+_MAX_VALUE_LENGTH = 200
+
+_profiles = OrderedDict()  # (db_name, table, sample rows, top values) -> (profile, update_time, created_at)
+_profiles_lock = threading.Lock()
+
+
+def _forget_profiles(db_names: List[str]) -> None:
+    """Drop cached profiles of databases whose configuration changed"""
+    with _profiles_lock:
+        for key in [key for key in _profiles if key[0] in db_names]:
+            del _profiles[key]
+
+
+DB_CONFIGS.add_listener(_forget_profiles)
+
+
+def _integer_key(table: Dict[str, Any]) -> Optional[str]:
+    """Return the primary key column if it is a single integer column"""
+    primary = table['indexes'].get('PRIMARY')
+    if primary is None or len(primary['columns']) != 1:
+        return None
+    column = next((c for c in table['columns'] if c['Field'].lower() == primary['columns'][0].lower()), None)
+    return column['Field'] if column is not None and is_integer_type(column['Type']) else None
+
+
+def _select_list(columns: List[Dict[str, Any]]) -> str:
+    return ', '.join(
+        f"LENGTH({quote_identifier(c['Field'])})" if _LENGTH_ONLY.match(c['Type']) else quote_identifier(c['Field'])
+        for c in columns
+    )
+
+
+def _read_rows(query: str, params: Optional[tuple], db_name: str) -> List[tuple]:
+    """Read a bounded result as tuples in select-list order, so no column name can shadow another"""
+    rows = []
+    for batch in stream_query(query, params, db_name, dictionary=False):
+        rows.extend(batch)
+    return rows
+
+
+def _sample_rows(table: Dict[str, Any], sample_rows: int, db_name: str) -> Tuple[List[tuple], Dict[str, Any]]:
+    """
+    Read a bounded sample of rows as tuples in column order.
+
+    Tables that fit in the sample are read whole. Larger tables with a single integer primary key are
+    sampled as random key ranges: MIN/MAX of the key come from the index, then each range reads the next
+    rows from a random start, all in one UNION ALL statement. Other tables fall back to the first rows.
+    """
+    select_list = _select_list(table['columns'])
+    source = quote_identifier(table['name'])
+    estimated = table['rows'] or 0
+    key = _integer_key(table)
+
+    if key is None or estimated <= sample_rows:
+        rows = _read_rows(f"SELECT {select_list} FROM {source} LIMIT {sample_rows + 1}", None, db_name)
+        method = "full" if len(rows) <= sample_rows else "first_rows"
+        return rows[:sample_rows], {"method": method}
+
+    quoted_key = quote_identifier(key)
+    bounds = execute_query(f"SELECT MIN({quoted_key}) AS lo, MAX({quoted_key}) AS hi FROM {source}", None, db_name)
+    lo, hi = bounds[0]['lo'], bounds[0]['hi']
+    if lo is None:
+        return [], {"method": "key_ranges", "ranges": 0}
+
+    ranges = max(1, min(PROFILE_SAMPLE_RANGES, sample_rows))
+    per_range = -(-sample_rows // ranges)
+    starts = sorted(random.randint(lo, hi) for _ in range(ranges))
+    # The key is selected last so overlapping ranges can be de-duplicated by position
+    query = ' UNION ALL '.join(
+        f"(SELECT {select_list}, {quoted_key} FROM {source} WHERE {quoted_key} >= %s "
+        f"ORDER BY {quoted_key} LIMIT {per_range})"
+        for _ in starts
+    )
+    sampled = {}
+    for row in _read_rows(query, tuple(starts), db_name):
+        sampled.setdefault(row[-1], row[:-1])
+        if len(sampled) >= sample_rows:
+            break
+    return list(sampled.values()), {"method": "key_ranges", "ranges": ranges, "key": key, "key_min": lo, "key_max": hi}
+
+
+def _shorten(value: Any) -> Any:
+    if isinstance(value, str) and len(value) > _MAX_VALUE_LENGTH:
+        return value[:_MAX_VALUE_LENGTH] + '...'
+    return value
+
+
+def _column_profile(column: Dict[str, Any], values: List[Any], top_values: int,
+                    index_cardinality: Optional[int]) -> Dict[str, Any]:
+    present = [value for value in values if value is not None]
+    profile = {
+        "type": column['Type'],
+        "null_ratio": round(1 - len(present) / len(values), 4) if values else None
+    }
+
+    if _LENGTH_ONLY.match(column['Type']):
+        if present:
+            profile.update(min_length=min(present), max_length=max(present),
+                           avg_length=round(sum(present) / len(present), 1))
+        return profile
+
+    if present:
+        try:
+            profile.update(min=_shorten(min(present)), max=_shorten(max(present)))
+        except TypeError:
+            pass
+
+    # SET columns arrive as Python sets, which cannot be counted directly
+    counts = Counter(frozenset(value) if isinstance(value, set) else value for value in present)
+    profile["distinct_in_sample"] = len(counts)
+    if index_cardinality is not None:
+        profile["index_cardinality"] = index_cardinality
+    if top_values > 0 and counts and len(counts) < len(present):
+        profile["top_values"] = [
+            {"value": _shorten(sorted(value) if isinstance(value, frozenset) else value), "count": count}
+            for value, count in counts.most_common(top_values)
+        ]
+    return profile
+
+
+def _index_cardinalities(table: Dict[str, Any]) -> Dict[str, int]:
+    """Cardinality of columns with a single-column index, as estimated by the server"""
+    cardinalities = {}
+    for index in table['indexes'].values():
+        if len(index['columns']) == 1 and index['cardinality'] is not None:
+            cardinalities[index['columns'][0]] = int(index['cardinality'])
+    return cardinalities
+
+
+def build_profile(table_name: str, db_name: str, sample_rows: int, top_values: int) -> Tuple[Dict[str, Any], Any]:
+    """Profile a table from the schema catalog and a fresh sample; returns the profile and the table's UPDATE_TIME"""
+    table = get_catalog(db_name).get_table(table_name)
+    if table is None:
+        raise Exception(f"Table '{table_name}' does not exist in database '{db_name}'")
+    if table['type'] == 'VIEW':
+        raise Exception(f"'{table['name']}' is a view; only tables can be profiled")
+
+    start = time.monotonic()
+    rows, sample = _sample_rows(table, sample_rows, db_name)
+    cardinalities = _index_cardinalities(table)
+    columns = {
+        column['Field']: _column_profile(column, [row[i] for row in rows], top_values,
+                                         cardinalities.get(column['Field']))
+        for i, column in enumerate(table['columns'])
+    }
+    sample.update(rows=len(rows), requested=sample_rows, duration_ms=round((time.monotonic() - start) * 1000, 2))
+
+    profile = {
+        "table": table['name'],
+        "engine": table['engine'],
+        "approximate_rows": table['rows'],
+        "data_length": table['data_length'],
+        "index_length": table['index_length'],
+        "update_time": table['update_time'],
+        "indexes": {
+            name: {"columns": index['columns'], "unique": index['unique'], "cardinality": index['cardinality']}
+            for name, index in table['indexes'].items()
+        },
+        "sample": sample,
+        "columns": columns
+    }
+    return profile, table['update_time']
+
+
+def profile_table(table_name: str, db_name: str = 'default', sample_rows: int = PROFILE_SAMPLE_ROWS,
+                  top_values: int = PROFILE_TOP_VALUES, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Return approximate statistics for a table, reusing a cached profile for DB_PROFILE_CACHE_TTL seconds.
+
+    A cached profile is also dropped when the catalog reports a newer UPDATE_TIME for the table.
+    """
+    sample_rows = max(1, min(sample_rows, PROFILE_MAX_SAMPLE_ROWS))
+    top_values = max(0, top_values)
+    key = (db_name, table_name.lower(), sample_rows, top_values)
+    now = time.monotonic()
+
+    if not refresh:
+        with _profiles_lock:
+            entry = _profiles.get(key)
+        if entry is not None and now - entry[2] < PROFILE_CACHE_TTL:
+            table = get_catalog(db_name).get_table(table_name)
+            if table is not None and table['update_time'] == entry[1]:
+                with _profiles_lock:
+                    if key in _profiles:
+                        _profiles.move_to_end(key)
+                return dict(entry[0], cached=True, age_seconds=round(now - entry[2], 1))
+
+    profile, update_time = build_profile(table_name, db_name, sample_rows, top_values)
+    with _profiles_lock:
+        _profiles[key] = (profile, update_time, now)
+        _profiles.move_to_end(key)
+        while len(_profiles) > PROFILE_CACHE_SIZE:
+            _profiles.popitem(last=False)
+    return dict(profile, cached=False, age_seconds=0.0)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQL helpers that decide result caching and cache invalidation
+"""
+from sql_utils import is_cacheable_select, referenced_tables, write_target_tables
+
+
+def test_plain_tables():
+    assert referenced_tables("SELECT * FROM a, c JOIN b ON a.id = b.a_id") == {"a", "b", "c"}
+    assert referenced_tables("SELECT * FROM `db`.`Orders` o") == {"orders"}
+
+
+def test_derived_table_first_in_from_list():
+    assert referenced_tables("SELECT * FROM (SELECT id FROM a) AS x, b") == {"a", "b"}
+    assert referenced_tables("SELECT * FROM (SELECT id FROM a) x JOIN b ON b.id = x.id") == {"a", "b"}
+
+
+def test_nested_subqueries():
+    sql = ("SELECT * FROM b, (SELECT id FROM a WHERE z IN (SELECT q FROM c)) x "
+           "WHERE EXISTS (SELECT 1 FROM d WHERE d.id = x.id)")
+    assert referenced_tables(sql) == {"a", "b", "c", "d"}
+
+
+def test_parenthesized_join_and_function_calls():
+    assert referenced_tables("SELECT * FROM (a JOIN b ON a.id = b.id)") == {"a", "b"}
+    assert referenced_tables("SELECT COUNT(*) FROM t WHERE x IN (1, 2)") == {"t"}
+
+
+def test_parentheses_inside_literals_are_ignored():
+    assert referenced_tables("SELECT '(SELECT 1 FROM secret)' FROM t") == {"t"}
+
+
+def test_union():
+    assert referenced_tables("SELECT id FROM t1 UNION ALL SELECT id FROM t2") == {"t1", "t2"}
+
+
+def test_cacheable_subqueries():
+    assert is_cacheable_select("SELECT * FROM (SELECT id FROM a) AS x, b")
+    assert is_cacheable_select("SELECT a FROM t WHERE id IN (SELECT t_id FROM u)")
+
+
+def test_not_cacheable():
+    assert not is_cacheable_select("SELECT 1")
+    assert not is_cacheable_select("SELECT * FROM t WHERE created_at > NOW()")
+    assert not is_cacheable_select("SELECT * FROM t FOR UPDATE")
+    assert not is_cacheable_select("SELECT * FROM (SELECT id FROM a FOR SHARE) x")
+    assert not is_cacheable_select("SELECT * FROM information_schema.TABLES")
+    assert not is_cacheable_select("SELECT * FROM t WHERE id IN (SELECT id FROM `mysql`.`user`)")
+    assert not is_cacheable_select("UPDATE t SET x = 1")
+
+
+def test_multi_table_update_targets():
+    assert write_target_tables("UPDATE a JOIN b ON a.id = b.id SET a.x = b.x") == {"a", "b"}
+    assert write_target_tables("DELETE FROM a WHERE id IN (SELECT a_id FROM b)") == {"a", "b"}
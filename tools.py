@@ -3,16 +3,70 @@ import json
 import csv
 import io
 import os
+import math
+import time
+import contextvars
+from itertools import chain
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from database import (
     execute_query, 
     execute_non_query, 
+    execute_batch as run_batch,
+    load_data_local_infile,
+    stream_query,
+    fetch_page,
+    DB_EXECUTOR_WORKERS,
+    DEFAULT_BATCH_CHUNK_SIZE,
+    DEFAULT_MAX_ROWS,
+    DEFAULT_MAX_BYTES,
     get_db_connection, 
+    admitted,
     get_available_databases,
     get_database_info,
     DB_CONFIGS
 )
+from cancellation import call_deadline, query_timeout
+from cost_guard import check_query_cost
+from csv_writer import row_converter, write_header, write_rows
+from encoding import RESULT_FORMATS, encode_compact, encode_value
+from metrics import instrument_tool, timed_encode
+from parameters import bind_params
+from pagination import advance, build_page_query, decode_cursor, encode_cursor, plan_pagination
+from result_store import get_result_store
+from schema_catalog import get_catalog, mark_schema_stale, reads_view
+from table_profile import PROFILE_SAMPLE_ROWS, PROFILE_TOP_VALUES, profile_table
+from export_formats import EXPORT_FORMATS, export_query as run_export
+from parallel_export import DEFAULT_EXPORT_WORKERS, export_table
+from sessions import begin_session as open_session, execute_in_session, finish_session
+from sql_utils import is_cacheable_select, quote_identifier, statement_type, write_target_tables
 
+# Per-database deadlines, in seconds, for calls that fan out across databases
+CONNECTION_TEST_TIMEOUT = float(os.getenv('DB_CONNECTION_TEST_TIMEOUT', '5'))
+MULTI_QUERY_TIMEOUT = float(os.getenv('DB_MULTI_QUERY_TIMEOUT', '30'))
 
+# Statements accepted by tools that only read data
+READ_STATEMENTS = ('SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN', 'WITH')
+
+# Statements accepted by batch writes
+BATCH_STATEMENTS = ('INSERT', 'REPLACE', 'UPDATE', 'DELETE')
+
+# Statements that change table definitions and therefore the schema catalog
+DDL_STATEMENTS = ('CREATE', 'ALTER', 'DROP', 'RENAME', 'TRUNCATE')
+
+
+def _use_cache(sql: str, db_name: str) -> bool:
+    """Serve a read from the result cache only if caching is on and the query reads no view"""
+    return (db_name in DB_CONFIGS and DB_CONFIGS[db_name].get('cache_ttl', 0) > 0 and is_cacheable_select(sql)
+            and not reads_view(sql, db_name))
+
+
+def _encode_response(data, **kwargs) -> str:
+    """Serialize a tool's response, counting the time toward the tool's encode metric"""
+    with timed_encode():
+        return json.dumps(data, **kwargs)
+
+
+@instrument_tool("get_databases")
 def get_databases() -> str:
     """
     Get list of all available databases.
@@ -27,7 +81,7 @@ def get_databases() -> str:
         for db_name in databases:
             db_info[db_name] = get_database_info(db_name)
         
-        return json.dumps({
+        return _encode_response({
             "databases": databases,
             "database_info": db_info,
             "total_databases": len(databases)
@@ -36,59 +90,263 @@ def get_databases() -> str:
         return json.dumps({"error": str(e)}, indent=2)
 
 
-def query_database(sql: str, params: str = "", db_name: str = "default") -> str:
+@instrument_tool("query_database")
+def query_database(sql: str, params: str = "", db_name: str = "default", format: str = "json",
+                   max_rows: int = 0, max_bytes: int = 0, cursor: str = "", timeout: float = 0) -> str:
     """
     Execute a SELECT query on the specified MySQL database.
     
+    Results are limited to a row and byte budget. When the budget is hit, the response is marked
+    truncated and includes a next_cursor token; pass it back as `cursor` to fetch the next page.
+    
     Args:
-        sql: The SQL SELECT query to execute
-        params: Optional comma-separated parameters for parameterized queries (e.g., "value1,value2")
-        db_name: The database name to query (default: "default")
+        sql: The SQL SELECT query to execute (ignored when cursor is given)
+        params: Optional parameters: a JSON array (e.g., '[42, {"$date": "2024-01-31"}]'), a JSON object for %(name)s
+                placeholders, or legacy comma-separated strings (e.g., "value1,value2")
+        db_name: The database name to query (default: "default", ignored when cursor is given)
+        format: "json" for one object per row, or "compact" for a column header plus row arrays
+                without indentation (default: "json")
+        max_rows: Maximum rows to return (default: the database's DB_MAX_ROWS setting)
+        max_bytes: Approximate maximum result size in bytes (default: the database's DB_MAX_BYTES setting)
+        cursor: Continuation token from a previous truncated response
+        timeout: Seconds before the query is killed on the server (default: the database's DB_QUERY_TIMEOUT)
     
     Returns:
         JSON string containing the query results
     """
     try:
-        # Parse parameters if provided
-        query_params = None
-        if params.strip():
-            query_params = tuple(param.strip() for param in params.split(','))
+        if format not in RESULT_FORMATS:
+            raise Exception(f"Unsupported format '{format}'. Use one of: {', '.join(RESULT_FORMATS)}")
+        
+        cost = None
+        if cursor.strip():
+            sql, query_params, db_name, state = decode_cursor(cursor.strip())
+        else:
+            # Parse parameters if provided
+            sql, query_params = bind_params(sql, params)
+            state = plan_pagination(sql, db_name)
+            cost = check_query_cost(sql, query_params, db_name)
+            if cost and cost["action"] == "limit":
+                # The cap covers all pages, so it travels in the cursor
+                state["row_cap"] = cost["max_rows"]
         
-        results = execute_query(sql, query_params, db_name)
-        return json.dumps({
+        config = get_database_info(db_name)
+        max_rows = max_rows if max_rows > 0 else config.get('max_rows', DEFAULT_MAX_ROWS)
+        max_bytes = max_bytes if max_bytes > 0 else config.get('max_bytes', DEFAULT_MAX_BYTES)
+        if "row_cap" in state:
+            remaining = state["row_cap"] - state.get("returned", 0)
+            if remaining <= 0:
+                raise Exception(f"The cost guard row limit of {state['row_cap']} was reached on an earlier page")
+            max_rows = min(max_rows, remaining)
+        
+        # Ask the server for one row more than the budget so a full page can tell whether more rows exist
+        page_sql, page_params = build_page_query(sql, query_params, state, max_rows + 1)
+        with query_timeout(timeout):
+            results, truncated = fetch_page(page_sql, page_params, db_name, max_rows, max_bytes,
+                                             use_cache=_use_cache(sql, db_name), source=(sql, query_params, state))
+        
+        page_info = {"truncated": truncated}
+        next_state = advance(state, results)
+        if truncated and state["mode"] != "none" and next_state.get("returned", 0) < state.get("row_cap", math.inf):
+            page_info["next_cursor"] = encode_cursor(sql, query_params, db_name, next_state)
+            page_info["pagination"] = state["mode"]
+        if cost:
+            page_info["cost_guard"] = cost
+        elif "row_cap" in state:
+            page_info["cost_guard"] = {"action": "limit", "max_rows": state["row_cap"],
+                                       "returned": next_state["returned"]}
+        
+        if format == "compact":
+            with timed_encode():
+                return encode_compact(results, database=db_name, **page_info)
+        return _encode_response({
             "database": db_name,
             "results": results,
-            "row_count": len(results)
+            "row_count": len(results),
+            **page_info
         }, indent=2, default=str)
     except Exception as e:
         return json.dumps({"error": str(e), "database": db_name}, indent=2)
 
 
-def execute_sql(sql: str, params: str = "", db_name: str = "default") -> str:
+@instrument_tool("execute_sql")
+def execute_sql(sql: str, params: str = "", db_name: str = "default", timeout: float = 0) -> str:
     """
     Execute INSERT, UPDATE, or DELETE operations on the specified MySQL database.
     
     Args:
         sql: The SQL query to execute (INSERT, UPDATE, DELETE)
-        params: Optional comma-separated parameters for parameterized queries (e.g., "value1,value2")
+        params: Optional parameters: a JSON array (e.g., '[42, {"$date": "2024-01-31"}]'), a JSON object for %(name)s
+                placeholders, or legacy comma-separated strings (e.g., "value1,value2")
         db_name: The database name to execute on (default: "default")
+        timeout: Seconds before the statement is killed on the server (default: the database's DB_QUERY_TIMEOUT)
     
     Returns:
         JSON string containing the execution results (affected rows, last insert ID)
     """
     try:
         # Parse parameters if provided
-        query_params = None
-        if params.strip():
-            query_params = tuple(param.strip() for param in params.split(','))
+        sql, query_params = bind_params(sql, params)
         
-        result = execute_non_query(sql, query_params, db_name)
+        with query_timeout(timeout):
+            result = execute_non_query(sql, query_params, db_name)
+        if statement_type(sql) in DDL_STATEMENTS:
+            mark_schema_stale(db_name, write_target_tables(sql))
         result["database"] = db_name
-        return json.dumps(result, indent=2)
+        return _encode_response(result, indent=2)
     except Exception as e:
         return json.dumps({"error": str(e), "database": db_name}, indent=2)
 
 
+def _parse_param_rows(rows: str, rows_format: str = "json") -> list:
+    """Parse batch parameter rows from a JSON array or from CSV text (one row per line, \\N for NULL)"""
+    rows_format = rows_format.strip().lower()
+    if rows_format == "json":
+        data = json.loads(rows)
+        if not isinstance(data, list):
+            raise Exception("rows must be a JSON array of arrays or objects")
+        parsed = []
+        for row in data:
+            if isinstance(row, dict):
+                parsed.append(row)
+            elif isinstance(row, list):
+                parsed.append(tuple(row))
+            else:
+                parsed.append((row,))
+        return parsed
+    if rows_format == "csv":
+        return [
+            tuple(None if value == '\\N' else value for value in row)
+            for row in csv.reader(io.StringIO(rows))
+            if row
+        ]
+    raise Exception(f"Unsupported rows_format '{rows_format}'. Use 'json' or 'csv'")
+
+
+@instrument_tool("execute_batch")
+def execute_batch(sql: str, rows: str, rows_format: str = "json", chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE,
+                  db_name: str = "default") -> str:
+    """
+    Execute one parameterized INSERT, REPLACE, UPDATE or DELETE for many parameter rows in a single transaction.
+    
+    Args:
+        sql: The parameterized SQL statement (e.g., "INSERT INTO users (name, email) VALUES (%s, %s)")
+        rows: Parameter rows as a JSON array (e.g., '[["John", "john@example.com"]]') or CSV text
+        rows_format: Format of rows, "json" or "csv" (default: "json")
+        chunk_size: Number of rows sent per executemany round trip (default: DB_BATCH_CHUNK_SIZE)
+        db_name: The database name to execute on (default: "default")
+    
+    Returns:
+        JSON string containing total affected rows and per-chunk timing
+    """
+    try:
+        if statement_type(sql) not in BATCH_STATEMENTS:
+            raise Exception(f"execute_batch only accepts {', '.join(BATCH_STATEMENTS)} statements")
+        
+        param_rows = _parse_param_rows(rows, rows_format)
+        if not param_rows:
+            return _encode_response({
+                "message": "No parameter rows provided",
+                "affected_rows": 0,
+                "database": db_name
+            }, indent=2)
+        
+        result = run_batch(sql, param_rows, db_name, chunk_size)
+        result["status"] = "success"
+        result["database"] = db_name
+        return _encode_response(result, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "database": db_name}, indent=2)
+
+
+@instrument_tool("begin_session")
+def begin_session(db_name: str = "default") -> str:
+    """
+    Start a transaction session on the specified database.
+    
+    The session pins one connection to the primary until it is committed or rolled back. Sessions idle
+    longer than DB_SESSION_IDLE_TIMEOUT seconds are rolled back automatically.
+    
+    Args:
+        db_name: The database name to open the session on (default: "default")
+    
+    Returns:
+        JSON string containing the session_id to pass to session_execute, commit_session or rollback_session
+    """
+    try:
+        result = open_session(db_name)
+        result["status"] = "open"
+        return _encode_response(result, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "database": db_name}, indent=2)
+
+
+@instrument_tool("session_execute")
+def session_execute(session_id: str, sql: str, params: str = "", max_rows: int = 0) -> str:
+    """
+    Execute a statement inside a transaction session.
+    
+    A failed statement is undone on its own and the transaction stays open; if the connection is lost
+    or the statement is killed, the whole session is rolled back.
+    
+    Args:
+        session_id: Session id returned by begin_session
+        sql: The SQL statement to execute
+        params: Optional parameters: a JSON array (e.g., '[42, {"$date": "2024-01-31"}]'), a JSON object for %(name)s
+                placeholders, or legacy comma-separated strings (e.g., "value1,value2")
+        max_rows: Maximum rows returned by a SELECT (default: the database's DB_MAX_ROWS setting)
+    
+    Returns:
+        JSON string with rows for SELECTs, or affected rows and last insert ID for writes
+    """
+    try:
+        # Parse parameters if provided
+        sql, query_params = bind_params(sql, params)
+        
+        result = execute_in_session(session_id, sql, query_params, max_rows)
+        if statement_type(sql) in DDL_STATEMENTS:
+            # DDL commits implicitly, so the schema change is visible right away
+            mark_schema_stale(result["database"], write_target_tables(sql))
+        return _encode_response(result, indent=2, default=str)
+    except Exception as e:
+        return json.dumps({"error": str(e), "session_id": session_id}, indent=2)
+
+
+@instrument_tool("commit_session")
+def commit_session(session_id: str) -> str:
+    """
+    Commit a transaction session and release its connection.
+    
+    Args:
+        session_id: Session id returned by begin_session
+    
+    Returns:
+        JSON string with the session status and statement count
+    """
+    try:
+        return _encode_response(finish_session(session_id, commit=True), indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "session_id": session_id}, indent=2)
+
+
+@instrument_tool("rollback_session")
+def rollback_session(session_id: str) -> str:
+    """
+    Roll back a transaction session and release its connection.
+    
+    Args:
+        session_id: Session id returned by begin_session
+    
+    Returns:
+        JSON string with the session status and statement count
+    """
+    try:
+        return _encode_response(finish_session(session_id, commit=False), indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "session_id": session_id}, indent=2)
+
+
+@instrument_tool("list_tables")
 def list_tables(db_name: str = "default") -> str:
     """
     List all tables in the specified database.
@@ -100,9 +358,8 @@ def list_tables(db_name: str = "default") -> str:
         JSON string containing list of table names
     """
     try:
-        results = execute_query("SHOW TABLES", None, db_name)
-        tables = [list(row.values())[0] for row in results]
-        return json.dumps({
+        tables = get_catalog(db_name).table_names()
+        return _encode_response({
             "database": db_name,
             "tables": tables,
             "table_count": len(tables)
@@ -111,6 +368,7 @@ def list_tables(db_name: str = "default") -> str:
         return json.dumps({"error": str(e), "database": db_name}, indent=2)
 
 
+@instrument_tool("describe_table")
 def describe_table(table_name: str, db_name: str = "default") -> str:
     """
     Get the structure/schema of a specific table.
@@ -123,8 +381,11 @@ def describe_table(table_name: str, db_name: str = "default") -> str:
         JSON string containing table structure information
     """
     try:
-        results = execute_query(f"DESCRIBE `{table_name}`", None, db_name)
-        return json.dumps({
+        results = get_catalog(db_name).describe(table_name)
+        if results is None:
+            # Not in the catalog; let MySQL report the error for the missing table
+            results = execute_query(f"DESCRIBE `{table_name}`", None, db_name)
+        return _encode_response({
             "database": db_name,
             "table": table_name,
             "structure": results
@@ -133,6 +394,56 @@ def describe_table(table_name: str, db_name: str = "default") -> str:
         return json.dumps({"error": str(e), "database": db_name, "table": table_name}, indent=2)
 
 
+@instrument_tool("table_profile")
+def table_profile(table_name: str, db_name: str = "default", sample_rows: int = PROFILE_SAMPLE_ROWS,
+                  top_values: int = PROFILE_TOP_VALUES, refresh: bool = False) -> str:
+    """
+    Get approximate statistics for a table without scanning it.
+    
+    Row counts, sizes and index cardinalities come from information_schema. Per-column min/max, null
+    ratio, distinct count and most frequent values are computed from a bounded read: random primary key
+    ranges for tables with an integer key, otherwise the first rows, which are not a random sample and are
+    labelled "first_rows" in sample.method. Profiles are cached for
+    DB_PROFILE_CACHE_TTL seconds.
+    
+    Args:
+        table_name: Name of the table to profile
+        db_name: The database name containing the table (default: "default")
+        sample_rows: Rows to sample (default: DB_PROFILE_SAMPLE_ROWS, capped at DB_PROFILE_MAX_SAMPLE_ROWS)
+        top_values: Most frequent values to report per column (default: DB_PROFILE_TOP_VALUES)
+        refresh: Sample again instead of returning a cached profile (default: False)
+    
+    Returns:
+        JSON string containing the table profile
+    """
+    try:
+        profile = profile_table(table_name, db_name, sample_rows, top_values, refresh)
+        return _encode_response({"database": db_name, **profile}, indent=2, default=encode_value)
+    except Exception as e:
+        return json.dumps({"error": str(e), "database": db_name, "table": table_name}, indent=2)
+
+
+@instrument_tool("refresh_schema")
+def refresh_schema(db_name: str = "default", full: bool = False) -> str:
+    """
+    Refresh the cached schema catalog used by list_tables, describe_table and the table resources.
+    
+    Args:
+        db_name: The database name to refresh (default: "default")
+        full: Reload every table instead of only new or changed ones (default: False)
+    
+    Returns:
+        JSON string with the number of tables loaded and reloaded
+    """
+    try:
+        result = get_catalog(db_name).refresh(full=full)
+        result["status"] = "success"
+        return _encode_response(result, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "database": db_name}, indent=2)
+
+
+@instrument_tool("test_connection")
 def test_connection(db_name: str = "default") -> str:
     """
     Test the connection to the specified database.
@@ -144,13 +455,16 @@ def test_connection(db_name: str = "default") -> str:
         JSON string with connection status
     """
     try:
-        connection = get_db_connection(db_name)
-        if connection.is_connected():
-            db_info = connection.get_server_info()
+        # Health checks open their own connection but still count against the read lane
+        with admitted(db_name, 'read'):
+            connection = get_db_connection(db_name)
+            is_connected = connection.is_connected()
+            db_info = connection.get_server_info() if is_connected else None
             connection.close()
+        if is_connected:
             
             config_info = get_database_info(db_name)
-            return json.dumps({
+            return _encode_response({
                 "status": "connected",
                 "database": db_name,
                 "server_version": db_info,
@@ -159,14 +473,94 @@ def test_connection(db_name: str = "default") -> str:
                 "port": config_info['port']
             }, indent=2)
         else:
-            return json.dumps({"status": "disconnected", "database": db_name}, indent=2)
+            return _encode_response({"status": "disconnected", "database": db_name}, indent=2)
     except Exception as e:
         return json.dumps({"status": "error", "message": str(e), "database": db_name}, indent=2)
 
 
-def test_all_connections() -> str:
+def _fan_out(func, db_names, timeout: float):
+    """
+    Run func(db_name) for several databases concurrently, on at most DB_EXECUTOR_WORKERS threads.
+    
+    Each call gets its own deadline of `timeout` seconds from when it starts running, and its waits for a
+    pool connection or admission slot are bounded by that deadline. Returns a dict mapping each database
+    to ("ok", result), ("error", message) or ("timeout", message) for calls that missed their deadline.
     """
-    Test connections to all configured databases.
+    outcomes = {}
+    if not db_names:
+        return outcomes
+    
+    started = {}
+    
+    def run(db_name):
+        started[db_name] = time.monotonic()
+        with call_deadline(timeout):
+            return func(db_name)
+    
+    workers = min(len(db_names), DB_EXECUTOR_WORKERS)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db-fan-out')
+    try:
+        # Each call runs in a copy of the caller's context so timeouts and cancellation carry over
+        futures = {executor.submit(contextvars.copy_context().run, run, db_name): db_name for db_name in db_names}
+        pending = set(futures)
+        # Calls missing their deadline may keep a worker busy until their query is killed; stop waiting eventually
+        give_up = time.monotonic() + timeout * (math.ceil(len(db_names) / workers) + 1)
+        while pending:
+            now = time.monotonic()
+            for future in [f for f in pending if futures[f] in started and now - started[futures[f]] >= timeout]:
+                if not future.done():
+                    pending.discard(future)
+                    outcomes[futures[future]] = ("timeout", f"No response within {timeout}s")
+            if not pending:
+                break
+            if now >= give_up:
+                for future in pending:
+                    future.cancel()
+                    outcomes[futures[future]] = ("timeout", f"Not started within {timeout}s")
+                break
+            deadlines = [started[futures[f]] + timeout for f in pending if futures[f] in started]
+            done, _ = wait(pending, timeout=max(0.0, min(deadlines + [give_up]) - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                db_name = futures[future]
+                if future.exception() is not None:
+                    outcomes[db_name] = ("error", str(future.exception()))
+                else:
+                    outcomes[db_name] = ("ok", future.result())
+    finally:
+        # Do not wait for calls that missed the deadline; they finish in the background
+        executor.shutdown(wait=False)
+    return outcomes
+
+
+def _check_connection(db_name: str, timeout: float) -> dict:
+    """Open a fresh connection, holding a read lane slot, and report the server version"""
+    with admitted(db_name, 'read'):
+        connection = get_db_connection(db_name, connection_timeout=max(1, math.ceil(timeout)))
+        try:
+            if not connection.is_connected():
+                return {"status": "disconnected"}
+            db_info = connection.get_server_info()
+        finally:
+            connection.close()
+    
+    config_info = get_database_info(db_name)
+    return {
+        "status": "connected",
+        "server_version": db_info,
+        "database_name": config_info['database'],
+        "host": config_info['host'],
+        "port": config_info['port']
+    }
+
+
+@instrument_tool("test_all_connections")
+def test_all_connections(timeout: float = CONNECTION_TEST_TIMEOUT) -> str:
+    """
+    Test connections to all configured databases in parallel.
+    
+    Args:
+        timeout: Seconds to wait for each database before reporting it as timed out
     
     Returns:
         JSON string with connection status for all databases
@@ -175,26 +569,15 @@ def test_all_connections() -> str:
         databases = get_available_databases()
         results = {}
         
+        outcomes = _fan_out(lambda db_name: _check_connection(db_name, timeout), databases, timeout)
         for db_name in databases:
-            try:
-                connection = get_db_connection(db_name)
-                if connection.is_connected():
-                    db_info = connection.get_server_info()
-                    connection.close()
-                    config_info = get_database_info(db_name)
-                    results[db_name] = {
-                        "status": "connected",
-                        "server_version": db_info,
-                        "database_name": config_info['database'],
-                        "host": config_info['host'],
-                        "port": config_info['port']
-                    }
-                else:
-                    results[db_name] = {"status": "disconnected"}
-            except Exception as e:
-                results[db_name] = {"status": "error", "message": str(e)}
+            status, value = outcomes[db_name]
+            if status == "ok":
+                results[db_name] = value
+            else:
+                results[db_name] = {"status": status, "message": value}
         
-        return json.dumps({
+        return _encode_response({
             "database_connections": results,
             "total_databases": len(databases)
         }, indent=2)
@@ -202,6 +585,61 @@ def test_all_connections() -> str:
         return json.dumps({"error": str(e)}, indent=2)
 
 
+@instrument_tool("query_all_databases")
+def query_all_databases(sql: str, params: str = "", db_names: str = "",
+                        timeout: float = MULTI_QUERY_TIMEOUT) -> str:
+    """
+    Execute the same SELECT query on several databases at the same time.
+    
+    Args:
+        sql: The SQL SELECT query to execute
+        params: Optional parameters: a JSON array (e.g., '[42, {"$date": "2024-01-31"}]'), a JSON object for %(name)s
+                placeholders, or legacy comma-separated strings (e.g., "value1,value2")
+        db_names: Optional comma-separated database names (default: all configured databases)
+        timeout: Seconds to wait for each database before reporting it as timed out
+    
+    Returns:
+        JSON string with results tagged by database; databases that failed are reported with their error
+    """
+    try:
+        if statement_type(sql) not in READ_STATEMENTS:
+            raise Exception("query_all_databases only accepts read-only statements")
+        
+        # Parse parameters if provided
+        sql, query_params = bind_params(sql, params)
+        
+        if db_names.strip():
+            databases = [name.strip() for name in db_names.split(',') if name.strip()]
+        else:
+            databases = get_available_databases()
+        
+        def run_query(db_name):
+            # Kill the query on the server once its database misses the deadline
+            with query_timeout(timeout):
+                return execute_query(sql, query_params, db_name, use_cache=_use_cache(sql, db_name))
+        
+        outcomes = _fan_out(run_query, databases, timeout)
+        results = {}
+        failed = []
+        for db_name in databases:
+            status, value = outcomes[db_name]
+            if status == "ok":
+                results[db_name] = {"status": "success", "results": value, "row_count": len(value)}
+            else:
+                results[db_name] = {"status": status, "error": value}
+                failed.append(db_name)
+        
+        return _encode_response({
+            "results_by_database": results,
+            "total_databases": len(databases),
+            "failed_databases": failed,
+            "partial": 0 < len(failed) < len(databases)
+        }, indent=2, default=str)
+    except Exception as e:
+        return json.dumps({"error": str(e)}, indent=2)
+
+
+@instrument_tool("query_to_csv")
 def query_to_csv(sql: str, filename: str = "", params: str = "", db_name: str = "default") -> str:
     """
     Execute a SELECT query and save the results to a CSV file.
@@ -209,7 +647,8 @@ def query_to_csv(sql: str, filename: str = "", params: str = "", db_name: str =
     Args:
         sql: The SQL SELECT query to execute
         filename: Optional filename for the CSV file (if not provided, uses 'query_results_<db_name>.csv')
-        params: Optional comma-separated parameters for parameterized queries (e.g., "value1,value2")
+        params: Optional parameters: a JSON array (e.g., '[42, {"$date": "2024-01-31"}]'), a JSON object for %(name)s
+                placeholders, or legacy comma-separated strings (e.g., "value1,value2")
         db_name: The database name to query (default: "default")
     
     Returns:
@@ -217,19 +656,7 @@ def query_to_csv(sql: str, filename: str = "", params: str = "", db_name: str =
     """
     try:
         # Parse parameters if provided
-        query_params = None
-        if params.strip():
-            query_params = tuple(param.strip() for param in params.split(','))
-        
-        # Execute the query
-        results = execute_query(sql, query_params, db_name)
-        
-        if not results:
-            return json.dumps({
-                "message": "Query returned no results", 
-                "rows_exported": 0,
-                "database": db_name
-            }, indent=2)
+        sql, query_params = bind_params(sql, params)
         
         # Set default filename if not provided
         if not filename.strip():
@@ -237,85 +664,280 @@ def query_to_csv(sql: str, filename: str = "", params: str = "", db_name: str =
         elif not filename.endswith('.csv'):
             filename += '.csv'
         
-        # Write results to CSV file
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = results[0].keys()
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            # Write header
-            writer.writeheader()
-            
-            # Write data rows
-            for row in results:
-                # Convert any non-string values to strings for CSV compatibility
-                csv_row = {k: str(v) if v is not None else '' for k, v in row.items()}
-                writer.writerow(csv_row)
+        # Stream results into the CSV file batch by batch so memory stays flat
+        csvfile = None
+        writer = None
+        convert = None
+        description = []
+        rows_exported = 0
+        try:
+            for batch in stream_query(sql, query_params, db_name, on_description=description.extend,
+                                      dictionary=False):
+                if writer is None:
+                    csvfile = open(filename, 'w', newline='', encoding='utf-8')
+                    writer = csv.writer(csvfile)
+                    convert = row_converter(description)
+                    
+                    # Write header
+                    write_header(writer, description)
+                
+                write_rows(writer, batch, convert)
+                rows_exported += len(batch)
+        finally:
+            if csvfile:
+                csvfile.close()
+        columns = [column[0] for column in description]
+        
+        if not rows_exported:
+            return _encode_response({
+                "message": "Query returned no results", 
+                "rows_exported": 0,
+                "database": db_name
+            }, indent=2)
         
-        return json.dumps({
+        return _encode_response({
             "status": "success",
             "database": db_name,
             "csv_file": os.path.abspath(filename),
-            "rows_exported": len(results),
-            "columns": list(results[0].keys())
+            "rows_exported": rows_exported,
+            "columns": columns
         }, indent=2)
         
     except Exception as e:
         return json.dumps({"error": str(e), "database": db_name}, indent=2)
 
 
+@instrument_tool("export_query")
+def export_query(sql: str, filename: str = "", format: str = "parquet", params: str = "",
+                 db_name: str = "default") -> str:
+    """
+    Execute a SELECT query and stream the results into a typed or compressed file.
+    
+    Args:
+        sql: The SQL SELECT query to execute
+        filename: Optional output file (default: 'query_results_<db_name>' plus the format's extension)
+        format: "parquet" or "arrow" (Arrow IPC file) with column types from the result set, or
+                "csv.gz", "csv.zst" or "csv" (default: "parquet")
+        params: Optional parameters: a JSON array (e.g., '[42, {"$date": "2024-01-31"}]'), a JSON object for %(name)s
+                placeholders, or legacy comma-separated strings (e.g., "value1,value2")
+        db_name: The database name to query (default: "default")
+    
+    Returns:
+        JSON string containing the file path, size and number of rows exported
+    """
+    try:
+        if format not in EXPORT_FORMATS:
+            raise Exception(f"Unsupported export format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+        
+        # Parse parameters if provided
+        sql, query_params = bind_params(sql, params)
+        
+        # Set default filename if not provided
+        extension = EXPORT_FORMATS[format]
+        if not filename.strip():
+            filename = f"query_results_{db_name}{extension}"
+        elif not filename.endswith(extension):
+            filename += extension
+        
+        result = run_export(sql, filename, format, query_params, db_name)
+        result["status"] = "success"
+        result["database"] = db_name
+        return _encode_response(result, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "database": db_name}, indent=2)
+
+
+@instrument_tool("export_table_parallel")
+def export_table_parallel(table_name: str, filename: str = "", db_name: str = "default", columns: str = "",
+                          where: str = "", workers: int = DEFAULT_EXPORT_WORKERS, ranges: int = 0,
+                          merge: bool = True) -> str:
+    """
+    Export a large table to CSV by reading primary key ranges concurrently.
+    
+    Progress is kept in '<filename>.manifest.json'; calling again with the same arguments after an
+    interruption resumes with the ranges that did not finish.
+    
+    Args:
+        table_name: The table to export; it needs a single-column primary key
+        filename: Output CSV file (default: '<table_name>_<db_name>.csv')
+        db_name: The database name to export from (default: "default")
+        columns: Optional comma-separated columns to export (default: all)
+        where: Optional SQL condition rows must match
+        workers: Concurrent connections reading ranges, capped at the database's pool size
+        ranges: Number of key ranges (default: 4 per worker)
+        merge: Concatenate the ranges into one file; if false, keep one part file with a header per range
+    
+    Returns:
+        JSON string with the exported file(s), row count and throughput
+    """
+    try:
+        if not filename.strip():
+            filename = f"{table_name}_{db_name}.csv"
+        elif not filename.endswith('.csv'):
+            filename += '.csv'
+        column_list = [c.strip() for c in columns.split(',') if c.strip()] or None
+        
+        result = export_table(table_name, filename, db_name, column_list, where, workers, ranges, merge)
+        result["status"] = "success"
+        result["database"] = db_name
+        return _encode_response(result, indent=2)
+    except Exception as e:
+        return json.dumps({"error": str(e), "database": db_name}, indent=2)
+
+
+@instrument_tool("query_to_csv_string")
 def query_to_csv_string(sql: str, params: str = "", db_name: str = "default") -> str:
     """
     Execute a SELECT query and return the results as a CSV string.
     
+    Results up to DB_RESULT_INLINE_BYTES are returned inline as csv_data. Larger results are kept
+    server-side for DB_RESULT_TTL seconds and returned as result://{id}/part/{n} resource URIs to read
+    in order; concatenating the parts gives the CSV.
+    
     Args:
         sql: The SQL SELECT query to execute
-        params: Optional comma-separated parameters for parameterized queries (e.g., "value1,value2")
+        params: Optional parameters: a JSON array (e.g., '[42, {"$date": "2024-01-31"}]'), a JSON object for %(name)s
+                placeholders, or legacy comma-separated strings (e.g., "value1,value2")
         db_name: The database name to query (default: "default")
     
     Returns:
-        JSON string containing the CSV data as a string and metadata
+        JSON string containing the CSV data (or the resource URIs of its parts) and metadata
     """
     try:
         # Parse parameters if provided
-        query_params = None
-        if params.strip():
-            query_params = tuple(param.strip() for param in params.split(','))
+        sql, query_params = bind_params(sql, params)
         
-        # Execute the query
-        results = execute_query(sql, query_params, db_name)
+        # Stream tuples from the server into the result store, which cuts the CSV into parts as it grows
+        output = get_result_store().writer()
+        writer = csv.writer(output)
+        convert = None
+        description = []
+        rows_exported = 0
+        try:
+            for batch in stream_query(sql, query_params, db_name, on_description=description.extend, dictionary=False):
+                if not rows_exported:
+                    convert = row_converter(description)
+                    write_header(writer, description)
+                write_rows(writer, batch, convert)
+                rows_exported += len(batch)
+        except Exception:
+            output.discard()
+            raise
         
-        if not results:
-            return json.dumps({
+        if not rows_exported:
+            output.discard()
+            return _encode_response({
                 "message": "Query returned no results", 
                 "csv_data": "", 
                 "rows_exported": 0,
                 "database": db_name
             }, indent=2)
         
-        # Create CSV string in memory
-        output = io.StringIO()
-        fieldnames = results[0].keys()
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
+        columns = [column[0] for column in description]
+        if output.fits_inline():
+            csv_data = output.getvalue()
+            output.discard()
+            return _encode_response({
+                "status": "success",
+                "database": db_name,
+                "csv_data": csv_data,
+                "rows_exported": rows_exported,
+                "columns": columns
+            }, indent=2)
         
-        # Write header
-        writer.writeheader()
+        output.result.metadata.update(database=db_name, rows_exported=rows_exported, columns=columns)
+        result = output.close()
+        return _encode_response(dict(result.info(), status="success"), indent=2)
         
-        # Write data rows
-        for row in results:
-            # Convert any non-string values to strings for CSV compatibility
-            csv_row = {k: str(v) if v is not None else '' for k, v in row.items()}
-            writer.writerow(csv_row)
+    except Exception as e:
+        return json.dumps({"error": str(e), "database": db_name}, indent=2)
+
+
+@instrument_tool("csv_to_table")
+def csv_to_table(filename: str, table_name: str, db_name: str = "default", columns: str = "",
+                 has_header: bool = True, delimiter: str = ",",
+                 chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE) -> str:
+    """
+    Import a CSV file into a table.
+    
+    Uses LOAD DATA LOCAL INFILE when the server allows it; otherwise streams the file and sends
+    chunked multi-row INSERTs in a single transaction, so the file is never fully loaded into memory.
+    
+    Args:
+        filename: Path to the CSV file to import
+        table_name: Name of the table to insert into
+        db_name: The database name to import into (default: "default")
+        columns: Optional comma-separated target columns (default: the CSV header, or all table columns)
+        has_header: Whether the first line of the file is a header row (default: True)
+        delimiter: Field delimiter (default: ",")
+        chunk_size: Rows per INSERT round trip for the streaming fallback (default: DB_BATCH_CHUNK_SIZE)
+    
+    Returns:
+        JSON string containing the import method, rows imported and throughput (rows/s)
+    """
+    try:
+        if not os.path.isfile(filename):
+            raise Exception(f"CSV file not found: {filename}")
+        
+        # Read the header and detect the line terminator without loading the file
+        with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+            first_line = csvfile.readline()
+        line_terminator = '\r\n' if first_line.endswith('\r\n') else '\n'
+        header = next(csv.reader([first_line], delimiter=delimiter), []) if has_header else []
+        
+        target_columns = [c.strip() for c in columns.split(',') if c.strip()] if columns.strip() else header
+        if not target_columns:
+            # Name the columns so LOAD DATA maps \N to NULL the same way the streaming fallback does
+            target_columns = [column['Field'] for column in get_catalog(db_name).describe(table_name) or []]
         
-        csv_data = output.getvalue()
-        output.close()
+        start = time.perf_counter()
+        result = load_data_local_infile(
+            filename, table_name, target_columns or None, delimiter,
+            skip_lines=1 if has_header else 0, line_terminator=line_terminator, db_name=db_name
+        )
         
-        return json.dumps({
+        if result is not None:
+            method = "load_data_local_infile"
+            rows_imported = result["rows_loaded"]
+            details = {"warnings": result["warnings"]}
+        else:
+            method = "streaming_insert"
+            with open(filename, 'r', newline='', encoding='utf-8') as csvfile:
+                reader = csv.reader(csvfile, delimiter=delimiter)
+                if has_header:
+                    next(reader, None)
+                rows = (
+                    tuple(None if value == '\\N' else value for value in row)
+                    for row in reader
+                    if row
+                )
+                
+                # Without known column names the placeholder count comes from the first row
+                first_row = next(rows, None)
+                if first_row is None:
+                    rows_imported = 0
+                    details = {"chunks": 0}
+                else:
+                    placeholder_count = len(target_columns) if target_columns else len(first_row)
+                    column_list = f" ({', '.join(quote_identifier(c) for c in target_columns)})" if target_columns else ""
+                    sql = (
+                        f"INSERT INTO {quote_identifier(table_name)}{column_list} "
+                        f"VALUES ({', '.join(['%s'] * placeholder_count)})"
+                    )
+                    batch = run_batch(sql, chain([first_row], rows), db_name, chunk_size)
+                    rows_imported = batch["total_rows"]
+                    details = {"chunks": len(batch["chunks"]), "chunk_size": batch["chunk_size"]}
+        
+        elapsed = time.perf_counter() - start
+        return _encode_response({
             "status": "success",
             "database": db_name,
-            "csv_data": csv_data,
-            "rows_exported": len(results),
-            "columns": list(results[0].keys())
+            "table": table_name,
+            "method": method,
+            "rows_imported": rows_imported,
+            "duration_seconds": round(elapsed, 3),
+            "rows_per_second": round(rows_imported / elapsed, 1) if elapsed > 0 else None,
+            **details
         }, indent=2)
-        
     except Exception as e:
-        return json.dumps({"error": str(e), "database": db_name}, indent=2)
\ No newline at end of file
+        return json.dumps({"error": str(e), "database": db_name, "table": table_name}, indent=2)